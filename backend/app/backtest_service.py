@@ -10,9 +10,11 @@ from sqlalchemy.orm import Session
 
 from .backtest_engine import BacktestConfig, BacktraderEngine, EquityPoint, TradeRecord
 from .data_manager import DataManager
+from .indicators import chart_indicator_payload
 from .models import (
     Backtest,
     BacktestEquityPoint,
+    BacktestIndicatorSeries,
     BacktestTrade,
     Stock,
     StockGroup,
@@ -22,7 +24,6 @@ from .models import (
 )
 from .prices_models import PriceBar
 
-
 _TIMEFRAME_MINUTES: Dict[str, int] = {
     "1m": 1,
     "3m": 3,
@@ -106,6 +107,35 @@ class BacktestService:
             end=end,
         )
 
+    @staticmethod
+    def _indicator_series(
+        backtest: Backtest,
+        df: pd.DataFrame,
+        *,
+        engine_code: str | None,
+        params: Dict[str, Any],
+    ) -> BacktestIndicatorSeries:
+        """Build the stored chart overlays for a backtest from its price bars.
+
+        The bar count and last bar timestamp are recorded with the payload so
+        chart-data can detect bars that were refetched or deleted later.
+        """
+
+        timestamps = list(pd.DatetimeIndex(df.index).to_pydatetime())
+        return BacktestIndicatorSeries(
+            backtest_id=backtest.id,
+            payload_json=chart_indicator_payload(
+                timestamps=timestamps,
+                highs=df["high"].to_numpy(dtype=float),
+                lows=df["low"].to_numpy(dtype=float),
+                closes=df["close"].to_numpy(dtype=float),
+                engine_code=engine_code,
+                params=params,
+            ),
+            bar_count=len(timestamps),
+            last_bar_at=timestamps[-1],
+        )
+
     def run_single_backtest(
         self,
         meta_db: Session,
@@ -273,8 +303,9 @@ class BacktestService:
             data_source=price_source,
         )
         meta_db.add(backtest)
-        meta_db.commit()
-        meta_db.refresh(backtest)
+        # Flush for the id only: the backtest is committed together with its
+        # equity points, trades and chart indicators below.
+        meta_db.flush()
 
         # Persist equity curve points.
         if isinstance(equity_curve_with_costs, list) and equity_curve_with_costs:
@@ -378,6 +409,14 @@ class BacktestService:
             if trade_rows:
                 meta_db.add_all(trade_rows)
 
+        meta_db.add(
+            self._indicator_series(
+                backtest,
+                df,
+                engine_code=strategy.engine_code,
+                params=resolved_params,
+            )
+        )
         meta_db.commit()
 
         return backtest
@@ -653,8 +692,9 @@ class BacktestService:
             data_source=price_source,
         )
         meta_db.add(backtest)
-        meta_db.commit()
-        meta_db.refresh(backtest)
+        # Flush for the id only: the backtest is committed together with its
+        # equity points, trades and chart indicators below.
+        meta_db.flush()
 
         # Persist equity curve points.
         if isinstance(equity_curve_with_costs, list) and equity_curve_with_costs:
@@ -742,6 +782,15 @@ class BacktestService:
             if trade_rows:
                 meta_db.add_all(trade_rows)
 
+        # The chart plots the first symbol of the group.
+        meta_db.add(
+            self._indicator_series(
+                backtest,
+                price_data_by_symbol[backtest.symbols_json[0]],
+                engine_code=strategy.engine_code,
+                params=resolved_params,
+            )
+        )
         meta_db.commit()
 
         return backtest
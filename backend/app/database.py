@@ -1,15 +1,29 @@
+import logging
 from typing import Generator
 
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import get_database_url
 
+logger = logging.getLogger(__name__)
+
 SQLALCHEMY_DATABASE_URL = get_database_url()
 
+# Sync handlers run on FastAPI's threadpool (40 workers by default), each
+# holding one request session. The default 5 + 10 pool makes the surplus
+# threads wait on checkout under load, so size the pool to cover them.
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
+    # Size the compiled-statement cache for the full set of hot endpoint
+    # queries so their SQL is compiled once per process.
+    query_cache_size=1200,
+    poolclass=QueuePool,
+    pool_size=20,
+    max_overflow=40,
+    pool_recycle=3600,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -60,6 +74,7 @@ def ensure_meta_schema_migrations() -> None:
             "visual_config_json": "JSON",
             "group_id": "INTEGER",
             "universe_mode": "VARCHAR",
+            "updated_at": "DATETIME",
         }
         missing = {name: ddl for name, ddl in new_cols.items() if name not in columns}
         if missing:
@@ -94,6 +109,105 @@ def ensure_meta_schema_migrations() -> None:
                     )
                 conn.commit()
 
+    # Backtest equity points: composite index so per-backtest reads come back
+    # in timestamp order without a sort step.
+    if "backtest_equity_points" in tables:
+        with engine.connect() as conn:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS "
+                    "ix_backtest_equity_points_backtest_id_timestamp "
+                    "ON backtest_equity_points (backtest_id, timestamp)"
+                )
+            )
+            conn.commit()
+
+    # Backtest indicator series: fingerprint of the price bars the stored
+    # overlays were computed over. Rows without one are recomputed on read.
+    if "backtest_indicator_series" in tables:
+        columns = {
+            col["name"] for col in inspector.get_columns("backtest_indicator_series")
+        }
+        new_cols = {"bar_count": "INTEGER", "last_bar_at": "DATETIME"}
+        missing = {name: ddl for name, ddl in new_cols.items() if name not in columns}
+        if missing:
+            with engine.connect() as conn:
+                for name, ddl in missing.items():
+                    conn.execute(
+                        text(
+                            "ALTER TABLE backtest_indicator_series "
+                            f"ADD COLUMN {name} {ddl}"
+                        )
+                    )
+                conn.commit()
+
+    # Portfolio weights: one row per (portfolio, date, symbol), the conflict
+    # target of weight saves. Older snapshots could repeat a symbol, so keep
+    # the latest such row before adding the unique index.
+    if "portfolio_weights" in tables:
+        indexes = {idx["name"] for idx in inspector.get_indexes("portfolio_weights")}
+        if "uq_portfolio_weights_portfolio_date_symbol" not in indexes:
+            with engine.connect() as conn:
+                conn.execute(
+                    text(
+                        "DELETE FROM portfolio_weights WHERE id NOT IN ("
+                        "SELECT MAX(id) FROM portfolio_weights "
+                        "GROUP BY portfolio_id, date, symbol)"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "CREATE UNIQUE INDEX "
+                        "uq_portfolio_weights_portfolio_date_symbol "
+                        "ON portfolio_weights (portfolio_id, date, symbol)"
+                    )
+                )
+                conn.commit()
+
+    # Stock group members: one link per (group, stock). Earlier code could
+    # link a stock twice, so keep the first such link before adding the
+    # unique index.
+    if "stock_group_members" in tables:
+        indexes = {idx["name"] for idx in inspector.get_indexes("stock_group_members")}
+        if "uq_stock_group_members_group_stock" not in indexes:
+            with engine.connect() as conn:
+                conn.execute(
+                    text(
+                        "DELETE FROM stock_group_members WHERE id NOT IN ("
+                        "SELECT MIN(id) FROM stock_group_members "
+                        "GROUP BY group_id, stock_id)"
+                    )
+                )
+                conn.execute(
+                    text(
+                        "CREATE UNIQUE INDEX "
+                        "uq_stock_group_members_group_stock "
+                        "ON stock_group_members (group_id, stock_id)"
+                    )
+                )
+                conn.commit()
+        with engine.connect() as conn:
+            conn.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_stock_group_members_stock_id "
+                    "ON stock_group_members (stock_id)"
+                )
+            )
+            conn.commit()
+
+    # Covariance matrices: creation time, used to decide when a stored matrix
+    # is fresh enough to serve without recomputing.
+    if "covariance_matrices" in tables:
+        columns = {col["name"] for col in inspector.get_columns("covariance_matrices")}
+        if "created_at" not in columns:
+            with engine.connect() as conn:
+                conn.execute(
+                    text(
+                        "ALTER TABLE covariance_matrices ADD COLUMN created_at DATETIME"
+                    )
+                )
+                conn.commit()
+
     # Stocks: optional market cap in INR crores.
     if "stocks" in tables:
         columns = {col["name"] for col in inspector.get_columns("stocks")}
@@ -108,3 +222,31 @@ def ensure_meta_schema_migrations() -> None:
                 for name, ddl in missing.items():
                     conn.execute(text(f"ALTER TABLE stocks ADD COLUMN {name} {ddl}"))
                 conn.commit()
+
+        # One stock per (symbol, exchange). Duplicate listings cannot be
+        # merged automatically (memberships and backtests point at them), so
+        # the unique index is only added once the table is clean.
+        indexes = {idx["name"] for idx in inspector.get_indexes("stocks")}
+        if "uq_stocks_symbol_exchange" not in indexes:
+            with engine.connect() as conn:
+                duplicate = conn.execute(
+                    text(
+                        "SELECT symbol, exchange FROM stocks "
+                        "GROUP BY symbol, exchange HAVING COUNT(*) > 1 LIMIT 1"
+                    )
+                ).first()
+                if duplicate is None:
+                    conn.execute(
+                        text(
+                            "CREATE UNIQUE INDEX uq_stocks_symbol_exchange "
+                            "ON stocks (symbol, exchange)"
+                        )
+                    )
+                    conn.commit()
+                else:
+                    logger.warning(
+                        "Skipping uq_stocks_symbol_exchange: %s/%s is listed "
+                        "more than once",
+                        duplicate.symbol,
+                        duplicate.exchange,
+                    )
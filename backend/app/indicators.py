@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average; bars before the first full window are NaN."""
+
+    out = np.full(values.shape[0], np.nan, dtype=np.float64)
+    if period <= 0 or values.shape[0] < period:
+        return out
+
+    csum = np.cumsum(values, dtype=np.float64)
+    window_sums = csum[period - 1 :].copy()
+    window_sums[1:] -= csum[:-period]
+    out[period - 1 :] = window_sums / float(period)
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range per bar; the first bar uses high - low."""
+
+    tr = high - low
+    if tr.shape[0] > 1:
+        prev_close = close[:-1]
+        tr[1:] = np.maximum.reduce(
+            [
+                tr[1:],
+                np.abs(high[1:] - prev_close),
+                np.abs(low[1:] - prev_close),
+            ]
+        )
+    return tr
+
+
+def zero_lag_bands(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    *,
+    length: int,
+    mult: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Approximate Zero Lag Trend basis and band width for chart overlays.
+
+    Returns ``(basis, volatility)``: the ZLEMA of the de-lagged close and
+    ``mult`` times the highest ATR(length) over the last ``3 * length`` bars
+    (zero until that window is full).
+    """
+
+    n = close.shape[0]
+    lag = max((length - 1) // 2, 1)
+
+    src_lag = close.copy()
+    if n > lag:
+        src_lag[lag:] = close[:-lag]
+    de_lagged = close + (close - src_lag)
+
+    # EMA recurrence seeded with the first value, evaluated in pandas' C loop.
+    alpha = 2.0 / (length + 1.0)
+    basis = pd.Series(de_lagged).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+    atr = sma(true_range(high, low, close), length)
+    # pandas' rolling max keeps a monotonic deque of candidate indices, so the
+    # window maximum costs O(n) overall instead of O(n * window).
+    highest_window = length * 3
+    highest = (
+        pd.Series(atr)
+        .rolling(highest_window, min_periods=1)
+        .max()
+        .fillna(0.0)
+        .to_numpy(copy=True)
+    )
+    highest[: highest_window - 1] = 0.0
+    return basis, highest * mult
+
+
+def chart_indicator_payload(
+    *,
+    timestamps: Sequence[datetime],
+    highs: Sequence[float],
+    lows: Sequence[float],
+    closes: Sequence[float],
+    engine_code: str | None,
+    params: Mapping[str, Any],
+) -> dict[str, dict[str, list[Any]]]:
+    """Compute a backtest's chart overlays as columnar, JSON-ready series.
+
+    Each entry maps to ``{"timestamps": [iso, ...], "values": [...]}`` so the
+    payload can be stored as-is in BacktestIndicatorSeries.
+    """
+
+    iso_timestamps = [ts.isoformat() for ts in timestamps]
+    iso_array = np.asarray(iso_timestamps, dtype=object)
+    high_arr = np.asarray(highs, dtype=np.float64)
+    low_arr = np.asarray(lows, dtype=np.float64)
+    close_arr = np.asarray(closes, dtype=np.float64)
+
+    indicators: dict[str, dict[str, list[Any]]] = {}
+
+    # Default indicators: fast/slow SMA on close. Warm-up bars are NaN and
+    # are dropped from the series.
+    for name, period in (("sma_5", 5), ("sma_20", 20)):
+        values = sma(close_arr, period)
+        kept = ~np.isnan(values)
+        indicators[name] = {
+            "timestamps": iso_array[kept].tolist(),
+            "values": values[kept].tolist(),
+        }
+
+    # For Zero Lag Trend MTF runs, compute an approximate band for charting so
+    # the frontend can render the basis and bands as overlays.
+    if engine_code == "ZeroLagTrendMtfStrategy":
+        length = int(params.get("length", 70))
+        mult = float(params.get("mult", 1.2))
+        if length > 1:
+            zlema_values, volatility_values = zero_lag_bands(
+                high_arr,
+                low_arr,
+                close_arr,
+                length=length,
+                mult=mult,
+            )
+            indicators["zl_basis"] = {
+                "timestamps": iso_timestamps,
+                "values": zlema_values.tolist(),
+            }
+            indicators["zl_upper"] = {
+                "timestamps": iso_timestamps,
+                "values": (zlema_values + volatility_values).tolist(),
+            }
+            indicators["zl_lower"] = {
+                "timestamps": iso_timestamps,
+                "values": (zlema_values - volatility_values).tolist(),
+            }
+
+    return indicators
@@ -5,7 +5,13 @@ from sqlalchemy.orm import Session
 from .config import Settings, get_settings
 from .database import Base, SessionLocal, engine, ensure_meta_schema_migrations, get_db
 from .logging_config import configure_logging
-from .prices_database import PricesBase, ensure_schema_migrations, prices_engine
+from .query_counter import QueryCountMiddleware
+from .prices_database import (
+    PricesBase,
+    PricesSessionLocal,
+    ensure_schema_migrations,
+    prices_engine,
+)
 from .routers import analytics as analytics_router
 from .routers import backtests as backtests_router
 from .routers import data as data_router
@@ -16,6 +22,7 @@ from .routers import stocks as stocks_router
 from .routers import strategies as strategies_router
 from .routers import screener as screener_router
 from .seed import seed_example_stock_groups, seed_preset_strategies
+from .services import ensure_price_coverage
 
 
 def create_app(settings: Settings | None = None) -> FastAPI:
@@ -35,6 +42,8 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     with SessionLocal() as session:
         seed_preset_strategies(session)
         seed_example_stock_groups(session)
+    with PricesSessionLocal() as prices_session:
+        ensure_price_coverage(prices_session)
 
     app = FastAPI(title=_settings.app_name)
 
@@ -50,6 +59,9 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if _settings.environment == "dev":
+        # Surface per-request SQL statement counts to catch N+1 regressions.
+        app.add_middleware(QueryCountMiddleware, engines=(engine, prices_engine))
 
     @app.get("/health")
     async def health(db: Session = Depends(get_db)) -> dict[str, str]:
@@ -14,7 +14,7 @@ from sqlalchemy import (
     String,
     Text,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 
 from .database import Base
 
@@ -103,6 +103,14 @@ class Backtest(Base):
         nullable=False,
     )
     finished_at = Column(DateTime, nullable=True)
+    # Nullable so the in-place migration can add it to existing rows; bumped
+    # on every UPDATE and used to version cached chart data.
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=True,
+    )
 
     strategy = relationship("Strategy", back_populates="backtests")
     parameters = relationship("StrategyParameter", back_populates="backtests")
@@ -114,12 +122,26 @@ class BacktestEquityPoint(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     backtest_id = Column(
-        Integer, ForeignKey("backtests.id"), nullable=False, index=True
+        Integer, ForeignKey("backtests.id", ondelete="CASCADE"), nullable=False
     )
     timestamp = Column(DateTime, nullable=False)
     equity = Column(Float, nullable=False)
 
-    backtest = relationship("Backtest", backref="equity_points")
+    # Equity curves are always read per backtest in timestamp order; the
+    # composite index returns them pre-sorted.
+    __table_args__ = (
+        Index(
+            "ix_backtest_equity_points_backtest_id_timestamp",
+            "backtest_id",
+            "timestamp",
+        ),
+    )
+
+    # Child rows are removed with bulk DELETEs (or the FK cascade), so
+    # deleting a Backtest must not load the collection first.
+    backtest = relationship(
+        "Backtest", backref=backref("equity_points", passive_deletes=True)
+    )
 
 
 class BacktestTrade(Base):
@@ -127,7 +149,10 @@ class BacktestTrade(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     backtest_id = Column(
-        Integer, ForeignKey("backtests.id"), nullable=False, index=True
+        Integer,
+        ForeignKey("backtests.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     symbol = Column(String, nullable=False)
     side = Column(String, nullable=False)  # 'long' or 'short'
@@ -152,7 +177,31 @@ class BacktestTrade(Base):
     entry_reason = Column(String, nullable=True)
     exit_reason = Column(String, nullable=True)
 
-    backtest = relationship("Backtest", backref="trades")
+    backtest = relationship("Backtest", backref=backref("trades", passive_deletes=True))
+
+
+class BacktestIndicatorSeries(Base):
+    """Chart indicator overlays computed once per backtest.
+
+    ``payload_json`` maps indicator name to columnar
+    ``{"timestamps": [...], "values": [...]}`` lists with ISO timestamps.
+    ``bar_count`` and ``last_bar_at`` fingerprint the price bars the payload
+    was computed over, so chart reads can tell when bars were refetched.
+    """
+
+    __tablename__ = "backtest_indicator_series"
+
+    backtest_id = Column(
+        Integer, ForeignKey("backtests.id", ondelete="CASCADE"), primary_key=True
+    )
+    payload_json = Column(JSON, nullable=False)
+    bar_count = Column(Integer, nullable=True)
+    last_bar_at = Column(DateTime, nullable=True)
+    created_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
 
 
 class Stock(Base):
@@ -186,6 +235,17 @@ class Stock(Base):
 
     group_memberships = relationship("StockGroupMember", back_populates="stock")
 
+    # One row per listing; imports and symbol resolution look stocks up by
+    # (symbol, exchange).
+    __table_args__ = (
+        Index(
+            "uq_stocks_symbol_exchange",
+            "symbol",
+            "exchange",
+            unique=True,
+        ),
+    )
+
 
 class FundamentalsSnapshot(Base):
     """Snapshot of fundamental metrics for a symbol as of a specific date."""
@@ -321,6 +381,12 @@ class CovarianceMatrix(Base):
     as_of_date = Column(Date, nullable=False, index=True)
     universe_hash = Column(String, nullable=False, index=True)
     matrix_blob = Column(JSON, nullable=False)
+    # Null for matrices stored before creation times were recorded.
+    created_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        nullable=True,
+    )
 
     __table_args__ = (
         Index(
@@ -356,6 +422,14 @@ class StockGroup(Base):
     )
 
     members = relationship("StockGroupMember", back_populates="group")
+    # Member stocks by symbol, read through the membership table; writes go
+    # through ``members``.
+    stocks = relationship(
+        "Stock",
+        secondary="stock_group_members",
+        order_by="Stock.symbol",
+        viewonly=True,
+    )
     backtests = relationship("Backtest", back_populates="group")
 
 
@@ -366,7 +440,9 @@ class StockGroupMember(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     group_id = Column(Integer, ForeignKey("stock_groups.id"), nullable=False)
-    stock_id = Column(Integer, ForeignKey("stocks.id"), nullable=False)
+    stock_id = Column(
+        Integer, ForeignKey("stocks.id", ondelete="CASCADE"), nullable=False
+    )
     target_weight_pct = Column(Numeric(10, 4), nullable=True)
     target_qty = Column(Numeric(20, 4), nullable=True)
     target_amount = Column(Numeric(20, 4), nullable=True)
@@ -374,6 +450,19 @@ class StockGroupMember(Base):
     group = relationship("StockGroup", back_populates="members")
     stock = relationship("Stock", back_populates="group_memberships")
 
+    # A stock is linked to a group at most once; links are inserted with
+    # ON CONFLICT DO NOTHING against this key. The stock_id index serves
+    # lookups and deletes by stock.
+    __table_args__ = (
+        Index(
+            "uq_stock_group_members_group_stock",
+            "group_id",
+            "stock_id",
+            unique=True,
+        ),
+        Index("ix_stock_group_members_stock_id", "stock_id"),
+    )
+
 
 class Portfolio(Base):
     """High-level portfolio definition built on top of the stock universe."""
@@ -412,7 +501,9 @@ class PortfolioBacktest(Base):
     __tablename__ = "portfolio_backtests"
 
     id = Column(Integer, primary_key=True, index=True)
-    portfolio_id = Column(Integer, ForeignKey("portfolios.id"), nullable=False)
+    portfolio_id = Column(
+        Integer, ForeignKey("portfolios.id", ondelete="CASCADE"), nullable=False
+    )
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=False)
     timeframe = Column(String, nullable=False)
@@ -429,7 +520,11 @@ class PortfolioBacktest(Base):
     )
     finished_at = Column(DateTime, nullable=True)
 
-    portfolio = relationship("Portfolio", backref="backtests")
+    # Runs are removed with a bulk DELETE (or the FK cascade), so deleting a
+    # Portfolio must not load the collection first.
+    portfolio = relationship(
+        "Portfolio", backref=backref("backtests", passive_deletes=True)
+    )
 
 
 class BacktestFactorExposure(Base):
@@ -524,10 +619,18 @@ class PortfolioWeight(Base):
     symbol = Column(String, nullable=False)
     weight = Column(Float, nullable=False)
 
+    # One weight per symbol in a snapshot; saves upsert against this key.
     __table_args__ = (
         Index(
             "ix_portfolio_weights_portfolio_date",
             "portfolio_id",
             "date",
         ),
+        Index(
+            "uq_portfolio_weights_portfolio_date_symbol",
+            "portfolio_id",
+            "date",
+            "symbol",
+            unique=True,
+        ),
     )
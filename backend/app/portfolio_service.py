@@ -1,11 +1,16 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import date, datetime
+from functools import partial
 from statistics import mean
 from typing import Dict, List, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session
 
 from .backtest_engine import EquityPoint
@@ -24,13 +29,13 @@ from .models import (
 )
 from .services import OptimizerService
 
+# Upper bound on concurrent per-symbol coverage checks / price loads. Each
+# worker owns its own prices-DB session; provider fetches are latency bound.
+_MAX_SYMBOL_LOAD_WORKERS = 16
 
-@dataclass
-class PortfolioEquityPoint:
-    """Lightweight equity point used internally by the portfolio engine."""
-
-    timestamp: datetime
-    equity: float
+# Largest per-name deviation from target weight that the equal-weight
+# simulator tolerates before trading on a bar.
+_REBALANCE_DRIFT_TOLERANCE = 1e-4
 
 
 class PortfolioService:
@@ -99,30 +104,29 @@ class PortfolioService:
         # Load price data for each symbol into a DataFrame, ensuring coverage
         # exists via the DataManager. For v1 we require the intersection of
         # all symbol timelines to be non-empty so that each rebalance point
-        # has prices for every active name.
-        price_data: Dict[str, pd.DataFrame] = {}
-        for symbol in symbols:
-            self._data_manager.ensure_symbol_coverage(
-                prices_db,
-                symbol=symbol,
-                timeframe=timeframe,
-                start=start,
-                end=end,
-                source="prices_db",
-            )
-            df = self._backtest_service._load_price_dataframe(  # type: ignore[attr-defined]
-                prices_db,
-                symbol=symbol,
-                timeframe=timeframe,
-                start=start,
-                end=end,
-            )
-            if df is None or df.empty:
-                msg = f"No price data available for portfolio symbol {symbol}"
-                raise ValueError(msg)
-            # Ensure index is sorted ascending.
-            df = df.sort_index()
-            price_data[symbol] = df
+        # has prices for every active name. Symbols are loaded concurrently
+        # since coverage checks may hit an external provider.
+        prices_bind = prices_db.get_bind()
+        max_workers = min(_MAX_SYMBOL_LOAD_WORKERS, len(symbols))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Each load runs in a copy of the caller's context so request-
+            # scoped state (e.g. the SQL statement counter) follows it.
+            pending = [
+                pool.submit(
+                    copy_context().run,
+                    partial(
+                        self._load_symbol_frame,
+                        prices_bind,
+                        symbol=sym,
+                        timeframe=timeframe,
+                        start=start,
+                        end=end,
+                    ),
+                )
+                for sym in symbols
+            ]
+            frames = [future.result() for future in pending]
+        price_data: Dict[str, pd.DataFrame] = dict(zip(symbols, frames, strict=True))
 
         timeline = self._compute_common_timeline(price_data.values(), start, end)
         if not timeline:
@@ -130,7 +134,8 @@ class PortfolioService:
             raise ValueError(msg)
 
         (
-            equity_curve,
+            equity_timestamps,
+            equity_values,
             utilisation_history,
             final_holdings,
             final_prices,
@@ -147,13 +152,17 @@ class PortfolioService:
             initial_capital=initial_capital,
         )
 
-        final_equity = equity_curve[-1].equity if equity_curve else initial_capital
+        final_equity = (
+            float(equity_values[-1]) if equity_values.size else initial_capital
+        )
         pnl = final_equity - initial_capital
 
         # Reuse the existing equity-metrics helper so portfolio metrics are
         # consistent with single-strategy backtests.
+        equity_list = equity_values.tolist()
         equity_points = [
-            EquityPoint(timestamp=pt.timestamp, equity=pt.equity) for pt in equity_curve
+            EquityPoint(timestamp=ts, equity=eq)
+            for ts, eq in zip(equity_timestamps, equity_list, strict=True)
         ]
         equity_metrics: Dict[str, float] = {}
         if equity_points:
@@ -167,8 +176,8 @@ class PortfolioService:
             "final_value": float(final_equity),
             "pnl": float(pnl),
             "equity_curve": [
-                {"timestamp": pt.timestamp.isoformat(), "equity": float(pt.equity)}
-                for pt in equity_curve
+                {"timestamp": ts.isoformat(), "equity": eq}
+                for ts, eq in zip(equity_timestamps, equity_list, strict=True)
             ],
             "universe_symbols": symbols,
             # In this v1 engine there are no explicit trades, so all PnL is
@@ -181,7 +190,7 @@ class PortfolioService:
         metrics.update(equity_metrics)
 
         # Simple historical CVaR (95%) based on daily equity returns.
-        cvar_95 = self._compute_cvar_95(equity_curve)
+        cvar_95 = self._compute_cvar_95(equity_values)
         if cvar_95 is not None:
             metrics["cvar_95"] = cvar_95
 
@@ -288,15 +297,15 @@ class PortfolioService:
                 msg = f"StockGroup {group_id} referenced by portfolio not found"
                 raise ValueError(msg)
             # Use an explicit join via StockGroupMember to keep ordering
-            # deterministic.
-            rows = (
-                meta_db.query(Stock)
+            # deterministic. Only the symbol column is selected so no Stock
+            # instances are materialised.
+            stmt = (
+                select(Stock.symbol)
                 .join(StockGroupMember, StockGroupMember.stock_id == Stock.id)
-                .filter(StockGroupMember.group_id == group_id)
+                .where(StockGroupMember.group_id == group_id)
                 .order_by(Stock.symbol.asc())
-                .all()
             )
-            return [row.symbol for row in rows]
+            return list(meta_db.execute(stmt).scalars().all())
 
         msg = (
             "Portfolio.universe_scope must currently be of the form 'group:<id>'. "
@@ -304,6 +313,46 @@ class PortfolioService:
         )
         raise ValueError(msg)
 
+    def _load_symbol_frame(
+        self,
+        prices_bind: Engine | Connection,
+        *,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+    ) -> pd.DataFrame:
+        """Ensure coverage for one symbol and load its sorted price frame.
+
+        Runs on a worker thread, so it uses a private session bound to the
+        caller's prices engine rather than sharing the request session.
+        """
+
+        with Session(bind=prices_bind, autoflush=False) as session:
+            self._data_manager.ensure_symbol_coverage(
+                session,
+                symbol=symbol,
+                timeframe=timeframe,
+                start=start,
+                end=end,
+                source="prices_db",
+            )
+            df = self._backtest_service._load_price_dataframe(  # type: ignore[attr-defined]
+                session,
+                symbol=symbol,
+                timeframe=timeframe,
+                start=start,
+                end=end,
+            )
+        if df is None or df.empty:
+            msg = f"No price data available for portfolio symbol {symbol}"
+            raise ValueError(msg)
+        # Ensure index is sorted ascending and unique. Duplicate inserts for
+        # the same timestamp keep the last row, so the simulators can assume
+        # one close per timestamp.
+        df = df.sort_index()
+        return df.loc[~df.index.duplicated(keep="last")]
+
     def _compute_common_timeline(
         self,
         frames: Sequence[pd.DataFrame],
@@ -328,6 +377,30 @@ class PortfolioService:
         filtered = [ts for ts in common if start <= ts <= end]
         return sorted(filtered)
 
+    @staticmethod
+    def _build_close_matrix(
+        *,
+        symbols: List[str],
+        price_data: Dict[str, pd.DataFrame],
+        timeline: List[datetime],
+    ) -> np.ndarray:
+        """Pivot per-symbol closes into a (len(timeline), len(symbols)) matrix.
+
+        Closes are stored as float32: prices carry far fewer significant
+        digits than float32 resolves, and halving the row width halves the
+        memory traffic of the per-bar reads. Callers upcast each row to
+        float64 before any cash/equity arithmetic. Frames must carry a unique
+        index (see `_load_symbol_frame`); timestamps missing for a symbol are
+        NaN.
+        """
+
+        index = pd.DatetimeIndex(timeline)
+        matrix = np.full((len(timeline), len(symbols)), np.nan, dtype=np.float32)
+        for j, sym in enumerate(symbols):
+            closes = price_data[sym]["close"]
+            matrix[:, j] = closes.reindex(index).to_numpy(dtype=np.float32)
+        return matrix
+
     def _simulate_equal_weight_portfolio(
         self,
         *,
@@ -337,7 +410,8 @@ class PortfolioService:
         initial_capital: float,
         risk_profile: Dict[str, object],
     ) -> tuple[
-        List[PortfolioEquityPoint],
+        List[datetime],
+        np.ndarray,
         List[float],
         Dict[str, float],
         Dict[str, float],
@@ -349,8 +423,8 @@ class PortfolioService:
           - Compute equal-weight target weights across the active universe,
             respecting maxPositionSizePct and maxConcurrentPositions.
           - Compute trade sizes needed to reach those weights.
-        - Returns equity curve, capital-utilisation history, final holdings,
-          and final prices for contribution analysis.
+        - Returns equity timestamps and values, capital-utilisation history,
+          final holdings, and final prices for contribution analysis.
         """
 
         max_pos_pct = float(risk_profile.get("maxPositionSizePct", 100.0))
@@ -361,58 +435,57 @@ class PortfolioService:
         holdings: Dict[str, float] = {sym: 0.0 for sym in symbols}
         cash = float(initial_capital)
 
-        equity_curve: List[PortfolioEquityPoint] = []
+        # The active set and its equal target weight depend only on the risk
+        # profile, so they are fixed for the whole timeline.
+        active_symbols = symbols[:max_positions]
+        target_weights: Dict[str, float] = {}
+        if active_symbols:
+            base_weight = 1.0 / float(len(active_symbols))
+            max_weight = max_pos_pct / 100.0
+            if base_weight > max_weight:
+                base_weight = max_weight
+            target_weights = {sym: base_weight for sym in active_symbols}
+
+        # Equity is written positionally; bars before the first priced bar
+        # stay NaN and are dropped when the curve is compacted.
+        equity_values = np.full(len(timeline), np.nan, dtype=np.float64)
         utilisation_history: List[float] = []
 
-        for ts in timeline:
+        # Both the timeline and each frame's index are sorted, so walk them
+        # with one forward cursor per symbol over the raw int64 nanosecond
+        # stamps instead of hashing a Timestamp into every frame per bar.
+        timeline_ns = pd.DatetimeIndex(timeline).asi8
+        index_ns = [pd.DatetimeIndex(price_data[sym].index).asi8 for sym in symbols]
+        close_values = [price_data[sym]["close"].to_numpy() for sym in symbols]
+        cursors = [0] * len(symbols)
+
+        for t, ts_ns in enumerate(timeline_ns):
             prices: Dict[str, float] = {}
-            for sym in symbols:
-                df = price_data[sym]
-                if ts not in df.index:
+            for k, sym in enumerate(symbols):
+                stamps = index_ns[k]
+                j = cursors[k]
+                while j < len(stamps) and stamps[j] < ts_ns:
+                    j += 1
+                cursors[k] = j
+                if j == len(stamps) or stamps[j] != ts_ns:
                     # This should not happen after computing the common
                     # timeline, but guard just in case.
                     continue
-                row = df.loc[ts]
-                # When multiple rows share the same timestamp (e.g. duplicate
-                # inserts), df.loc[ts] returns a DataFrame; fall back to the
-                # last close in that slice.
-                if hasattr(row, "iloc") and not hasattr(row, "dtype"):
-                    price = float(row["close"].iloc[-1])
-                else:
-                    price = float(row["close"])
-                prices[sym] = price
+                prices[sym] = float(close_values[k][j])
 
             # If for some reason we have no prices, carry forward equity.
             if not prices:
-                if equity_curve:
-                    equity_curve.append(
-                        PortfolioEquityPoint(
-                            timestamp=ts,
-                            equity=equity_curve[-1].equity,
-                        )
-                    )
+                if t > 0:
+                    equity_values[t] = equity_values[t - 1]
                 continue
 
             total_equity = cash + sum(holdings[sym] * prices[sym] for sym in symbols)
 
-            # Determine number of names we can hold given max_positions.
-            active_symbols = symbols[:max_positions]
             if not active_symbols:
-                equity_curve.append(
-                    PortfolioEquityPoint(timestamp=ts, equity=total_equity)
-                )
+                equity_values[t] = total_equity
                 utilisation_history.append(0.0)
                 continue
 
-            base_weight = 1.0 / float(len(active_symbols))
-            max_weight = max_pos_pct / 100.0
-            if base_weight > max_weight:
-                base_weight = max_weight
-
-            target_weights: Dict[str, float] = {
-                sym: base_weight for sym in active_symbols
-            }
-
             desired_notional: Dict[str, float] = {
                 sym: total_equity * w for sym, w in target_weights.items()
             }
@@ -420,6 +493,21 @@ class PortfolioService:
                 sym: holdings[sym] * prices[sym] for sym in symbols
             }
 
+            # Passive drift: when every name already sits within tolerance of
+            # its target weight, skip the trade block and just mark to market.
+            if total_equity > 0.0:
+                drift = max(
+                    abs(
+                        current_notional[sym] / total_equity
+                        - target_weights.get(sym, 0.0)
+                    )
+                    for sym in symbols
+                )
+                if drift < _REBALANCE_DRIFT_TOLERANCE:
+                    equity_values[t] = total_equity
+                    utilisation_history.append((total_equity - cash) / total_equity)
+                    continue
+
             # Compute share adjustments per symbol. Long-only: we never short;
             # when delta_notional is negative we reduce or close the position
             # but never flip through zero.
@@ -454,7 +542,7 @@ class PortfolioService:
 
             # Recompute equity after trades.
             total_equity = cash + sum(holdings[sym] * prices[sym] for sym in symbols)
-            equity_curve.append(PortfolioEquityPoint(timestamp=ts, equity=total_equity))
+            equity_values[t] = total_equity
 
             invested_notional = sum(holdings[sym] * prices[sym] for sym in symbols)
             utilisation = (
@@ -465,18 +553,23 @@ class PortfolioService:
         # Snapshot of final prices for contribution calculations.
         final_prices: Dict[str, float] = {}
         if timeline:
-            last_ts = timeline[-1]
-            for sym in symbols:
-                df = price_data[sym]
-                if last_ts in df.index:
-                    row = df.loc[last_ts]
-                    if hasattr(row, "iloc") and not hasattr(row, "dtype"):
-                        price = float(row["close"].iloc[-1])
-                    else:
-                        price = float(row["close"])
-                    final_prices[sym] = price
-
-        return equity_curve, utilisation_history, holdings, final_prices
+            last_ns = timeline_ns[-1]
+            for k, sym in enumerate(symbols):
+                j = cursors[k]
+                if j < len(index_ns[k]) and index_ns[k][j] == last_ns:
+                    final_prices[sym] = float(close_values[k][j])
+
+        equity_timestamps, equity_values = self._compact_equity_curve(
+            timeline,
+            equity_values,
+        )
+        return (
+            equity_timestamps,
+            equity_values,
+            utilisation_history,
+            holdings,
+            final_prices,
+        )
 
     def _build_rebalance_schedule(
         self,
@@ -616,28 +709,32 @@ class PortfolioService:
         return {s: w / total for s, w in min_zero.items()}
 
     @staticmethod
-    def _compute_cvar_95(
-        equity_curve: List[PortfolioEquityPoint],
-    ) -> float | None:
+    def _compact_equity_curve(
+        timeline: List[datetime],
+        equity_values: np.ndarray,
+    ) -> tuple[List[datetime], np.ndarray]:
+        """Drop timeline bars that never received an equity value (NaN)."""
+
+        recorded = ~np.isnan(equity_values)
+        timestamps = [ts for ts, ok in zip(timeline, recorded, strict=True) if ok]
+        return timestamps, equity_values[recorded]
+
+    @staticmethod
+    def _compute_cvar_95(equity_values: np.ndarray) -> float | None:
         """Compute simple historical CVaR (95%) from equity curve."""
 
-        if len(equity_curve) < 2:
+        if equity_values.size < 2:
             return None
 
-        returns: List[float] = []
-        for prev, curr in zip(equity_curve, equity_curve[1:], strict=False):
-            if prev.equity <= 0.0:
-                continue
-            ret = (curr.equity / prev.equity) - 1.0
-            returns.append(ret)
-
-        if not returns:
+        prev = equity_values[:-1]
+        curr = equity_values[1:]
+        valid = prev > 0.0
+        returns = np.sort(curr[valid] / prev[valid] - 1.0)
+        if returns.size == 0:
             return None
 
-        returns.sort()
-        tail_count = max(int(len(returns) * 0.05), 1)
-        tail = returns[:tail_count]
-        return float(sum(tail) / float(len(tail)))
+        tail_count = max(int(returns.size * 0.05), 1)
+        return float(returns[:tail_count].mean())
 
     def _simulate_optimised_portfolio(
         self,
@@ -650,7 +747,8 @@ class PortfolioService:
         timeline: List[datetime],
         initial_capital: float,
     ) -> tuple[
-        List[PortfolioEquityPoint],
+        List[datetime],
+        np.ndarray,
         List[float],
         Dict[str, float],
         Dict[str, float],
@@ -661,7 +759,7 @@ class PortfolioService:
         """Optimiser-driven portfolio simulation with scheduled rebalancing."""
 
         if not timeline:
-            return ([], [], {}, {}, {}, {}, [])
+            return ([], np.empty(0, dtype=np.float64), [], {}, {}, {}, {}, [])
 
         rebalance_dates = self._build_rebalance_schedule(
             timeline,
@@ -683,9 +781,31 @@ class PortfolioService:
             s.symbol: (s.sector or "Unknown") for s in stocks
         }
 
-        equity_curve: List[PortfolioEquityPoint] = []
+        # Hoist per-symbol lookups out of the timeline loop: each symbol maps
+        # to a sector index so sector weights reduce to a single bincount, and
+        # factor exposures are gathered into an (N, F) matrix per rebalance.
+        sector_names: List[str] = []
+        sector_index: Dict[str, int] = {}
+        for sym in symbols:
+            sector = sector_by_symbol.get(sym, "Unknown")
+            if sector not in sector_index:
+                sector_index[sector] = len(sector_names)
+                sector_names.append(sector)
+        sector_ids = np.array(
+            [sector_index[sector_by_symbol.get(sym, "Unknown")] for sym in symbols],
+            dtype=np.int32,
+        )
+        factor_names = ["value", "quality", "momentum", "low_vol", "size"]
+
+        close_matrix = self._build_close_matrix(
+            symbols=symbols,
+            price_data=price_data,
+            timeline=timeline,
+        )
+
+        equity_values = np.full(len(timeline), np.nan, dtype=np.float64)
         utilisation_history: List[float] = []
-        holdings: Dict[str, float] = {sym: 0.0 for sym in symbols}
+        holdings = np.zeros(len(symbols), dtype=np.float64)
         cash = float(initial_capital)
 
         factor_exposures_ts: Dict[date, Dict[str, float]] = {}
@@ -696,33 +816,22 @@ class PortfolioService:
 
         rebalance_set = set(rebalance_dates)
 
-        for ts in timeline:
-            prices: Dict[str, float] = {}
-            for sym in symbols:
-                df = price_data[sym]
-                if ts not in df.index:
-                    continue
-                row = df.loc[ts]
-                if hasattr(row, "iloc") and not hasattr(row, "dtype"):
-                    price = float(row["close"].iloc[-1])
-                else:
-                    price = float(row["close"])
-                prices[sym] = price
+        for t, ts in enumerate(timeline):
+            row = close_matrix[t].astype(np.float64)
+            available = ~np.isnan(row)
 
-            if not prices:
-                if equity_curve:
-                    equity_curve.append(
-                        PortfolioEquityPoint(
-                            timestamp=ts,
-                            equity=equity_curve[-1].equity,
-                        )
-                    )
+            if not available.any():
+                if t > 0:
+                    equity_values[t] = equity_values[t - 1]
                 continue
 
-            # Mark-to-market before any rebalance on this timestamp.
-            nav_before = cash + sum(
-                holdings[sym] * prices.get(sym, 0.0) for sym in symbols
-            )
+            prices = np.where(available, row, 0.0)
+
+            # Mark-to-market once per bar. A rebalance only moves value
+            # between cash and holdings, so NAV is unchanged by it and only
+            # the invested notional needs recomputing after trades.
+            invested_notional = float(holdings @ prices)
+            nav = cash + invested_notional
 
             if ts in rebalance_set:
                 as_of = ts.date()
@@ -764,28 +873,25 @@ class PortfolioService:
                 )
                 previous_weights = adj_weights
 
-                # Translate target weights into holdings in shares.
-                new_holdings: Dict[str, float] = {}
-                for sym in symbols:
-                    price = prices.get(sym)
-                    if price is None or price <= 0.0:
-                        new_holdings[sym] = 0.0
-                        continue
-                    w = float(adj_weights.get(sym, 0.0))
-                    notional = nav_before * w
-                    shares = notional / price
-                    new_holdings[sym] = float(shares)
+                weights_vec = np.array(
+                    [float(adj_weights.get(sym, 0.0)) for sym in symbols],
+                    dtype=float,
+                )
 
-                invested = sum(
-                    new_holdings[sym] * prices.get(sym, 0.0) for sym in symbols
+                # Translate target weights into holdings in shares.
+                tradable = prices > 0.0
+                holdings = np.divide(
+                    nav * weights_vec,
+                    prices,
+                    out=np.zeros(len(symbols), dtype=np.float64),
+                    where=tradable,
                 )
-                cash = nav_before - invested
-                holdings = new_holdings
+                invested_notional = float(holdings @ prices)
+                cash = nav - invested_notional
 
                 # Persist factor and sector exposures for this rebalance date.
                 # Factor exposures are recomputed using the final weights and
                 # stored per PRD.
-                exposures_for_date: Dict[str, float] = {}
                 rows = (
                     meta_db.query(FactorExposure)
                     .filter(
@@ -795,62 +901,60 @@ class PortfolioService:
                     .all()
                 )
                 by_symbol = {row.symbol: row for row in rows}
-                factor_names = ["value", "quality", "momentum", "low_vol", "size"]
-                for fname in factor_names:
-                    total = 0.0
-                    for sym in symbols:
-                        w = float(adj_weights.get(sym, 0.0))
-                        f_row = by_symbol.get(sym)
-                        if f_row is None:
-                            continue
+                # Missing rows or null factor values contribute nothing.
+                factor_matrix = np.zeros((len(symbols), len(factor_names)))
+                for i, sym in enumerate(symbols):
+                    f_row = by_symbol.get(sym)
+                    if f_row is None:
+                        continue
+                    for j, fname in enumerate(factor_names):
                         val = getattr(f_row, fname, None)
-                        if val is None:
-                            continue
-                        total += w * float(val)
-                    exposures_for_date[fname] = total
-                factor_exposures_ts[as_of] = exposures_for_date
-
-                sector_weights: Dict[str, float] = {}
-                for sym in symbols:
-                    sector = sector_by_symbol.get(sym, "Unknown")
-                    w = float(adj_weights.get(sym, 0.0))
-                    sector_weights[sector] = sector_weights.get(sector, 0.0) + w
-                sector_exposures_ts[as_of] = sector_weights
+                        if val is not None:
+                            factor_matrix[i, j] = float(val)
+                factor_totals = weights_vec @ factor_matrix
+                factor_exposures_ts[as_of] = {
+                    fname: float(factor_totals[j])
+                    for j, fname in enumerate(factor_names)
+                }
+
+                sector_totals = np.bincount(
+                    sector_ids,
+                    weights=weights_vec,
+                    minlength=len(sector_names),
+                )
+                sector_exposures_ts[as_of] = {
+                    sector: float(sector_totals[k])
+                    for k, sector in enumerate(sector_names)
+                }
 
                 risk_metrics_by_rebalance.append(
                     {k: float(v) for k, v in risk_metrics.items()}
                 )
 
-            # NAV after any rebalance at this timestamp.
-            nav_after = cash + sum(
-                holdings[sym] * prices.get(sym, 0.0) for sym in symbols
-            )
-            equity_curve.append(PortfolioEquityPoint(timestamp=ts, equity=nav_after))
+            equity_values[t] = nav
 
-            invested_notional = sum(
-                holdings[sym] * prices.get(sym, 0.0) for sym in symbols
-            )
-            utilisation = invested_notional / nav_after if nav_after > 0.0 else 0.0
+            utilisation = invested_notional / nav if nav > 0.0 else 0.0
             utilisation_history.append(utilisation)
 
-        # Snapshot of final prices for contribution calculations.
+        # Snapshot of final holdings and prices for contribution calculations.
+        final_holdings: Dict[str, float] = {
+            sym: float(holdings[j]) for j, sym in enumerate(symbols)
+        }
         final_prices: Dict[str, float] = {}
-        if timeline:
-            last_ts = timeline[-1]
-            for sym in symbols:
-                df = price_data[sym]
-                if last_ts in df.index:
-                    row = df.loc[last_ts]
-                    if hasattr(row, "iloc") and not hasattr(row, "dtype"):
-                        price = float(row["close"].iloc[-1])
-                    else:
-                        price = float(row["close"])
-                    final_prices[sym] = price
+        last_row = close_matrix[-1]
+        for j, sym in enumerate(symbols):
+            if not np.isnan(last_row[j]):
+                final_prices[sym] = float(last_row[j])
 
+        equity_timestamps, equity_values = self._compact_equity_curve(
+            timeline,
+            equity_values,
+        )
         return (
-            equity_curve,
+            equity_timestamps,
+            equity_values,
             utilisation_history,
-            holdings,
+            final_holdings,
             final_prices,
             factor_exposures_ts,
             sector_exposures_ts,
@@ -1,17 +1,45 @@
-from typing import Generator
+from typing import Any, Generator
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import get_prices_database_url
 
 SQLALCHEMY_PRICES_DATABASE_URL = get_prices_database_url()
 
+# Keep a pool of warm connections large enough for the portfolio engine's
+# concurrent per-symbol loads so threads reuse connections (and SQLite's
+# page cache) instead of reconnecting on every checkout. The statement cache
+# matches the meta engine's.
 prices_engine = create_engine(
     SQLALCHEMY_PRICES_DATABASE_URL,
     connect_args={"check_same_thread": False},
+    query_cache_size=1200,
+    poolclass=QueuePool,
+    pool_size=16,
+    max_overflow=8,
 )
 
+
+@event.listens_for(prices_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    """Configure each new SQLite connection for concurrent readers.
+
+    WAL lets /summary and preview reads proceed while a fetch holds the write
+    lock; NORMAL sync stays consistent in WAL mode without an fsync per
+    commit. The auto-checkpoint threshold is pinned at 1000 pages so batched
+    writers (e.g. the coverage delete) fold the log back after each commit.
+    """
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA wal_autocheckpoint=1000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 PricesSessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -38,6 +66,24 @@ def ensure_schema_migrations() -> None:
                 conn.execute(text("ALTER TABLE price_bars ADD COLUMN exchange VARCHAR"))
                 conn.commit()
 
+        # Composite (symbol, timeframe, timestamp) index serving the preview
+        # and coverage-delete range seeks; SQLite walks it backwards for
+        # ``ORDER BY timestamp DESC``. Databases created before the index was
+        # declared get it here, followed by ANALYZE so the planner prefers it
+        # over the single-column indexes.
+        indexes = {idx["name"] for idx in inspector.get_indexes("price_bars")}
+        if "ix_price_bars_symbol_timeframe_ts" not in indexes:
+            with prices_engine.connect() as conn:
+                conn.execute(
+                    text(
+                        "CREATE INDEX IF NOT EXISTS "
+                        "ix_price_bars_symbol_timeframe_ts "
+                        "ON price_bars (symbol, timeframe, timestamp)"
+                    )
+                )
+                conn.execute(text("ANALYZE price_bars"))
+                conn.commit()
+
 
 def get_prices_db() -> Generator[Session, None, None]:
     """Yield a SQLAlchemy session for the prices database."""
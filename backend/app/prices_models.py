@@ -54,3 +54,36 @@ class PriceFetch(PricesBase):
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
+
+
+class PriceBarCoverage(PricesBase):
+    """Stored price coverage per symbol, exchange, timeframe and source.
+
+    Maintained alongside ``price_bars`` by ``refresh_price_coverage`` so the
+    data summary reads one row per coverage key instead of aggregating every
+    bar; code that writes or deletes bars must call it in the same
+    transaction. ``latest_fetch_id`` points at the most recent matching
+    PriceFetch.
+    """
+
+    __tablename__ = "price_bar_coverage"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, nullable=False)
+    exchange = Column(String, nullable=True)
+    timeframe = Column(String, nullable=False)
+    source = Column(String, nullable=False)
+    start_timestamp = Column(DateTime, nullable=False)
+    end_timestamp = Column(DateTime, nullable=False)
+    bar_count = Column(Integer, nullable=False)
+    latest_fetch_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_price_bar_coverage_key",
+            "symbol",
+            "exchange",
+            "timeframe",
+            "source",
+        ),
+    )
@@ -0,0 +1,78 @@
+import logging
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Requests issuing more statements than this are logged as likely N+1 query
+# regressions (a query per row instead of one batched query).
+QUERY_COUNT_WARN_THRESHOLD = 50
+
+_request_statements: ContextVar[list[int] | None] = ContextVar(
+    "request_statements", default=None
+)
+
+
+def _count_statement(*_args: Any) -> None:
+    counter = _request_statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class QueryCountMiddleware:
+    """Count the SQL statements each HTTP request issues (development aid).
+
+    The count so far is returned in an ``X-Query-Count`` response header.
+    Headers go out before the body, so for ``StreamingResponse`` endpoints
+    (backtest equity/trades, trades CSV export, price preview) the header
+    excludes the statements run while the body streams. The full total is
+    logged once the response has been sent: at WARNING above
+    ``QUERY_COUNT_WARN_THRESHOLD``, otherwise at DEBUG.
+
+    Sync handlers run on the threadpool with a copy of the request context,
+    so statements they execute are attributed to the request that issued
+    them. Work handed to private executors must be submitted through
+    ``contextvars.copy_context().run`` to be counted.
+    """
+
+    def __init__(self, app: ASGIApp, engines: tuple[Engine, ...]) -> None:
+        self.app = app
+        for engine in engines:
+            if not event.contains(engine, "before_cursor_execute", _count_statement):
+                event.listen(engine, "before_cursor_execute", _count_statement)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = _request_statements.set(counter)
+
+        async def send_with_count(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(counter[0]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _request_statements.reset(token)
+            level = (
+                logging.WARNING
+                if counter[0] > QUERY_COUNT_WARN_THRESHOLD
+                else logging.DEBUG
+            )
+            logger.log(
+                level,
+                "%s %s issued %d SQL statements",
+                scope["method"],
+                scope["path"],
+                counter[0],
+            )
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/api/v1/analytics", tags=["Analytics"])
 
 
 @router.get("/summary/{portfolio_backtest_id}")
-async def get_portfolio_backtest_summary(
+def get_portfolio_backtest_summary(
     portfolio_backtest_id: int,
     meta_db: Session = Depends(get_db),
 ) -> dict:
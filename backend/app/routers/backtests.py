@@ -1,25 +1,37 @@
+import csv
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from datetime import datetime, time
-from typing import List
+from functools import partial
+from time import monotonic
+from typing import Any, Callable, Iterator, List, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import Row, Select, delete, func, select
+from sqlalchemy.orm import Session, aliased
 
 from ..backtest_service import BacktestService
 from ..database import get_db
+from ..indicators import chart_indicator_payload
 from ..models import (
     Backtest,
     BacktestEquityPoint,
+    BacktestIndicatorSeries,
     BacktestTrade,
     PortfolioBacktest,
-    Strategy,
 )
 from ..prices_database import get_prices_db
 from ..prices_models import PriceBar
 from ..schemas import (
     BacktestCreateRequest,
     BacktestChartDataResponse,
-    BacktestChartPriceBar,
     BacktestEquityPointRead,
     BacktestFactorExposurePoint,
     BacktestRead,
@@ -27,10 +39,94 @@ from ..schemas import (
     BacktestTradeRead,
 )
 from ..schemas_backtest_settings import BacktestSettingsUpdate
+from ..serialization import dump_json
 from ..services import AnalyticsService
 
 router = APIRouter(prefix="/api/backtests", tags=["Backtests"])
 
+# Intraday times used when a backtest request omits them: the standard India
+# cash market session of 09:15–15:30.
+_DEFAULT_SESSION_START = time(9, 15)
+_DEFAULT_SESSION_END = time(15, 30)
+
+# List adapters validate a whole result set through one compiled validator
+# instead of re-entering model_validate for every row.
+_BACKTEST_LIST_ADAPTER = TypeAdapter(List[BacktestRead])
+_FACTOR_EXPOSURE_LIST_ADAPTER = TypeAdapter(List[BacktestFactorExposurePoint])
+_SECTOR_EXPOSURE_LIST_ADAPTER = TypeAdapter(List[BacktestSectorExposurePoint])
+
+# Rows fetched and serialised per chunk by the streaming list endpoints.
+_STREAM_BATCH_SIZE = 1000
+
+# Serialised chart-data payloads kept in memory, keyed on (backtest id,
+# updated_at). Settings changes bump updated_at and so miss the cache; the
+# TTL bounds staleness when the underlying price bars are refreshed.
+_CHART_DATA_CACHE_SIZE = 32
+_CHART_DATA_CACHE_TTL_SECONDS = 300.0
+_chart_data_cache: OrderedDict[tuple[int, datetime], tuple[float, bytes]] = (
+    OrderedDict()
+)
+_chart_data_cache_lock = threading.Lock()
+
+# Trade rows written to the CSV export buffer between flushes.
+_CSV_FLUSH_ROWS = 500
+
+# Columns of BacktestEquityPointRead / BacktestTradeRead. Equity points and
+# trades come straight from typed DB columns, so read paths encode these
+# attributes directly instead of validating a response model per row.
+_EQUITY_POINT_COLUMNS = ("timestamp", "equity")
+_TRADE_COLUMNS = (
+    "id",
+    "symbol",
+    "side",
+    "size",
+    "entry_timestamp",
+    "entry_price",
+    "exit_timestamp",
+    "exit_price",
+    "pnl",
+    "pnl_pct",
+    "holding_period_bars",
+    "max_theoretical_pnl",
+    "max_theoretical_pnl_pct",
+    "pnl_capture_ratio",
+    "entry_order_type",
+    "exit_order_type",
+    "entry_brokerage",
+    "exit_brokerage",
+    "entry_reason",
+    "exit_reason",
+)
+
+
+def _get_cached_chart_data(key: tuple[int, datetime]) -> bytes | None:
+    with _chart_data_cache_lock:
+        entry = _chart_data_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, payload = entry
+        if monotonic() - stored_at > _CHART_DATA_CACHE_TTL_SECONDS:
+            del _chart_data_cache[key]
+            return None
+        _chart_data_cache.move_to_end(key)
+        return payload
+
+
+def _put_cached_chart_data(key: tuple[int, datetime], payload: bytes) -> None:
+    with _chart_data_cache_lock:
+        # Drop payloads for older versions of the same backtest.
+        for stale in [k for k in _chart_data_cache if k[0] == key[0]]:
+            del _chart_data_cache[stale]
+        _chart_data_cache[key] = (monotonic(), payload)
+        while len(_chart_data_cache) > _CHART_DATA_CACHE_SIZE:
+            _chart_data_cache.popitem(last=False)
+
+
+def _evict_cached_chart_data(backtest_id: int) -> None:
+    with _chart_data_cache_lock:
+        for stale in [k for k in _chart_data_cache if k[0] == backtest_id]:
+            del _chart_data_cache[stale]
+
 
 def _get_backtest_or_404(db: Session, backtest_id: int) -> Backtest:
     backtest = db.get(Backtest, backtest_id)
@@ -39,8 +135,422 @@ def _get_backtest_or_404(db: Session, backtest_id: int) -> Backtest:
     return backtest
 
 
+def _equity_points_stmt(
+    backtest_id: int,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    downsample: int = 1,
+    offset: int = 0,
+    limit: int | None = None,
+) -> Select[tuple[BacktestEquityPoint]]:
+    """Equity points for a backtest in timestamp order.
+
+    ``start``/``end`` bound the timestamp window, ``downsample`` keeps every
+    Nth point of that window (always including the first), and
+    ``offset``/``limit`` page through the result.
+    """
+
+    conditions = [BacktestEquityPoint.backtest_id == backtest_id]
+    if start is not None:
+        conditions.append(BacktestEquityPoint.timestamp >= start)
+    if end is not None:
+        conditions.append(BacktestEquityPoint.timestamp <= end)
+
+    if downsample > 1:
+        numbered = (
+            select(
+                BacktestEquityPoint,
+                func.row_number()
+                .over(order_by=BacktestEquityPoint.timestamp.asc())
+                .label("rn"),
+            )
+            .where(*conditions)
+            .subquery()
+        )
+        point = aliased(BacktestEquityPoint, numbered)
+        stmt = (
+            select(point)
+            .where((numbered.c.rn - 1) % downsample == 0)
+            .order_by(point.timestamp.asc())
+        )
+    else:
+        stmt = (
+            select(BacktestEquityPoint)
+            .where(*conditions)
+            .order_by(BacktestEquityPoint.timestamp.asc())
+        )
+
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _trades_stmt(
+    backtest_id: int,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    after_id: int | None = None,
+    limit: int | None = None,
+) -> Select[tuple[BacktestTrade]]:
+    """Trades for a backtest in id order.
+
+    ``start``/``end`` bound the entry timestamp; ``after_id`` and ``limit``
+    support keyset pagination (pass the last id of the previous page).
+    """
+
+    stmt = select(BacktestTrade).where(BacktestTrade.backtest_id == backtest_id)
+    if start is not None:
+        stmt = stmt.where(BacktestTrade.entry_timestamp >= start)
+    if end is not None:
+        stmt = stmt.where(BacktestTrade.entry_timestamp <= end)
+    if after_id is not None:
+        stmt = stmt.where(BacktestTrade.id > after_id)
+    stmt = stmt.order_by(BacktestTrade.id.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _stream_json_array(
+    db: Session,
+    stmt: Select[Any],
+    dump_batch: Callable[[Sequence[Any]], bytes],
+    *,
+    batch_size: int = _STREAM_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """Yield a JSON array for ``stmt`` one batch of rows at a time.
+
+    Rows are fetched with ``yield_per`` and each batch is serialised in one
+    ``dump_batch`` call, so peak memory is bounded by the batch size rather
+    than the full result set.
+    """
+
+    yield b"["
+    first = True
+    result = db.scalars(stmt, execution_options={"yield_per": batch_size})
+    for batch in result.partitions():
+        yield (b"" if first else b",") + dump_batch(batch)
+        first = False
+    yield b"]"
+
+
+def _dump_batch(adapter: TypeAdapter[Any], batch: Sequence[Any]) -> bytes:
+    """Validate and serialise a batch of ORM rows through a list adapter."""
+
+    items = adapter.validate_python(batch, from_attributes=True)
+    # Strip the enclosing brackets so batches can be concatenated.
+    return adapter.dump_json(items)[1:-1]
+
+
+def _dump_columns(columns: Sequence[str], batch: Sequence[Any]) -> bytes:
+    """Serialise the given attributes of a batch of ORM rows, unvalidated."""
+
+    rows = [{col: getattr(row, col) for col in columns} for row in batch]
+    return dump_json(rows)[1:-1]
+
+
+def _iter_trades_csv(db: Session, backtest_id: int) -> Iterator[str]:
+    """Yield the trades CSV in chunks of ``_CSV_FLUSH_ROWS`` rows."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def _flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(_TRADE_COLUMNS)
+    yield _flush()
+
+    trades = db.scalars(
+        _trades_stmt(backtest_id),
+        execution_options={"yield_per": _STREAM_BATCH_SIZE},
+    )
+    for i, t in enumerate(trades, start=1):
+        writer.writerow(
+            [
+                t.id,
+                t.symbol,
+                t.side,
+                t.size,
+                t.entry_timestamp.isoformat(),
+                t.entry_price,
+                t.exit_timestamp.isoformat(),
+                t.exit_price,
+                t.pnl,
+                t.pnl_pct,
+                t.holding_period_bars,
+                t.max_theoretical_pnl,
+                t.max_theoretical_pnl_pct,
+                t.pnl_capture_ratio,
+                t.entry_order_type,
+                t.exit_order_type,
+                t.entry_brokerage,
+                t.exit_brokerage,
+                t.entry_reason,
+                t.exit_reason,
+            ]
+        )
+        if i % _CSV_FLUSH_ROWS == 0:
+            yield _flush()
+
+    tail = _flush()
+    if tail:
+        yield tail
+
+
+def _load_chart_price_rows(
+    prices_db: Session,
+    *,
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+) -> list[Row[Any]]:
+    """Load ``(timestamp, open, high, low, close, volume)`` tuples for a window.
+
+    Only the OHLCV columns are selected so rows come back as plain tuples
+    and are sliced column-wise, without hydrating PriceBar instances.
+    """
+
+    return list(
+        prices_db.execute(
+            select(
+                PriceBar.timestamp,
+                PriceBar.open,
+                PriceBar.high,
+                PriceBar.low,
+                PriceBar.close,
+                PriceBar.volume,
+            )
+            .where(
+                PriceBar.symbol == symbol,
+                PriceBar.timeframe == timeframe,
+                PriceBar.timestamp >= start,
+                PriceBar.timestamp <= end,
+            )
+            .order_by(PriceBar.timestamp.asc())
+        ).all()
+    )
+
+
+def _load_chart_meta_rows(
+    meta_db: Session,
+    backtest_id: int,
+) -> tuple[list[BacktestEquityPoint], list[BacktestTrade]]:
+    """Load the equity points and trades stored for a backtest."""
+
+    equity_points = meta_db.scalars(_equity_points_stmt(backtest_id)).all()
+    trades = meta_db.scalars(_trades_stmt(backtest_id)).all()
+    return list(equity_points), list(trades)
+
+
+def _resolve_chart_bars(
+    prices_db: Session,
+    price_rows: list[Row[Any]],
+    *,
+    symbol: str,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+) -> tuple[
+    list[datetime],
+    list[float],
+    list[float],
+    list[float],
+    list[float],
+    list[float],
+]:
+    """Return (timestamps, opens, highs, lows, closes, volumes) columns.
+
+    ``price_rows`` are the direct-timeframe tuples from
+    ``_load_chart_price_rows``. When empty we fall back to aggregating from a
+    finer timeframe, mirroring BacktestService._load_price_dataframe.
+    """
+
+    if price_rows:
+        timestamps, opens, highs, lows, closes, volumes = (
+            list(col) for col in zip(*price_rows, strict=True)
+        )
+        return timestamps, opens, highs, lows, closes, volumes
+
+    # Attempt to aggregate from a lower timeframe (e.g. 5m -> 15m) using
+    # the same helper as the backtest engine. This allows chart-data to
+    # work even when only finer-grained data has been stored.
+    service = BacktestService()
+    df = service._aggregate_from_lower_timeframe(  # type: ignore[attr-defined]
+        prices_db=prices_db,
+        symbol=symbol,
+        target_timeframe=timeframe,
+        start=start,
+        end=end,
+    )
+    if df is None or df.empty:
+        raise HTTPException(
+            status_code=404,
+            detail="No price bars found for backtest window",
+        )
+    # Pandas returns Timestamp objects; convert to plain datetimes.
+    volumes = (
+        df["volume"].astype(float).tolist()
+        if "volume" in df.columns
+        else [0.0] * len(df)
+    )
+    return (
+        list(pd.DatetimeIndex(df.index).to_pydatetime()),
+        df["open"].astype(float).tolist(),
+        df["high"].astype(float).tolist(),
+        df["low"].astype(float).tolist(),
+        df["close"].astype(float).tolist(),
+        volumes,
+    )
+
+
+def _load_close_series(
+    prices_db: Session,
+    symbols: list[str],
+    *,
+    timeframe: str,
+    start: datetime,
+    end: datetime,
+) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    """Load sorted ``(timestamps_ns, closes)`` arrays for each symbol.
+
+    Closes for every symbol stored at ``timeframe`` come back from a single
+    query that selects only (symbol, timestamp, close). Symbols without
+    direct bars fall back to lower-timeframe aggregation, matching
+    BacktestService._load_price_dataframe.
+    """
+
+    rows = prices_db.execute(
+        select(PriceBar.symbol, PriceBar.timestamp, PriceBar.close)
+        .where(
+            PriceBar.symbol.in_(symbols),
+            PriceBar.timeframe == timeframe,
+            PriceBar.timestamp >= start,
+            PriceBar.timestamp <= end,
+        )
+        .order_by(PriceBar.symbol.asc(), PriceBar.timestamp.asc())
+    ).all()
+
+    series: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    if rows:
+        frame = pd.DataFrame(rows, columns=["symbol", "timestamp", "close"])
+        for sym, group in frame.groupby("symbol", sort=False):
+            series[str(sym)] = (
+                pd.DatetimeIndex(group["timestamp"]).asi8,
+                group["close"].to_numpy(dtype=np.float64),
+            )
+
+    missing = [sym for sym in symbols if sym not in series]
+    if missing:
+        service = BacktestService()
+        for sym in missing:
+            df = service._aggregate_from_lower_timeframe(  # type: ignore[attr-defined]
+                prices_db=prices_db,
+                symbol=sym,
+                target_timeframe=timeframe,
+                start=start,
+                end=end,
+            )
+            if df is None or df.empty:
+                continue
+            # Ensure sorted by time.
+            df = df.sort_index(kind="stable")
+            series[sym] = (
+                pd.DatetimeIndex(df.index).asi8,
+                df["close"].to_numpy(dtype=np.float64),
+            )
+    return series
+
+
+def _equal_weight_projection(
+    bar_ns: np.ndarray,
+    series: list[tuple[np.ndarray, np.ndarray]],
+    initial_capital: float,
+) -> np.ndarray:
+    """Equal-weight buy-and-hold equity per bar for a set of close series.
+
+    ``bar_ns`` holds the chart's bar timestamps as int64 nanoseconds and each
+    ``series`` entry is a sorted ``(timestamps_ns, closes)`` pair. A symbol
+    enters on the bar whose timestamp equals its first close; every entry
+    event re-slices current equity equally across the active set. Between
+    events shares are constant, so equity over each segment is a single
+    matrix-vector product against the forward-filled closes.
+    """
+
+    n_bars = bar_ns.shape[0]
+    n_syms = len(series)
+    if n_syms == 1:
+        return _buy_and_hold_projection(bar_ns, *series[0], initial_capital)
+
+    # Forward-filled last known close per (bar, symbol); NaN before a
+    # symbol's first close.
+    last_close = np.full((n_bars, n_syms), np.nan, dtype=np.float64)
+    entries = np.zeros((n_bars, n_syms), dtype=bool)
+    for k, (ts_ns, closes) in enumerate(series):
+        pos = np.searchsorted(ts_ns, bar_ns, side="right") - 1
+        seen = pos >= 0
+        last_close[seen, k] = closes[pos[seen]]
+        entries[:, k] = bar_ns == ts_ns[0]
+
+    equity = np.full(n_bars, float(initial_capital), dtype=np.float64)
+    marks = np.nan_to_num(last_close, nan=0.0)
+    active = np.zeros(n_syms, dtype=bool)
+    shares = np.zeros(n_syms, dtype=np.float64)
+    current = float(initial_capital)
+
+    event_bars = np.flatnonzero(entries.any(axis=1))
+    for i, t in enumerate(event_bars):
+        if active.any():
+            current = float(marks[t] @ shares)
+        active |= entries[t]
+        per_name_cap = current / float(active.sum())
+        priced = active & (last_close[t] > 0.0)
+        shares = np.zeros(n_syms, dtype=np.float64)
+        shares[priced] = per_name_cap / last_close[t, priced]
+
+        stop = event_bars[i + 1] if i + 1 < len(event_bars) else n_bars
+        equity[t:stop] = marks[t:stop] @ shares
+
+    return equity
+
+
+def _buy_and_hold_projection(
+    bar_ns: np.ndarray,
+    ts_ns: np.ndarray,
+    closes: np.ndarray,
+    initial_capital: float,
+) -> np.ndarray:
+    """Single-symbol case of ``_equal_weight_projection``.
+
+    With one symbol there is exactly one entry event and no rebalancing, so
+    equity is the close path scaled by ``initial_capital / entry_close``.
+    """
+
+    equity = np.full(bar_ns.shape[0], float(initial_capital), dtype=np.float64)
+    entry_bars = np.flatnonzero(bar_ns == ts_ns[0])
+    if entry_bars.size == 0:
+        return equity
+
+    start = int(entry_bars[0])
+    marks = closes[np.searchsorted(ts_ns, bar_ns[start:], side="right") - 1]
+    entry_close = float(marks[0])
+    if entry_close > 0.0:
+        equity[start:] = marks * (float(initial_capital) / entry_close)
+    else:
+        equity[start:] = 0.0
+    return equity
+
+
 @router.post("", response_model=BacktestRead, status_code=201)
-async def create_backtest(
+def create_backtest(
     payload: BacktestCreateRequest,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
@@ -50,12 +560,8 @@ async def create_backtest(
     service = BacktestService()
 
     try:
-        # If explicit intraday times are not provided, default to the standard
-        # India cash market session of 09:15–15:30.
-        default_start_time = time(9, 15)
-        default_end_time = time(15, 30)
-        start_time = payload.start_time or default_start_time
-        end_time = payload.end_time or default_end_time
+        start_time = payload.start_time or _DEFAULT_SESSION_START
+        end_time = payload.end_time or _DEFAULT_SESSION_END
 
         start_dt = datetime.combine(payload.start_date, start_time)
         end_dt = datetime.combine(payload.end_date, end_time)
@@ -143,11 +649,14 @@ async def update_backtest_settings(
 @router.get("", response_model=List[BacktestRead])
 async def list_backtests(
     meta_db: Session = Depends(get_db),
-) -> List[BacktestRead]:
+) -> StreamingResponse:
     """List backtests ordered by creation time (latest first)."""
 
-    rows = meta_db.query(Backtest).order_by(Backtest.created_at.desc()).all()
-    return [BacktestRead.model_validate(row) for row in rows]
+    stmt = select(Backtest).order_by(Backtest.created_at.desc())
+    return StreamingResponse(
+        _stream_json_array(meta_db, stmt, partial(_dump_batch, _BACKTEST_LIST_ADAPTER)),
+        media_type="application/json",
+    )
 
 
 @router.get("/{backtest_id}", response_model=BacktestRead)
@@ -162,49 +671,115 @@ async def get_backtest(
 @router.get("/{backtest_id}/equity", response_model=List[BacktestEquityPointRead])
 async def get_backtest_equity(
     backtest_id: int,
+    start: datetime | None = Query(
+        None, description="Optional start timestamp (inclusive)"
+    ),
+    end: datetime | None = Query(
+        None, description="Optional end timestamp (inclusive)"
+    ),
+    downsample: int = Query(
+        1, ge=1, description="Return every Nth point of the selected window"
+    ),
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=50000),
     meta_db: Session = Depends(get_db),
-) -> List[BacktestEquityPointRead]:
+) -> StreamingResponse:
+    """Return the equity curve, optionally windowed, thinned, and paged.
+
+    Without query parameters the full series is returned.
+    """
+
     _ = _get_backtest_or_404(meta_db, backtest_id)
-    points = (
-        meta_db.query(BacktestEquityPoint)
-        .filter(BacktestEquityPoint.backtest_id == backtest_id)
-        .order_by(BacktestEquityPoint.timestamp.asc())
-        .all()
+    stmt = _equity_points_stmt(
+        backtest_id,
+        start=start,
+        end=end,
+        downsample=downsample,
+        offset=offset,
+        limit=limit,
+    )
+    return StreamingResponse(
+        _stream_json_array(
+            meta_db, stmt, partial(_dump_columns, _EQUITY_POINT_COLUMNS)
+        ),
+        media_type="application/json",
     )
-    return [
-        BacktestEquityPointRead(timestamp=p.timestamp, equity=p.equity) for p in points
-    ]
 
 
 @router.get("/{backtest_id}/trades", response_model=List[BacktestTradeRead])
 async def get_backtest_trades(
     backtest_id: int,
+    start: datetime | None = Query(
+        None, description="Optional earliest entry timestamp (inclusive)"
+    ),
+    end: datetime | None = Query(
+        None, description="Optional latest entry timestamp (inclusive)"
+    ),
+    after_id: int | None = Query(
+        None, description="Return trades with an id greater than this one"
+    ),
+    limit: int | None = Query(None, ge=1, le=50000),
     meta_db: Session = Depends(get_db),
-) -> List[BacktestTradeRead]:
+) -> StreamingResponse:
+    """Return trades, optionally filtered by entry time and keyset-paged.
+
+    Without query parameters all trades are returned.
+    """
+
     _ = _get_backtest_or_404(meta_db, backtest_id)
-    trades = (
-        meta_db.query(BacktestTrade)
-        .filter(BacktestTrade.backtest_id == backtest_id)
-        .order_by(BacktestTrade.id.asc())
-        .all()
+    stmt = _trades_stmt(
+        backtest_id,
+        start=start,
+        end=end,
+        after_id=after_id,
+        limit=limit,
+    )
+    return StreamingResponse(
+        _stream_json_array(meta_db, stmt, partial(_dump_columns, _TRADE_COLUMNS)),
+        media_type="application/json",
     )
-    return [BacktestTradeRead.model_validate(t) for t in trades]
 
 
 @router.get("/{backtest_id}/chart-data", response_model=BacktestChartDataResponse)
-async def get_backtest_chart_data(
+def get_backtest_chart_data(
     backtest_id: int,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
-) -> BacktestChartDataResponse:
+) -> Response:
     """Return aggregated chart data for a backtest.
 
     This includes price bars, basic indicators, equity curve, a simple
-    projection curve, and enriched trades suitable for charting.
+    projection curve, and enriched trades suitable for charting. The
+    serialised payload is cached per backtest version (``updated_at``), so
+    repeat views skip the queries, indicator maths, and serialisation.
     """
 
+    # The strategy is not eager-loaded: its engine code only matters when
+    # the stored indicators are missing or stale, and the lazy load then
+    # costs one primary-key lookup.
     backtest = _get_backtest_or_404(meta_db, backtest_id)
 
+    key = (backtest.id, backtest.updated_at or backtest.created_at)
+    payload = _get_cached_chart_data(key)
+    if payload is None:
+        payload = _build_chart_data(backtest, meta_db=meta_db, prices_db=prices_db)
+        _put_cached_chart_data(key, payload)
+    return Response(content=payload, media_type="application/json")
+
+
+def _build_chart_data(
+    backtest: Backtest,
+    *,
+    meta_db: Session,
+    prices_db: Session,
+) -> bytes:
+    """Compute the serialised chart-data response for a loaded backtest.
+
+    The payload is assembled from plain dicts and lists that already carry
+    the BacktestChartDataResponse types, and is encoded to JSON in one pass
+    without building per-point response models.
+    """
+
     if not backtest.symbols_json:
         raise HTTPException(
             status_code=400,
@@ -212,210 +787,86 @@ async def get_backtest_chart_data(
         )
     symbol = backtest.symbols_json[0]
 
-    # Load price bars for the backtest window. When no rows exist for the
+    # Price bars (prices DB) and equity/trades (meta DB) are independent, so
+    # the price load runs on a worker thread while this thread loads the meta
+    # rows, in a copy of this request's context so its statements are still
+    # counted. Each session is only used by one thread at a time: prices_db
+    # is handed back once the worker has finished. When no bars exist for the
     # recorded timeframe we fall back to aggregating from a finer timeframe,
     # mirroring BacktestService._load_price_dataframe.
-    price_rows = (
-        prices_db.query(PriceBar)
-        .filter(
-            PriceBar.symbol == symbol,
-            PriceBar.timeframe == backtest.timeframe,
-            PriceBar.timestamp >= backtest.start_date,
-            PriceBar.timestamp <= backtest.end_date,
-        )
-        .order_by(PriceBar.timestamp.asc())
-        .all()
-    )
-
-    price_bars: list[BacktestChartPriceBar] = []
-    closes: list[float] = []
-    timestamps: list[datetime] = []
-
-    if price_rows:
-        for row in price_rows:
-            price_bars.append(
-                BacktestChartPriceBar(
-                    timestamp=row.timestamp,
-                    open=row.open,
-                    high=row.high,
-                    low=row.low,
-                    close=row.close,
-                    volume=row.volume,
-                )
-            )
-            closes.append(row.close)
-            timestamps.append(row.timestamp)
-    else:
-        # Attempt to aggregate from a lower timeframe (e.g. 5m -> 15m) using
-        # the same helper as the backtest engine. This allows chart-data to
-        # work even when only finer-grained data has been stored.
-        service = BacktestService()
-        df = service._aggregate_from_lower_timeframe(  # type: ignore[attr-defined]
-            prices_db=prices_db,
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        price_future = pool.submit(
+            copy_context().run,
+            _load_chart_price_rows,
+            prices_db,
             symbol=symbol,
-            target_timeframe=backtest.timeframe,
+            timeframe=backtest.timeframe,
             start=backtest.start_date,
             end=backtest.end_date,
         )
-        if df is None or df.empty:
-            raise HTTPException(
-                status_code=404,
-                detail="No price bars found for backtest window",
-            )
-        for ts, row in df.iterrows():
-            # Pandas may return Timestamp objects; convert to plain datetime.
-            ts_dt = ts.to_pydatetime() if hasattr(ts, "to_pydatetime") else ts
-            o = float(row["open"])
-            h = float(row["high"])
-            low_val = float(row["low"])
-            c = float(row["close"])
-            v = float(row.get("volume", 0.0))
-            price_bars.append(
-                BacktestChartPriceBar(
-                    timestamp=ts_dt,
-                    open=o,
-                    high=h,
-                    low=low_val,
-                    close=c,
-                    volume=v,
-                )
-            )
-            closes.append(c)
-            timestamps.append(ts_dt)
-
-    indicators: dict[str, List[dict[str, datetime | float]]] = {}
-
-    def _sma(series: List[float], period: int) -> List[float | None]:
-        out: List[float | None] = []
-        window_sum = 0.0
-        for i, v in enumerate(series):
-            window_sum += v
-            if i >= period:
-                window_sum -= series[i - period]
-            if i >= period - 1 and period > 0:
-                out.append(window_sum / float(period))
-            else:
-                out.append(None)
-        return out
-
-    # Default indicators: fast/slow SMA on close.
-    sma_fast = _sma(closes, 5)
-    sma_slow = _sma(closes, 20)
-    indicators["sma_5"] = [
-        {"timestamp": ts, "value": val}
-        for ts, val in zip(timestamps, sma_fast, strict=False)
-        if val is not None
-    ]
-    indicators["sma_20"] = [
-        {"timestamp": ts, "value": val}
-        for ts, val in zip(timestamps, sma_slow, strict=False)
-        if val is not None
+        equity_points, trades = _load_chart_meta_rows(meta_db, backtest.id)
+        price_rows = price_future.result()
+
+    timestamps, opens, highs, lows, closes, volumes = _resolve_chart_bars(
+        prices_db,
+        price_rows,
+        symbol=symbol,
+        timeframe=backtest.timeframe,
+        start=backtest.start_date,
+        end=backtest.end_date,
+    )
+
+    # Response rows are built as plain dicts in the response schema's shape.
+    price_bars: list[dict[str, Any]] = [
+        {
+            "timestamp": ts,
+            "open": o,
+            "high": h,
+            "low": low_val,
+            "close": c,
+            "volume": v,
+        }
+        for ts, o, h, low_val, c, v in zip(
+            timestamps, opens, highs, lows, closes, volumes, strict=True
+        )
     ]
 
-    # For Zero Lag Trend MTF runs, compute an approximate band for charting so
-    # the frontend can render the basis and bands as overlays.
-    strategy = meta_db.get(Strategy, backtest.strategy_id)
-    engine_code = strategy.engine_code if strategy is not None else None
-    params_effective = backtest.params_effective_json or {}
-
-    if engine_code == "ZeroLagTrendMtfStrategy":
-        length = int(params_effective.get("length", 70))
-        mult = float(params_effective.get("mult", 1.2))
-        if length > 1:
-            lag = max((length - 1) // 2, 1)
-            zlema_values: List[float] = []
-            volatility_values: List[float] = []
-            atr_values: List[float] = []
-
-            prev_close: float | None = None
-            for row in price_rows:
-                high = float(row.high)
-                low = float(row.low)
-                close_price = float(row.close)
-                if prev_close is None:
-                    tr = high - low
-                else:
-                    tr = max(
-                        high - low,
-                        abs(high - prev_close),
-                        abs(low - prev_close),
-                    )
-                atr_values.append(tr)
-                prev_close = close_price
-
-            atr_smoothed: List[float | None] = []
-            atr_sum = 0.0
-            for i, tr in enumerate(atr_values):
-                atr_sum += tr
-                if i >= length:
-                    atr_sum -= atr_values[i - length]
-                if i >= length - 1:
-                    atr_smoothed.append(atr_sum / float(length))
-                else:
-                    atr_smoothed.append(None)
-
-            highest_window = length * 3
-            for i, close_price in enumerate(closes):
-                if i >= lag:
-                    src_lag = closes[i - lag]
-                else:
-                    src_lag = close_price
-                de_lagged = close_price + (close_price - src_lag)
-
-                if i == 0:
-                    z = de_lagged
-                else:
-                    prev = zlema_values[-1]
-                    alpha = 2.0 / (length + 1.0)
-                    z = alpha * de_lagged + (1.0 - alpha) * prev
-                zlema_values.append(z)
-
-                if i >= highest_window - 1:
-                    window = [
-                        v
-                        for v in atr_smoothed[i - highest_window + 1 : i + 1]
-                        if v is not None
-                    ]
-                    highest = max(window) if window else 0.0
-                else:
-                    highest = 0.0
-                volatility_values.append(highest * mult)
-
-            indicators["zl_basis"] = [
-                {"timestamp": ts, "value": z}
-                for ts, z in zip(timestamps, zlema_values, strict=False)
-            ]
-            indicators["zl_upper"] = [
-                {"timestamp": ts, "value": z + v}
-                for ts, z, v in zip(
-                    timestamps, zlema_values, volatility_values, strict=False
-                )
-            ]
-            indicators["zl_lower"] = [
-                {"timestamp": ts, "value": z - v}
-                for ts, z, v in zip(
-                    timestamps, zlema_values, volatility_values, strict=False
-                )
-            ]
+    # Indicators are computed once when the backtest is created, together
+    # with the bar count and last bar they were computed over. When the bars
+    # have since been refetched or deleted (or for older backtests without a
+    # stored row) they are recomputed from the bars loaded above.
+    stored = meta_db.get(BacktestIndicatorSeries, backtest.id)
+    if (
+        stored is not None
+        and stored.bar_count == len(timestamps)
+        and stored.last_bar_at == timestamps[-1]
+    ):
+        indicator_columns = stored.payload_json
+    else:
+        strategy = backtest.strategy
+        indicator_columns = chart_indicator_payload(
+            timestamps=timestamps,
+            highs=highs,
+            lows=lows,
+            closes=closes,
+            engine_code=strategy.engine_code if strategy is not None else None,
+            params=backtest.params_effective_json or {},
+        )
+    # IndicatorPoint-shaped lists are built once, here, and passed straight
+    # to the payload. Stored timestamps are already ISO strings, which is
+    # how datetimes serialise.
+    indicators = {
+        name: [
+            {"timestamp": ts, "value": val}
+            for ts, val in zip(series["timestamps"], series["values"], strict=True)
+        ]
+        for name, series in indicator_columns.items()
+    }
 
-    equity_points = (
-        meta_db.query(BacktestEquityPoint)
-        .filter(BacktestEquityPoint.backtest_id == backtest_id)
-        .order_by(BacktestEquityPoint.timestamp.asc())
-        .all()
-    )
     equity_curve = [
-        BacktestEquityPointRead(timestamp=p.timestamp, equity=p.equity)
-        for p in equity_points
+        {col: getattr(p, col) for col in _EQUITY_POINT_COLUMNS} for p in equity_points
     ]
 
-    trades = (
-        meta_db.query(BacktestTrade)
-        .filter(BacktestTrade.backtest_id == backtest_id)
-        .order_by(BacktestTrade.id.asc())
-        .all()
-    )
-
     # Group benchmark / portfolio curve: equal-weight buy-and-hold of the
     # backtest's symbol set, starting from initial capital. For multi-symbol
     # (group) backtests, we:
@@ -424,132 +875,50 @@ async def get_backtest_chart_data(
     #   weights across the expanded active set using current portfolio equity.
     # For single-symbol backtests, this reduces to a simple buy-and-hold of
     # that symbol.
-    projection_curve: List[BacktestEquityPointRead] = []
+    projection_curve: list[dict[str, Any]] = []
     initial_capital = backtest.initial_capital
 
-    service = BacktestService()
-
     symbols_for_index = list(backtest.symbols_json or [symbol])
+    series_by_symbol = _load_close_series(
+        prices_db,
+        symbols_for_index,
+        timeframe=backtest.timeframe,
+        start=backtest.start_date,
+        end=backtest.end_date,
+    )
+    close_series = [
+        series_by_symbol[sym] for sym in symbols_for_index if sym in series_by_symbol
+    ]
 
-    # Load close series per symbol using the same helper as the engine so
-    # timeframe aggregation behaviour is consistent.
-    series_by_symbol: dict[str, list[tuple[datetime, float]]] = {}
-    for sym in symbols_for_index:
-        df = service._load_price_dataframe(  # type: ignore[attr-defined]
-            prices_db=prices_db,
-            symbol=sym,
-            timeframe=backtest.timeframe,
-            start=backtest.start_date,
-            end=backtest.end_date,
+    if close_series and price_bars:
+        bar_ns = pd.DatetimeIndex(timestamps).asi8
+        projected = _equal_weight_projection(
+            bar_ns,
+            close_series,
+            float(initial_capital),
         )
-        if df is None or df.empty:
-            continue
-        closes_series = df["close"].astype(float)
-        points: list[tuple[datetime, float]] = []
-        for ts_idx, close_val in closes_series.items():
-            ts_dt = (
-                ts_idx.to_pydatetime() if hasattr(ts_idx, "to_pydatetime") else ts_idx
-            )
-            points.append((ts_dt, float(close_val)))
-        if points:
-            # Ensure sorted by time.
-            points.sort(key=lambda x: x[0])
-            series_by_symbol[sym] = points
-
-    if series_by_symbol and price_bars:
-        # Track per-symbol iterators and last known closes.
-        pos_by_symbol: dict[str, int] = {s: 0 for s in series_by_symbol}
-        last_close: dict[str, float] = {}
-        first_seen: dict[str, datetime] = {
-            s: series[0][0] for s, series in series_by_symbol.items()
-        }
-
-        active_symbols: set[str] = set()
-        shares: dict[str, float] = {}
-        equity = float(initial_capital)
-
-        for bar in price_bars:
-            ts = bar.timestamp
-
-            # Advance each symbol's iterator up to this timestamp and keep
-            # track of its latest close.
-            for sym, series in series_by_symbol.items():
-                idx = pos_by_symbol[sym]
-                while idx < len(series) and series[idx][0] <= ts:
-                    last_close[sym] = series[idx][1]
-                    idx += 1
-                pos_by_symbol[sym] = idx
-
-            # New entrants are symbols whose first bar is at this timestamp.
-            new_symbols = [
-                sym for sym, first_ts in first_seen.items() if first_ts == ts
-            ]
-
-            if not active_symbols and new_symbols:
-                # Initial allocation across the first active set.
-                active_symbols.update(new_symbols)
-                if active_symbols:
-                    per_name_cap = equity / float(len(active_symbols))
-                    shares = {
-                        sym: per_name_cap / last_close[sym]
-                        for sym in active_symbols
-                        if sym in last_close and last_close[sym] > 0.0
-                    }
-            elif new_symbols:
-                # Rebalance when late entrants appear: compute current equity
-                # using latest closes, then re-slice equally across the
-                # expanded active set.
-                if active_symbols:
-                    equity = sum(
-                        shares.get(sym, 0.0) * last_close.get(sym, 0.0)
-                        for sym in active_symbols
-                    )
-                active_symbols.update(new_symbols)
-                if active_symbols:
-                    per_name_cap = equity / float(len(active_symbols))
-                    shares = {
-                        sym: per_name_cap / last_close[sym]
-                        for sym in active_symbols
-                        if sym in last_close and last_close[sym] > 0.0
-                    }
-
-            # Compute benchmark equity at this timestamp.
-            if active_symbols:
-                equity = sum(
-                    shares.get(sym, 0.0) * last_close.get(sym, 0.0)
-                    for sym in active_symbols
-                )
-            else:
-                equity = float(initial_capital)
-
-            projection_curve.append(
-                BacktestEquityPointRead(timestamp=ts, equity=equity)
-            )
+        projection_curve = [
+            {"timestamp": ts, "equity": equity}
+            for ts, equity in zip(timestamps, projected.tolist(), strict=True)
+        ]
     else:
         # Fallback: no series available; keep a flat projection at initial capital.
         projection_curve = [
-            BacktestEquityPointRead(
-                timestamp=p.timestamp,
-                equity=float(initial_capital),
-            )
+            {"timestamp": p.timestamp, "equity": float(initial_capital)}
             for p in equity_points
         ]
 
-    # Adapt indicators dict to IndicatorPoint lists for the response model.
-    indicator_series = {
-        name: [
-            {"timestamp": item["timestamp"], "value": item["value"]} for item in series
-        ]
-        for name, series in indicators.items()
-    }
-
-    return BacktestChartDataResponse(
-        backtest=BacktestRead.model_validate(backtest),
-        price_bars=price_bars,
-        indicators=indicator_series,
-        equity_curve=equity_curve,
-        projection_curve=projection_curve,
-        trades=[BacktestTradeRead.model_validate(t) for t in trades],
+    return dump_json(
+        {
+            "backtest": BacktestRead.model_validate(backtest),
+            "price_bars": price_bars,
+            "indicators": indicators,
+            "equity_curve": equity_curve,
+            "projection_curve": projection_curve,
+            "trades": [
+                {col: getattr(t, col) for col in _TRADE_COLUMNS} for t in trades
+            ],
+        }
     )
 
 
@@ -568,7 +937,7 @@ async def get_backtest_factor_exposures(
         raise HTTPException(status_code=404, detail="Backtest not found")
     service = AnalyticsService()
     items = service.get_factor_exposures(meta_db, backtest_id=backtest_id)
-    return [BacktestFactorExposurePoint.model_validate(item) for item in items]
+    return _FACTOR_EXPOSURE_LIST_ADAPTER.validate_python(items)
 
 
 @router.get(
@@ -586,7 +955,7 @@ async def get_backtest_sector_exposures(
         raise HTTPException(status_code=404, detail="Backtest not found")
     service = AnalyticsService()
     items = service.get_sector_exposures(meta_db, backtest_id=backtest_id)
-    return [BacktestSectorExposurePoint.model_validate(item) for item in items]
+    return _SECTOR_EXPOSURE_LIST_ADAPTER.validate_python(items)
 
 
 @router.get("/{backtest_id}/trades/export")
@@ -597,75 +966,13 @@ async def export_backtest_trades_csv(
     """Export backtest trades as CSV."""
 
     _ = _get_backtest_or_404(meta_db, backtest_id)
-    trades = (
-        meta_db.query(BacktestTrade)
-        .filter(BacktestTrade.backtest_id == backtest_id)
-        .order_by(BacktestTrade.id.asc())
-        .all()
-    )
-
-    import csv
-    import io
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(
-        [
-            "id",
-            "symbol",
-            "side",
-            "size",
-            "entry_timestamp",
-            "entry_price",
-            "exit_timestamp",
-            "exit_price",
-            "pnl",
-            "pnl_pct",
-            "holding_period_bars",
-            "max_theoretical_pnl",
-            "max_theoretical_pnl_pct",
-            "pnl_capture_ratio",
-            "entry_order_type",
-            "exit_order_type",
-            "entry_brokerage",
-            "exit_brokerage",
-            "entry_reason",
-            "exit_reason",
-        ]
-    )
-    for t in trades:
-        writer.writerow(
-            [
-                t.id,
-                t.symbol,
-                t.side,
-                t.size,
-                t.entry_timestamp.isoformat(),
-                t.entry_price,
-                t.exit_timestamp.isoformat(),
-                t.exit_price,
-                t.pnl,
-                t.pnl_pct,
-                t.holding_period_bars,
-                t.max_theoretical_pnl,
-                t.max_theoretical_pnl_pct,
-                t.pnl_capture_ratio,
-                t.entry_order_type,
-                t.exit_order_type,
-                t.entry_brokerage,
-                t.exit_brokerage,
-                t.entry_reason,
-                t.exit_reason,
-            ]
-        )
 
-    output.seek(0)
     filename = f"backtest_{backtest_id}_trades.csv"
     headers = {
         "Content-Disposition": f'attachment; filename="{filename}"',
     }
     return StreamingResponse(
-        iter([output.getvalue()]),
+        _iter_trades_csv(meta_db, backtest_id),
         media_type="text/csv",
         headers=headers,
     )
@@ -681,14 +988,25 @@ async def delete_backtest(
     backtest = _get_backtest_or_404(meta_db, backtest_id)
 
     # Remove child rows first to avoid foreign key issues.
-    meta_db.query(BacktestEquityPoint).filter(
-        BacktestEquityPoint.backtest_id == backtest.id
-    ).delete(synchronize_session=False)
-    meta_db.query(BacktestTrade).filter(
-        BacktestTrade.backtest_id == backtest.id
-    ).delete(synchronize_session=False)
+    meta_db.execute(
+        delete(BacktestEquityPoint).where(
+            BacktestEquityPoint.backtest_id == backtest.id
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    meta_db.execute(
+        delete(BacktestTrade).where(BacktestTrade.backtest_id == backtest.id),
+        execution_options={"synchronize_session": False},
+    )
+    meta_db.execute(
+        delete(BacktestIndicatorSeries).where(
+            BacktestIndicatorSeries.backtest_id == backtest.id
+        ),
+        execution_options={"synchronize_session": False},
+    )
 
     meta_db.delete(backtest)
     meta_db.commit()
+    _evict_cached_chart_data(backtest_id)
 
     return Response(status_code=204)
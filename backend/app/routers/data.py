@@ -1,47 +1,218 @@
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, time as time_cls, timedelta, timezone
-from typing import List
+from functools import lru_cache
+from typing import Any, Iterator, List
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_, func
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, delete, func, select
 from sqlalchemy.orm import Session
 
 from ..config import get_settings
 from ..database import get_db
 from ..models import Stock, StockGroup, StockGroupMember
-from ..prices_database import get_prices_db
-from ..prices_models import PriceBar, PriceFetch
+from ..prices_database import PricesSessionLocal, get_prices_db
+from ..prices_models import PriceBar, PriceBarCoverage, PriceFetch
 from ..schemas import (
+    DataFetchJob,
     DataFetchRequest,
     DataFetchResponse,
     DataSummaryItem,
     PriceBarPreview,
 )
-from ..services import DataService, ProviderUnavailableError
+from ..serialization import dump_json, if_none_match
+from ..services import (
+    DataService,
+    ProviderUnavailableError,
+    refresh_price_coverage,
+)
 
+# Handlers are plain ``def`` functions: their SQLAlchemy sessions and
+# provider calls block, so FastAPI runs them on its worker threadpool rather
+# than on the event loop.
 router = APIRouter(prefix="/api/data", tags=["Data"])
 
+# Price bars removed per transaction by the coverage delete endpoint.
+_DELETE_BATCH_SIZE = 10_000
+
+# Session window applied when a fetch request omits start/end times.
+_DEFAULT_START_TIME = time_cls(9, 15)
+_DEFAULT_END_TIME = time_cls(15, 30)
+
+# Preview rows fetched and serialised per streamed chunk.
+_PREVIEW_BATCH_SIZE = 500
+
+# Last encoded /summary payload and the ETag it was built for.
+_summary_cache: tuple[str, bytes] | None = None
+_summary_cache_lock = threading.Lock()
+
+# Background fetch jobs by id, oldest first; only the most recent are kept.
+_FETCH_JOBS_KEPT = 100
+_fetch_jobs: OrderedDict[str, DataFetchJob] = OrderedDict()
+_fetch_jobs_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_data_service() -> DataService:
+    """Return the process-wide DataService built from the app settings."""
+
+    settings = get_settings()
+    return DataService(
+        kite_api_key=settings.kite_api_key,
+        kite_access_token=settings.kite_access_token,
+    )
+
 
 @router.post("/fetch", response_model=DataFetchResponse)
-async def fetch_data(
+def fetch_data(
     payload: DataFetchRequest,
     prices_db: Session = Depends(get_prices_db),
     meta_db: Session = Depends(get_db),
+    service: DataService = Depends(get_data_service),
 ) -> DataFetchResponse:
-    settings = get_settings()
-    service = DataService(
-        kite_api_key=settings.kite_api_key,
-        kite_access_token=settings.kite_access_token,
+    summary_symbol, symbols = _resolve_fetch_targets(payload, meta_db)
+    try:
+        total_bars = _run_fetch(service, prices_db, payload, symbols)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except ProviderUnavailableError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    return DataFetchResponse(
+        symbol=summary_symbol,
+        timeframe=payload.timeframe,
+        start_date=payload.start_date,
+        end_date=payload.end_date,
+        source=payload.source,
+        bars_written=total_bars,
+    )
+
+
+@router.post("/fetch/jobs", response_model=DataFetchJob, status_code=202)
+def submit_fetch_job(
+    payload: DataFetchRequest,
+    background_tasks: BackgroundTasks,
+    meta_db: Session = Depends(get_db),
+    service: DataService = Depends(get_data_service),
+) -> DataFetchJob:
+    """Queue a data fetch to run after the response is sent.
+
+    Group and universe fetches can take longer than a gateway timeout when
+    run inline; clients submit them here and poll ``/fetch/jobs/{job_id}``.
+    Targets are resolved up front so invalid requests still fail fast.
+    """
+
+    summary_symbol, symbols = _resolve_fetch_targets(payload, meta_db)
+    job = DataFetchJob(
+        job_id=uuid4().hex,
+        status="pending",
+        symbol=summary_symbol,
+        timeframe=payload.timeframe,
+        start_date=payload.start_date,
+        end_date=payload.end_date,
+        source=payload.source,
+        symbols_requested=len(symbols),
     )
+    _store_fetch_job(job)
+    background_tasks.add_task(_run_fetch_job, job.job_id, service, payload, symbols)
+    return job
+
+
+@router.get("/fetch/jobs/{job_id}", response_model=DataFetchJob)
+def get_fetch_job(job_id: str) -> DataFetchJob:
+    """Return the current status of a background data fetch."""
+
+    with _fetch_jobs_lock:
+        job = _fetch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Fetch job not found")
+    return job
 
-    default_start_time = time_cls(9, 15)
-    default_end_time = time_cls(15, 30)
-    start_time = payload.start_time or default_start_time
-    end_time = payload.end_time or default_end_time
 
-    start_dt = datetime.combine(payload.start_date, start_time)
-    end_dt = datetime.combine(payload.end_date, end_time)
+def _resolve_fetch_targets(
+    payload: DataFetchRequest, meta_db: Session
+) -> tuple[str, list[tuple[str, str | None]]]:
+    """Return the summary label and ``(symbol, exchange)`` pairs to fetch."""
 
-    def _fetch_for_symbol(symbol: str, exchange: str) -> int:
+    if payload.target == "symbol":
+        # Standard single-symbol fetch.
+        return payload.symbol, [(payload.symbol, payload.exchange)]
+
+    if payload.target == "group":
+        if payload.group_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail="group_id is required when target='group'",
+            )
+        group = meta_db.get(StockGroup, payload.group_id)
+        if group is None:
+            raise HTTPException(status_code=404, detail="Stock group not found")
+
+        memberships = (
+            meta_db.query(StockGroupMember)
+            .filter(StockGroupMember.group_id == group.id)
+            .all()
+        )
+        member_ids = [m.stock_id for m in memberships]
+        if not member_ids:
+            raise HTTPException(
+                status_code=400,
+                detail="Selected stock group has no members to fetch data for",
+            )
+        stocks = (
+            meta_db.query(Stock)
+            .filter(Stock.id.in_(member_ids))  # type: ignore[arg-type]
+            .all()
+        )
+        return group.code, [(stock.symbol, stock.exchange) for stock in stocks]
+
+    if payload.target == "universe":
+        # Fetch for the entire active stock universe.
+        stocks = (
+            meta_db.query(Stock)
+            .filter(Stock.is_active.is_(True))
+            .order_by(Stock.symbol.asc())
+            .all()
+        )
+        if not stocks:
+            raise HTTPException(
+                status_code=400,
+                detail="No active stocks in the universe to fetch data for",
+            )
+        return "UNIVERSE", [(stock.symbol, stock.exchange) for stock in stocks]
+
+    raise HTTPException(
+        status_code=400,
+        detail=f"Unsupported fetch target: {payload.target}",
+    )
+
+
+def _run_fetch(
+    service: DataService,
+    prices_db: Session,
+    payload: DataFetchRequest,
+    symbols: list[tuple[str, str | None]],
+) -> int:
+    """Fetch and store bars for ``symbols``; return the bars written."""
+
+    start_dt = datetime.combine(
+        payload.start_date, payload.start_time or _DEFAULT_START_TIME
+    )
+    end_dt = datetime.combine(payload.end_date, payload.end_time or _DEFAULT_END_TIME)
+
+    if payload.target == "symbol":
+        symbol, exchange = symbols[0]
         return service.fetch_and_store_bars(
             prices_db,
             symbol=symbol,
@@ -53,113 +224,154 @@ async def fetch_data(
             exchange=exchange,
         )
 
-    total_bars = 0
-    summary_symbol: str
-
-    try:
-        if payload.target == "symbol":
-            # Standard single-symbol fetch.
-            summary_symbol = payload.symbol
-            total_bars += _fetch_for_symbol(payload.symbol, payload.exchange)
-        elif payload.target == "group":
-            if payload.group_id is None:
-                raise HTTPException(
-                    status_code=400,
-                    detail="group_id is required when target='group'",
-                )
-            group = meta_db.get(StockGroup, payload.group_id)
-            if group is None:
-                raise HTTPException(status_code=404, detail="Stock group not found")
-
-            memberships = (
-                meta_db.query(StockGroupMember)
-                .filter(StockGroupMember.group_id == group.id)
-                .all()
-            )
-            member_ids = [m.stock_id for m in memberships]
-            if not member_ids:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Selected stock group has no members to fetch data for",
-                )
-            stocks = (
-                meta_db.query(Stock)
-                .filter(Stock.id.in_(member_ids))  # type: ignore[arg-type]
-                .all()
-            )
-            summary_symbol = group.code
-            for stock in stocks:
-                total_bars += _fetch_for_symbol(stock.symbol, stock.exchange)
-        elif payload.target == "universe":
-            # Fetch for the entire active stock universe.
-            stocks = (
-                meta_db.query(Stock)
-                .filter(Stock.is_active.is_(True))
-                .order_by(Stock.symbol.asc())
-                .all()
-            )
-            if not stocks:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No active stocks in the universe to fetch data for",
-                )
-            summary_symbol = "UNIVERSE"
-            for stock in stocks:
-                total_bars += _fetch_for_symbol(stock.symbol, stock.exchange)
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Unsupported fetch target: {payload.target}",
-            )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    except ProviderUnavailableError as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
-
-    return DataFetchResponse(
-        symbol=summary_symbol,
+    # Provider calls for group/universe fetches run concurrently.
+    return service.fetch_and_store_symbols(
+        prices_db,
+        symbols=symbols,
         timeframe=payload.timeframe,
-        start_date=payload.start_date,
-        end_date=payload.end_date,
+        start=start_dt,
+        end=end_dt,
         source=payload.source,
-        bars_written=total_bars,
+        csv_path=payload.csv_path,
     )
 
 
+def _store_fetch_job(job: DataFetchJob) -> None:
+    with _fetch_jobs_lock:
+        _fetch_jobs[job.job_id] = job
+        while len(_fetch_jobs) > _FETCH_JOBS_KEPT:
+            _fetch_jobs.popitem(last=False)
+
+
+def _update_fetch_job(job_id: str, **changes: Any) -> None:
+    with _fetch_jobs_lock:
+        job = _fetch_jobs.get(job_id)
+        if job is not None:
+            _fetch_jobs[job_id] = job.model_copy(update=changes)
+
+
+def _run_fetch_job(
+    job_id: str,
+    service: DataService,
+    payload: DataFetchRequest,
+    symbols: list[tuple[str, str | None]],
+) -> None:
+    """Background task body: run the fetch on its own prices session."""
+
+    _update_fetch_job(job_id, status="running")
+    try:
+        with PricesSessionLocal() as prices_db:
+            bars_written = _run_fetch(service, prices_db, payload, symbols)
+    except (ValueError, ProviderUnavailableError) as exc:
+        _update_fetch_job(job_id, status="failed", error=str(exc))
+        return
+    except Exception as exc:
+        _update_fetch_job(job_id, status="failed", error=str(exc))
+        raise
+    _update_fetch_job(job_id, status="completed", bars_written=bars_written)
+
+
 @router.get("/summary", response_model=List[DataSummaryItem])
-async def get_data_summary(
+def get_data_summary(
+    request: Request,
     db: Session = Depends(get_prices_db),
-) -> List[DataSummaryItem]:
-    """Return coverage summary for all symbol/timeframe combinations."""
-
-    rows = (
-        db.query(
-            PriceBar.symbol,
-            PriceBar.exchange,
-            PriceBar.timeframe,
-            PriceBar.source,
-            func.min(PriceBar.timestamp),
-            func.max(PriceBar.timestamp),
-            func.count(PriceBar.id),
+) -> Response:
+    """Return coverage summary for all symbol/timeframe combinations.
+
+    Items are built as DataSummaryItem-shaped dicts and encoded once, which
+    skips FastAPI's per-item response validation; ``response_model`` is kept
+    for the OpenAPI schema.
+
+    The response carries an ETag derived from a cheap probe of the price
+    tables. Clients revalidating with a matching ``If-None-Match`` get a 304,
+    and unchanged tables reuse the last encoded payload instead of
+    re-aggregating the bars.
+    """
+
+    global _summary_cache
+
+    etag = _summary_etag(db)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    with _summary_cache_lock:
+        cached = _summary_cache
+    if cached is not None and cached[0] == etag:
+        payload = cached[1]
+    else:
+        payload = dump_json(_build_data_summary(db))
+        with _summary_cache_lock:
+            _summary_cache = (etag, payload)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+def _summary_etag(db: Session) -> str:
+    """Return an ETag that changes whenever stored price coverage changes.
+
+    Every store records a new PriceFetch (raising the max fetch id) and every
+    coverage delete lowers the total bar count, so a probe of the small
+    coverage table is enough.
+    """
+
+    rows, bars, max_fetch_id = db.execute(
+        select(
+            func.count(PriceBarCoverage.id),
+            func.sum(PriceBarCoverage.bar_count),
+            func.max(PriceBarCoverage.latest_fetch_id),
         )
-        .group_by(
-            PriceBar.symbol,
-            PriceBar.exchange,
-            PriceBar.timeframe,
-            PriceBar.source,
+    ).one()
+    version = f"{rows}:{bars}:{max_fetch_id}"
+    return f'"{hashlib.sha1(version.encode()).hexdigest()}"'
+
+
+def _build_data_summary(db: Session) -> list[dict[str, Any]]:
+    """List stored price coverage rows, newest fetch first."""
+
+    # Coverage rows are maintained by refresh_price_coverage, so this reads
+    # one row per key rather than aggregating price_bars. Rows come back most
+    # recently fetched first, ties broken by coverage identifier, using the
+    # same created_at / coverage_id derivation as the loop below; SQLite's
+    # fixed-width datetime strings compare in time order.
+    seq = func.coalesce(PriceFetch.id, 0)
+    created_at_key = func.coalesce(
+        PriceFetch.created_at, PriceBarCoverage.end_timestamp
+    )
+    coverage_id_key = (
+        func.upper(func.coalesce(PriceBarCoverage.symbol, ""))
+        + "_"
+        + func.printf("%05d", seq)
+    )
+    stmt = (
+        select(
+            PriceBarCoverage.symbol,
+            PriceBarCoverage.exchange,
+            PriceBarCoverage.timeframe,
+            PriceBarCoverage.source,
+            PriceBarCoverage.start_timestamp,
+            PriceBarCoverage.end_timestamp,
+            PriceBarCoverage.bar_count,
+            PriceFetch.id,
+            PriceFetch.created_at,
         )
+        .outerjoin(PriceFetch, PriceFetch.id == PriceBarCoverage.latest_fetch_id)
         .order_by(
-            PriceBar.symbol.asc(),
-            PriceBar.exchange.asc(),
-            PriceBar.timeframe.asc(),
-            PriceBar.source.asc(),
+            created_at_key.desc(),
+            coverage_id_key.desc(),
+            PriceBarCoverage.symbol.asc(),
+            PriceBarCoverage.exchange.asc(),
+            PriceBarCoverage.timeframe.asc(),
+            PriceBarCoverage.source.asc(),
         )
-        .all()
     )
+    rows = db.execute(stmt).all()
 
     ist_tz = timezone(timedelta(hours=5, minutes=30))
 
-    summary_items: list[DataSummaryItem] = []
+    # A symbol has a row per exchange/timeframe/source; upper-case it once.
+    prefixes: dict[str, str] = {}
+
+    summary_items: list[dict[str, Any]] = []
     for (
         symbol,
         exchange,
@@ -168,21 +380,12 @@ async def get_data_summary(
         start_ts,
         end_ts,
         bar_count,
+        fetch_id,
+        fetch_created_at,
     ) in rows:
-        latest_fetch = (
-            db.query(PriceFetch)
-            .filter(
-                PriceFetch.symbol == symbol,
-                PriceFetch.exchange == exchange,
-                PriceFetch.timeframe == timeframe,
-                PriceFetch.source == source,
-            )
-            .order_by(PriceFetch.id.desc())
-            .first()
-        )
-        if latest_fetch is not None:
-            seq = latest_fetch.id
-            created_at_raw = latest_fetch.created_at
+        if fetch_id is not None:
+            seq = fetch_id
+            created_at_raw = fetch_created_at
         else:
             # Legacy data created before fetch metadata existed: synthesise a
             # neutral identifier and use the coverage end timestamp.
@@ -191,38 +394,36 @@ async def get_data_summary(
 
         # Normalise created_at to IST for display and ordering. SQLite stores
         # naive datetimes, so we treat them as UTC and convert.
-        if created_at_raw.tzinfo is None:
-            created_at = created_at_raw.replace(tzinfo=timezone.utc).astimezone(ist_tz)
-        else:
-            created_at = created_at_raw.astimezone(ist_tz)
+        created_at = (
+            created_at_raw
+            if created_at_raw.tzinfo is not None
+            else created_at_raw.replace(tzinfo=timezone.utc)
+        ).astimezone(ist_tz)
 
         # For symbol-level fetches, use a per-symbol prefix so coverage IDs
         # read naturally as <SYMBOL>_00001, <SYMBOL>_00002, ...
-        symbol_prefix = (symbol or "").upper()
+        symbol_prefix = prefixes.get(symbol)
+        if symbol_prefix is None:
+            symbol_prefix = prefixes[symbol] = (symbol or "").upper()
         coverage_id = f"{symbol_prefix}_{seq:05d}"
         summary_items.append(
-            DataSummaryItem(
-                coverage_id=coverage_id,
-                symbol=symbol,
-                exchange=exchange,
-                timeframe=timeframe,
-                source=source,
-                start_timestamp=start_ts,
-                end_timestamp=end_ts,
-                bar_count=bar_count,
-                created_at=created_at,
-            )
+            {
+                "coverage_id": coverage_id,
+                "symbol": symbol,
+                "exchange": exchange,
+                "timeframe": timeframe,
+                "source": source,
+                "start_timestamp": start_ts,
+                "end_timestamp": end_ts,
+                "bar_count": bar_count,
+                "created_at": created_at,
+            }
         )
-    # Present most recently fetched coverage first; break ties by identifier.
-    summary_items.sort(
-        key=lambda item: (item.created_at, item.coverage_id),
-        reverse=True,
-    )
     return summary_items
 
 
 @router.delete("/bars", status_code=204)
-async def delete_data_coverage(
+def delete_data_coverage(
     symbols: list[str] = Query(
         ..., description="One or more symbols whose data should be deleted"
     ),
@@ -271,40 +472,79 @@ async def delete_data_coverage(
     if end is not None:
         conditions.append(PriceBar.timestamp <= end)
 
-    db.query(PriceBar).filter(and_(*conditions)).delete(synchronize_session=False)
-    db.commit()
+    # Delete in bounded batches, committing each, so a wide range does not
+    # hold SQLite's write lock for the whole operation. Each batch refreshes
+    # the coverage rows for these keys in the same transaction, so /summary
+    # (and its ETag) never describes bars that are already gone, even if a
+    # later batch fails. WAL auto-checkpoints run between the commits, which
+    # keeps the log to about one batch.
+    batch_ids = select(PriceBar.id).where(and_(*conditions)).limit(_DELETE_BATCH_SIZE)
+    while True:
+        deleted = db.execute(
+            delete(PriceBar).where(PriceBar.id.in_(batch_ids)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        refresh_price_coverage(db, symbols=symbols, timeframe=timeframe)
+        db.commit()
+        if deleted < _DELETE_BATCH_SIZE:
+            break
 
 
 @router.get(
     "/{symbol}/preview",
     response_model=List[PriceBarPreview],
 )
-async def preview_data(
+def preview_data(
     symbol: str,
     timeframe: str = Query(..., description="Timeframe to preview, e.g. 5m, 1h, 1d"),
     db: Session = Depends(get_prices_db),
     limit: int = Query(200, ge=1, le=2000),
-) -> List[PriceBarPreview]:
-    """Return a preview of recent bars for a symbol/timeframe."""
+) -> StreamingResponse:
+    """Return a preview of recent bars for a symbol/timeframe.
+
+    The JSON array is streamed in chunks of ``_PREVIEW_BATCH_SIZE`` rows.
+    """
 
-    query = (
-        db.query(PriceBar)
-        .filter(PriceBar.symbol == symbol, PriceBar.timeframe == timeframe)
-        .order_by(PriceBar.timestamp.desc())
+    # The inner query picks the most recent ``limit`` bars off the
+    # (symbol, timeframe, timestamp) index; the outer query returns them in
+    # ascending time order so rows can be written out as they are fetched.
+    recent = (
+        select(
+            PriceBar.id,
+            PriceBar.timestamp,
+            PriceBar.open,
+            PriceBar.high,
+            PriceBar.low,
+            PriceBar.close,
+            PriceBar.volume,
+            PriceBar.source,
+        )
+        .where(PriceBar.symbol == symbol, PriceBar.timeframe == timeframe)
+        .order_by(PriceBar.timestamp.desc(), PriceBar.id.desc())
         .limit(limit)
+        .subquery()
     )
-    rows = list(query)
-    rows.reverse()  # return in ascending time order
-
-    return [
-        PriceBarPreview(
-            timestamp=row.timestamp,
-            open=row.open,
-            high=row.high,
-            low=row.low,
-            close=row.close,
-            volume=row.volume,
-            source=row.source,
-        )
-        for row in rows
-    ]
+    stmt = select(
+        recent.c.timestamp,
+        recent.c.open,
+        recent.c.high,
+        recent.c.low,
+        recent.c.close,
+        recent.c.volume,
+        recent.c.source,
+    ).order_by(recent.c.timestamp.asc(), recent.c.id.asc())
+
+    return StreamingResponse(_stream_preview(db, stmt), media_type="application/json")
+
+
+def _stream_preview(db: Session, stmt: Any) -> Iterator[bytes]:
+    """Yield ``stmt``'s rows as a JSON array, one batch of mappings at a time."""
+
+    yield b"["
+    first = True
+    result = db.execute(stmt, execution_options={"yield_per": _PREVIEW_BATCH_SIZE})
+    for batch in result.mappings().partitions():
+        # Strip each batch's brackets so batches concatenate into one array.
+        yield (b"" if first else b",") + dump_json([dict(row) for row in batch])[1:-1]
+        first = False
+    yield b"]"
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from datetime import date
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from time import monotonic
 
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel
+from sqlalchemy import Integer, String, and_, column, select, values
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -17,17 +24,112 @@ from ..schemas import (
     FundamentalsRead,
     RiskRead,
 )
+from ..serialization import dump_json
 from ..services import FactorRiskRebuildService, FactorService, RiskModelService
 
+# Handlers are plain ``def`` functions: their SQLAlchemy sessions and
+# provider calls block, so FastAPI runs them on its worker threadpool rather
+# than on the event loop.
 router = APIRouter(prefix="/api/v1/factors", tags=["Factors"])
 
+# Stored covariance matrices younger than this are served without rebuilding
+# the universe's risk model; /rebuild always recomputes.
+_COVARIANCE_MAX_AGE = timedelta(hours=1)
+
+# Encoded /covariance responses keyed on (symbols in request order, as-of
+# date), so repeat polls of one universe skip the hash and the lookup. The
+# TTL bounds staleness when matrices are recomputed elsewhere; /rebuild
+# clears the cache outright.
+_COVARIANCE_CACHE_SIZE = 256
+_COVARIANCE_CACHE_TTL_SECONDS = 60.0
+_covariance_cache: OrderedDict[tuple[tuple[str, ...], date], tuple[float, bytes]] = (
+    OrderedDict()
+)
+_covariance_cache_lock = threading.Lock()
+
+
+def _read_columns(model: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    """Return ``(response field, ORM attribute)`` pairs for a read schema."""
+
+    columns = []
+    for name, field in model.model_fields.items():
+        alias = field.validation_alias
+        columns.append((name, alias if isinstance(alias, str) else name))
+    return tuple(columns)
+
+
+_EXPOSURE_COLUMNS = _read_columns(FactorExposureRead)
+_FUNDAMENTALS_COLUMNS = _read_columns(FundamentalsRead)
+_RISK_COLUMNS = _read_columns(RiskRead)
+
+
+def _symbol_rows_response(
+    symbols: list[str],
+    rows_by_symbol: dict[str, Any],
+    columns: tuple[tuple[str, str], ...],
+) -> Response:
+    """Encode per-symbol ORM rows in request order as a JSON object.
+
+    The rows come from typed DB columns, so their attributes are written
+    directly instead of being validated into read models first. Symbols
+    without a row are omitted.
+    """
+
+    result: dict[str, dict[str, Any]] = {}
+    for symbol in symbols:
+        row = rows_by_symbol.get(symbol)
+        if row is not None:
+            result[symbol] = {name: getattr(row, attr) for name, attr in columns}
+    return Response(content=dump_json(result), media_type="application/json")
+
+
+def _stored_rows_and_missing(
+    db: Session,
+    model: type[FactorExposure] | type[RiskModel],
+    symbols: list[str],
+    as_of_date: date,
+) -> tuple[dict[str, Any], list[str]]:
+    """Return stored rows by symbol and the requested symbols lacking one.
+
+    The requested symbols are left-joined against ``model`` as a VALUES CTE
+    (with an ordinal, so ``missing`` keeps request order), letting SQL report
+    absent symbols as NULL rows in the same round-trip.
+    """
+
+    if not symbols:
+        return {}, []
+
+    requested = (
+        values(column("pos", Integer), column("symbol", String), name="requested")
+        .data(list(enumerate(symbols)))
+        .cte()
+    )
+    stmt = (
+        select(requested.c.symbol, model)
+        .select_from(requested)
+        .outerjoin(
+            model,
+            and_(model.symbol == requested.c.symbol, model.as_of_date == as_of_date),
+        )
+        .order_by(requested.c.pos)
+    )
+
+    rows_by_symbol: dict[str, Any] = {}
+    missing: list[str] = []
+    for symbol, row in db.execute(stmt):
+        if row is None:
+            missing.append(symbol)
+        else:
+            rows_by_symbol[symbol] = row
+    return rows_by_symbol, missing
+
 
 @router.post("/exposures", response_model=dict[str, FactorExposureRead])
-async def get_factor_exposures(
+def get_factor_exposures(
     payload: FactorSymbolsRequest,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
-) -> dict[str, FactorExposureRead]:
+) -> Response:
     """Return factor exposures for the requested symbols and date.
 
     Missing exposures will trigger a compute-and-store pass via FactorService.
@@ -35,17 +137,9 @@ async def get_factor_exposures(
 
     service = FactorService()
 
-    rows = (
-        meta_db.query(FactorExposure)
-        .filter(
-            FactorExposure.symbol.in_(payload.symbols),  # type: ignore[arg-type]
-            FactorExposure.as_of_date == payload.as_of_date,
-        )
-        .all()
+    exposures_by_symbol, missing = _stored_rows_and_missing(
+        meta_db, FactorExposure, payload.symbols, payload.as_of_date
     )
-    exposures_by_symbol: dict[str, FactorExposure] = {row.symbol: row for row in rows}
-
-    missing = [s for s in payload.symbols if s not in exposures_by_symbol]
     if missing:
         computed = service.compute_and_store_exposures(
             meta_db=meta_db,
@@ -55,62 +149,46 @@ async def get_factor_exposures(
         )
         exposures_by_symbol.update(computed)
 
-    result: dict[str, FactorExposureRead] = {}
-    for symbol in payload.symbols:
-        row = exposures_by_symbol.get(symbol)
-        if row is not None:
-            result[symbol] = FactorExposureRead.model_validate(row)
-    return result
+    return _symbol_rows_response(
+        payload.symbols, exposures_by_symbol, _EXPOSURE_COLUMNS
+    )
 
 
 @router.post("/fundamentals", response_model=dict[str, FundamentalsRead])
-async def get_fundamentals(
+def get_fundamentals(
     payload: FactorSymbolsRequest,
     meta_db: Session = Depends(get_db),
-) -> dict[str, FundamentalsRead]:
+) -> Response:
     """Return fundamentals snapshot data for the requested symbols and date."""
 
-    rows = (
-        meta_db.query(FundamentalsSnapshot)
-        .filter(
+    rows = meta_db.scalars(
+        select(FundamentalsSnapshot).where(
             FundamentalsSnapshot.symbol.in_(payload.symbols),  # type: ignore[arg-type]
             FundamentalsSnapshot.as_of_date == payload.as_of_date,
         )
-        .all()
-    )
+    ).all()
     fundamentals_by_symbol: dict[str, FundamentalsSnapshot] = {
         row.symbol: row for row in rows
     }
 
-    result: dict[str, FundamentalsRead] = {}
-    for symbol in payload.symbols:
-        row = fundamentals_by_symbol.get(symbol)
-        if row is not None:
-            result[symbol] = FundamentalsRead.model_validate(row)
-    return result
+    return _symbol_rows_response(
+        payload.symbols, fundamentals_by_symbol, _FUNDAMENTALS_COLUMNS
+    )
 
 
 @router.post("/risk", response_model=dict[str, RiskRead])
-async def get_risk_metrics(
+def get_risk_metrics(
     payload: FactorSymbolsRequest,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
-) -> dict[str, RiskRead]:
+) -> Response:
     """Return per-symbol risk metrics for the requested universe and date."""
 
     service = RiskModelService()
 
-    rows = (
-        meta_db.query(RiskModel)
-        .filter(
-            RiskModel.symbol.in_(payload.symbols),  # type: ignore[arg-type]
-            RiskModel.as_of_date == payload.as_of_date,
-        )
-        .all()
+    risk_by_symbol, missing = _stored_rows_and_missing(
+        meta_db, RiskModel, payload.symbols, payload.as_of_date
     )
-    risk_by_symbol: dict[str, RiskModel] = {row.symbol: row for row in rows}
-
-    missing = [s for s in payload.symbols if s not in risk_by_symbol]
     if missing:
         computed = service.compute_and_store_risk(
             meta_db=meta_db,
@@ -120,45 +198,45 @@ async def get_risk_metrics(
         )
         risk_by_symbol.update(computed)
 
-    result: dict[str, RiskRead] = {}
-    for symbol in payload.symbols:
-        row = risk_by_symbol.get(symbol)
-        if row is not None:
-            result[symbol] = RiskRead.model_validate(row)
-    return result
+    return _symbol_rows_response(payload.symbols, risk_by_symbol, _RISK_COLUMNS)
 
 
 @router.post("/covariance", response_model=CovarianceMatrixResponse)
-async def get_covariance_matrix(
+def get_covariance_matrix(
     payload: FactorSymbolsRequest,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
-) -> CovarianceMatrixResponse:
-    """Return covariance and correlation matrices for the requested universe."""
+) -> Response:
+    """Return covariance and correlation matrices for the requested universe.
+
+    The stored matrices were written by RiskModelService as float lists, so
+    they are encoded directly rather than validated element by element into
+    a CovarianceMatrixResponse.
+    """
 
     if not payload.symbols:
         raise HTTPException(status_code=400, detail="symbols list must not be empty")
 
-    service = RiskModelService()
-    # Ensure risk entries and covariance matrix exist.
-    service.compute_and_store_risk(
-        meta_db=meta_db,
-        prices_db=prices_db,
-        symbols=payload.symbols,
-        as_of_date=payload.as_of_date,
-    )
+    # Matrix order follows the request, so the key keeps symbol order too.
+    cache_key = (tuple(payload.symbols), payload.as_of_date)
+    cached = _get_cached_covariance(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-    # Fetch the most recent matching covariance matrix for this universe.
+    service = RiskModelService()
     # Universe hash is computed using the same helper as the service.
     universe_hash = service._universe_hash(payload.symbols)
-    row = (
-        meta_db.query(CovarianceMatrix)
-        .filter(
-            CovarianceMatrix.as_of_date == payload.as_of_date,
-            CovarianceMatrix.universe_hash == universe_hash,
+    row = _load_covariance_matrix(meta_db, payload.as_of_date, universe_hash)
+    if not _is_fresh_covariance(row):
+        # Ensure risk entries and covariance matrix exist.
+        service.compute_and_store_risk(
+            meta_db=meta_db,
+            prices_db=prices_db,
+            symbols=payload.symbols,
+            as_of_date=payload.as_of_date,
         )
-        .one_or_none()
-    )
+        row = _load_covariance_matrix(meta_db, payload.as_of_date, universe_hash)
+
     if row is None or row.matrix_blob is None:
         raise HTTPException(
             status_code=404,
@@ -176,15 +254,63 @@ async def get_covariance_matrix(
             detail="Stored covariance matrix is incomplete",
         )
 
-    return CovarianceMatrixResponse(
-        symbols=symbols,
-        cov_matrix=cov_matrix,
-        corr_matrix=corr_matrix,
+    content = dump_json(
+        {
+            "symbols": symbols,
+            "cov_matrix": cov_matrix,
+            "corr_matrix": corr_matrix,
+        }
     )
+    _put_cached_covariance(cache_key, content)
+    return Response(content=content, media_type="application/json")
+
+
+def _get_cached_covariance(key: tuple[tuple[str, ...], date]) -> bytes | None:
+    with _covariance_cache_lock:
+        entry = _covariance_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, payload = entry
+        if monotonic() - stored_at > _COVARIANCE_CACHE_TTL_SECONDS:
+            del _covariance_cache[key]
+            return None
+        _covariance_cache.move_to_end(key)
+        return payload
+
+
+def _put_cached_covariance(key: tuple[tuple[str, ...], date], payload: bytes) -> None:
+    with _covariance_cache_lock:
+        _covariance_cache[key] = (monotonic(), payload)
+        _covariance_cache.move_to_end(key)
+        while len(_covariance_cache) > _COVARIANCE_CACHE_SIZE:
+            _covariance_cache.popitem(last=False)
+
+
+def _load_covariance_matrix(
+    db: Session, as_of_date: date, universe_hash: str
+) -> CovarianceMatrix | None:
+    return db.scalars(
+        select(CovarianceMatrix).where(
+            CovarianceMatrix.as_of_date == as_of_date,
+            CovarianceMatrix.universe_hash == universe_hash,
+        )
+    ).one_or_none()
+
+
+def _is_fresh_covariance(row: CovarianceMatrix | None) -> bool:
+    """Return whether ``row`` can be served without recomputing it."""
+
+    if row is None or row.matrix_blob is None or row.created_at is None:
+        return False
+    created_at = row.created_at
+    if created_at.tzinfo is None:
+        # SQLite returns naive datetimes; they are stored as UTC.
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - created_at < _COVARIANCE_MAX_AGE
 
 
 @router.post("/rebuild", response_model=FactorRebuildResponse)
-async def rebuild_factors_and_risk(
+def rebuild_factors_and_risk(
     payload: FactorRebuildRequest,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
@@ -203,6 +329,9 @@ async def rebuild_factors_and_risk(
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
+    with _covariance_cache_lock:
+        _covariance_cache.clear()
+
     return FactorRebuildResponse(
         universe=summary["universe"],
         as_of_date=date.fromisoformat(summary["as_of_date"]),
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -14,6 +15,8 @@ from ..schemas import (
 )
 from ..services import OptimizerService
 
+# Handlers are plain ``def`` functions: their SQLAlchemy sessions block, so
+# FastAPI runs them on its worker threadpool rather than on the event loop.
 router = APIRouter(prefix="/api/v1/portfolio", tags=["Portfolio Optimization"])
 
 
@@ -28,7 +31,7 @@ def _get_portfolio_or_404(db: Session, portfolio_id: int) -> Portfolio:
     "/optimize",
     response_model=PortfolioOptimizeResponse,
 )
-async def optimize_portfolio(
+def optimize_portfolio(
     payload: PortfolioOptimizeRequest,
     meta_db: Session = Depends(get_db),
     prices_db: Session = Depends(get_prices_db),
@@ -59,7 +62,7 @@ async def optimize_portfolio(
     "/save_weights",
     response_model=PortfolioSaveWeightsResponse,
 )
-async def save_portfolio_weights(
+def save_portfolio_weights(
     payload: PortfolioSaveWeightsRequest,
     meta_db: Session = Depends(get_db),
 ) -> PortfolioSaveWeightsResponse:
@@ -79,21 +82,31 @@ async def save_portfolio_weights(
 
         as_of_date = _date.today()
 
-    # Replace any existing weights for this portfolio/date snapshot.
+    # Replace the portfolio/date snapshot: drop symbols no longer held, then
+    # upsert the rest in one executemany so unchanged rows keep their ids.
+    symbols = {item.symbol for item in payload.weights}
     meta_db.query(PortfolioWeight).filter(
         PortfolioWeight.portfolio_id == payload.portfolio_id,
         PortfolioWeight.date == as_of_date,
+        PortfolioWeight.symbol.not_in(symbols),
     ).delete(synchronize_session=False)
 
-    for item in payload.weights:
-        meta_db.add(
-            PortfolioWeight(
-                portfolio_id=payload.portfolio_id,
-                date=as_of_date,
-                symbol=item.symbol,
-                weight=item.weight,
-            )
-        )
+    stmt = sqlite_insert(PortfolioWeight)
+    meta_db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["portfolio_id", "date", "symbol"],
+            set_={"weight": stmt.excluded.weight},
+        ),
+        [
+            {
+                "portfolio_id": payload.portfolio_id,
+                "date": as_of_date,
+                "symbol": item.symbol,
+                "weight": item.weight,
+            }
+            for item in payload.weights
+        ],
+    )
 
     meta_db.commit()
 
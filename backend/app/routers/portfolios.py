@@ -1,8 +1,25 @@
 import datetime as _dt
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import hashlib
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import BaseModel
+from sqlalchemy import (
+    Integer,
+    and_,
+    cast,
+    exists,
+    func,
+    insert,
+    lambda_stmt,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, load_only
 
 from ..database import get_db
 from ..models import Portfolio, PortfolioBacktest, StockGroup, StockGroupMember
@@ -13,177 +30,398 @@ from ..schemas import (
     PortfolioCreate,
     PortfolioRead,
     PortfolioUpdate,
-    PortfolioUniverseSummary,
 )
 from ..portfolio_service import PortfolioService
+from ..serialization import dump_json, if_none_match
 
+# Handlers are plain ``def`` functions: their SQLAlchemy sessions block, so
+# FastAPI runs them on its worker threadpool rather than on the event loop.
 router = APIRouter(prefix="/api/portfolios", tags=["Portfolios"])
 
+# PortfolioBacktest columns read by PortfolioBacktestRead; listing loads only
+# these and skips the configuration snapshot JSON blobs.
+_BACKTEST_LIST_COLUMNS = (
+    PortfolioBacktest.id,
+    PortfolioBacktest.portfolio_id,
+    PortfolioBacktest.start_date,
+    PortfolioBacktest.end_date,
+    PortfolioBacktest.timeframe,
+    PortfolioBacktest.initial_capital,
+    PortfolioBacktest.status,
+    PortfolioBacktest.metrics_json,
+    PortfolioBacktest.created_at,
+    PortfolioBacktest.finished_at,
+)
+
+# Encoded responses of the read endpoints, with their ETags, which the UI
+# polls. Writes through this router clear the cache; the TTL bounds
+# staleness from changes made elsewhere, such as stock group edits shown in
+# universe summaries.
+_READ_CACHE_SIZE = 512
+_READ_CACHE_TTL_SECONDS = 30.0
+_read_cache: OrderedDict[tuple[Any, ...], tuple[float, str, bytes]] = OrderedDict()
+_read_cache_lock = threading.Lock()
+
+
+def _get_cached_read(key: tuple[Any, ...]) -> tuple[str, bytes] | None:
+    with _read_cache_lock:
+        entry = _read_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, etag, payload = entry
+        if monotonic() - stored_at > _READ_CACHE_TTL_SECONDS:
+            del _read_cache[key]
+            return None
+        _read_cache.move_to_end(key)
+        return etag, payload
+
+
+def _put_cached_read(key: tuple[Any, ...], payload: bytes) -> tuple[str, bytes]:
+    # Hashing the body keeps the ETag exact for derived fields such as the
+    # universe member counts, which no portfolio timestamp tracks.
+    etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+    with _read_cache_lock:
+        _read_cache[key] = (monotonic(), etag, payload)
+        _read_cache.move_to_end(key)
+        while len(_read_cache) > _READ_CACHE_SIZE:
+            _read_cache.popitem(last=False)
+    return etag, payload
+
+
+def _read_response(request: Request, cached: tuple[str, bytes]) -> Response:
+    """Return a cached read, or a 304 when the client's copy is current."""
+
+    etag, payload = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+def _clear_read_cache() -> None:
+    with _read_cache_lock:
+        _read_cache.clear()
+
+
+def _get_portfolio_or_404(
+    portfolio_id: int,
+    db: Session = Depends(get_db),
+) -> Portfolio:
+    """Resolve the path's portfolio once per request, or raise a 404.
+
+    Used as a dependency: FastAPI caches ``get_db`` per request, so the
+    portfolio lives in the handler's session identity map and later
+    ``db.get`` calls for it (e.g. in PortfolioService) issue no SELECT.
+    """
 
-def _get_portfolio_or_404(db: Session, portfolio_id: int) -> Portfolio:
     portfolio = db.get(Portfolio, portfolio_id)
     if portfolio is None:
         raise HTTPException(status_code=404, detail="Portfolio not found")
     return portfolio
 
 
-def _build_portfolio_read(db: Session, obj: Portfolio) -> PortfolioRead:
-    """Construct a PortfolioRead including optional universe summary.
+def _portfolio_code_taken(db: Session, code: str) -> bool:
+    """Return whether a portfolio already uses ``code`` (an EXISTS probe).
+
+    Built as a lambda statement so repeat calls reuse the cached statement
+    and its compiled SQL, binding only the new ``code``.
+    """
+
+    return bool(
+        db.scalar(lambda_stmt(lambda: select(exists().where(Portfolio.code == code))))
+    )
+
+
+def _scope_group_id(scope: str | None) -> int | None:
+    """Return the stock group id of a ``group:<id>`` universe scope."""
+
+    scope = scope or ""
+    if not scope.startswith("group:"):
+        return None
+    _, group_id_str = scope.split(":", 1)
+    try:
+        return int(group_id_str)
+    except ValueError:
+        return None
+
+
+def _scope_group_join() -> Any:
+    """Join condition matching a portfolio to its ``group:<id>`` stock group.
+
+    SQL counterpart of ``_scope_group_id`` for the digit-only ids the API
+    writes; GLOB keeps the prefix match case-sensitive like ``startswith``.
+    """
+
+    scope_id = func.substr(Portfolio.universe_scope, 7)
+    return and_(
+        Portfolio.universe_scope.op("GLOB")("group:[0-9]*"),
+        scope_id.op("NOT GLOB")("*[^0-9]*"),
+        StockGroup.id == cast(scope_id, Integer),
+    )
+
+
+def _load_universe_groups(
+    db: Session, group_ids: set[int]
+) -> tuple[dict[int, StockGroup], dict[int, int]]:
+    """Load stock groups and their member counts in two batched queries."""
+
+    if not group_ids:
+        return {}, {}
+    groups = db.query(StockGroup).filter(StockGroup.id.in_(group_ids)).all()
+    counts = (
+        db.query(StockGroupMember.group_id, func.count())
+        .filter(StockGroupMember.group_id.in_(group_ids))
+        .group_by(StockGroupMember.group_id)
+        .all()
+    )
+    return {g.id: g for g in groups}, {gid: int(n) for gid, n in counts}
+
+
+def _read_columns(model: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    """Return ``(response field, ORM attribute)`` pairs for a read schema."""
 
-    Existing fields are populated via from_attributes on the ORM object so
-    API compatibility is preserved; universe metadata is attached as an
-    additional, optional field for display/UX purposes.
+    columns = []
+    for name, field in model.model_fields.items():
+        alias = field.validation_alias
+        columns.append((name, alias if isinstance(alias, str) else name))
+    return tuple(columns)
+
+
+# PortfolioRead fields backed by Portfolio columns; ``universe`` is derived.
+_PORTFOLIO_READ_COLUMNS = tuple(
+    pair for pair in _read_columns(PortfolioRead) if pair[0] != "universe"
+)
+_BACKTEST_READ_COLUMNS = _read_columns(PortfolioBacktestRead)
+
+
+def _portfolio_read(
+    obj: Portfolio,
+    groups_by_id: dict[int, StockGroup],
+    counts_by_id: dict[int, int],
+) -> dict[str, Any]:
+    """Construct a PortfolioRead-shaped dict including the universe summary.
+
+    Fields are read straight from the ORM columns, which are already typed,
+    instead of being validated into a PortfolioRead per row. Universe
+    metadata is attached as an additional, optional field for display/UX
+    purposes. Groups and member counts are looked up in preloaded maps, so
+    this performs no DB I/O.
     """
 
-    universe: PortfolioUniverseSummary | None = None
-    scope = obj.universe_scope or ""
-    if scope.startswith("group:"):
-        _, group_id_str = scope.split(":", 1)
-        try:
-            group_id = int(group_id_str)
-        except ValueError:
-            group_id = None
-
-        if group_id is not None:
-            group = db.get(StockGroup, group_id)
-            if group is not None:
-                num_stocks = (
-                    db.query(StockGroupMember)
-                    .filter(StockGroupMember.group_id == group.id)
-                    .count()
-                )
-                mode = (
-                    GroupCompositionMode(group.composition_mode)
-                    if getattr(group, "composition_mode", None)
-                    else GroupCompositionMode.WEIGHTS
-                )
-                universe = PortfolioUniverseSummary(
-                    group_id=group.id,
-                    group_code=group.code,
-                    group_name=group.name,
-                    composition_mode=mode,
-                    num_stocks=int(num_stocks),
-                )
-
-    model = PortfolioRead.model_validate(obj)
-    model.universe = universe
-    return model
+    universe: dict[str, Any] | None = None
+    group_id = _scope_group_id(obj.universe_scope)
+    group = groups_by_id.get(group_id) if group_id is not None else None
+    if group is not None:
+        mode = (
+            GroupCompositionMode(group.composition_mode)
+            if getattr(group, "composition_mode", None)
+            else GroupCompositionMode.WEIGHTS
+        )
+        universe = {
+            "group_id": group.id,
+            "group_code": group.code,
+            "group_name": group.name,
+            "composition_mode": mode.value,
+            "num_stocks": counts_by_id.get(group.id, 0),
+        }
+
+    read = {name: getattr(obj, attr) for name, attr in _PORTFOLIO_READ_COLUMNS}
+    read["universe"] = universe
+    return read
+
+
+def _build_portfolio_read(db: Session, obj: Portfolio) -> dict[str, Any]:
+    """Construct a PortfolioRead for a single portfolio."""
+
+    group_id = _scope_group_id(obj.universe_scope)
+    groups_by_id, counts_by_id = _load_universe_groups(
+        db, {group_id} if group_id is not None else set()
+    )
+    return _portfolio_read(obj, groups_by_id, counts_by_id)
 
 
 @router.post("", response_model=PortfolioRead, status_code=201)
-async def create_portfolio(
+def create_portfolio(
     payload: PortfolioCreate,
     db: Session = Depends(get_db),
-) -> PortfolioRead:
+) -> dict[str, Any]:
     """Create a new Portfolio definition."""
 
     # Enforce unique code at the API level to provide a clear error
     # instead of a generic 500 when the DB unique constraint fires.
-    existing = db.query(Portfolio).filter(Portfolio.code == payload.code).one_or_none()
-    if existing is not None:
+    if _portfolio_code_taken(db, payload.code):
         raise HTTPException(
             status_code=409,
             detail=f"Portfolio with code '{payload.code}' already exists",
         )
 
-    obj = Portfolio(
-        code=payload.code,
-        name=payload.name,
-        base_currency=payload.base_currency,
-        universe_scope=payload.universe_scope,
-        allowed_strategies_json=payload.allowed_strategies,
-        risk_profile_json=payload.risk_profile,
-        rebalance_policy_json=payload.rebalance_policy,
-        notes=payload.notes,
-    )
-    db.add(obj)
+    # RETURNING hands back the stored row, so the response is built before
+    # the commit instead of reloading the expired instance afterwards.
+    obj = db.scalars(
+        insert(Portfolio)
+        .values(
+            code=payload.code,
+            name=payload.name,
+            base_currency=payload.base_currency,
+            universe_scope=payload.universe_scope,
+            allowed_strategies_json=payload.allowed_strategies,
+            risk_profile_json=payload.risk_profile,
+            rebalance_policy_json=payload.rebalance_policy,
+            notes=payload.notes,
+        )
+        .returning(Portfolio)
+    ).one()
+    read = _build_portfolio_read(db, obj)
     db.commit()
-    db.refresh(obj)
-    return _build_portfolio_read(db, obj)
+    _clear_read_cache()
+    return read
 
 
 @router.get("", response_model=List[PortfolioRead])
-async def list_portfolios(
+def list_portfolios(
+    request: Request,
+    after_id: int | None = Query(
+        None, description="Return portfolios listed after this portfolio id"
+    ),
+    limit: int | None = Query(None, ge=1, le=500),
     db: Session = Depends(get_db),
-) -> List[PortfolioRead]:
-    """List all portfolios."""
+) -> Response:
+    """List portfolios in creation order, optionally keyset-paged.
 
-    items = db.query(Portfolio).order_by(Portfolio.created_at.asc()).all()
-    return [_build_portfolio_read(db, p) for p in items]
+    Pass the last id of the previous page as ``after_id``. Without query
+    parameters all portfolios are returned. Responses carry an ETag, and a
+    matching ``If-None-Match`` gets a 304.
+    """
+
+    cache_key = ("list", after_id, limit)
+    cached = _get_cached_read(cache_key)
+    if cached is not None:
+        return _read_response(request, cached)
+
+    # One query returns each portfolio with its universe group and member
+    # count, rather than separate group and count lookups.
+    stmt = (
+        select(Portfolio, StockGroup, func.count(StockGroupMember.id))
+        .outerjoin(StockGroup, _scope_group_join())
+        .outerjoin(StockGroupMember, StockGroupMember.group_id == StockGroup.id)
+        .group_by(Portfolio.id, StockGroup.id)
+    )
+    if after_id is not None:
+        # Keyset on (created_at, id) so pages stay stable under inserts.
+        cursor_created_at = (
+            select(Portfolio.created_at)
+            .where(Portfolio.id == after_id)
+            .scalar_subquery()
+        )
+        stmt = stmt.where(
+            or_(
+                Portfolio.created_at > cursor_created_at,
+                and_(
+                    Portfolio.created_at == cursor_created_at,
+                    Portfolio.id > after_id,
+                ),
+            )
+        )
+    stmt = stmt.order_by(Portfolio.created_at.asc(), Portfolio.id.asc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = db.execute(stmt).all()
+    groups_by_id = {group.id: group for _, group, _ in rows if group is not None}
+    counts_by_id = {
+        group.id: int(count) for _, group, count in rows if group is not None
+    }
+    reads = [_portfolio_read(p, groups_by_id, counts_by_id) for p, _, _ in rows]
+    return _read_response(request, _put_cached_read(cache_key, dump_json(reads)))
 
 
 @router.get("/{portfolio_id}", response_model=PortfolioRead)
-async def get_portfolio(
+def get_portfolio(
     portfolio_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-) -> PortfolioRead:
-    """Fetch a single portfolio by id."""
+) -> Response:
+    """Fetch a single portfolio by id, with an ETag for revalidation."""
 
-    obj = _get_portfolio_or_404(db, portfolio_id)
-    return _build_portfolio_read(db, obj)
+    # Checked before the lookup so cache hits skip the database entirely.
+    cache_key = ("get", portfolio_id)
+    cached = _get_cached_read(cache_key)
+    if cached is None:
+        obj = _get_portfolio_or_404(portfolio_id, db)
+        payload = dump_json(_build_portfolio_read(db, obj))
+        cached = _put_cached_read(cache_key, payload)
+    return _read_response(request, cached)
 
 
 @router.put("/{portfolio_id}", response_model=PortfolioRead)
-async def update_portfolio(
-    portfolio_id: int,
+def update_portfolio(
     payload: PortfolioUpdate,
+    obj: Portfolio = Depends(_get_portfolio_or_404),
     db: Session = Depends(get_db),
-) -> PortfolioRead:
-    """Update an existing portfolio definition."""
+) -> dict[str, Any]:
+    """Update an existing portfolio definition.
 
-    obj = _get_portfolio_or_404(db, portfolio_id)
+    Only fields that actually change are written, so a no-op update leaves
+    ``updated_at`` untouched.
+    """
 
+    changes: dict[str, Any] = {}
     if payload.code is not None and payload.code != obj.code:
-        existing = (
-            db.query(Portfolio).filter(Portfolio.code == payload.code).one_or_none()
-        )
-        if existing is not None:
+        if _portfolio_code_taken(db, payload.code):
             raise HTTPException(
                 status_code=409,
                 detail=f"Portfolio with code '{payload.code}' already exists",
             )
-        obj.code = payload.code
-
-    if payload.name is not None:
-        obj.name = payload.name
-    if payload.base_currency is not None:
-        obj.base_currency = payload.base_currency
-    if payload.universe_scope is not None:
-        obj.universe_scope = payload.universe_scope
-    if payload.allowed_strategies is not None:
-        obj.allowed_strategies_json = payload.allowed_strategies
-    if payload.risk_profile is not None:
-        obj.risk_profile_json = payload.risk_profile
-    if payload.rebalance_policy is not None:
-        obj.rebalance_policy_json = payload.rebalance_policy
-    if payload.notes is not None:
-        obj.notes = payload.notes
-
-    db.add(obj)
+        changes["code"] = payload.code
+
+    for field, attr in (
+        ("name", "name"),
+        ("base_currency", "base_currency"),
+        ("universe_scope", "universe_scope"),
+        ("allowed_strategies", "allowed_strategies_json"),
+        ("risk_profile", "risk_profile_json"),
+        ("rebalance_policy", "rebalance_policy_json"),
+        ("notes", "notes"),
+    ):
+        value = getattr(payload, field)
+        if value is not None and value != getattr(obj, attr):
+            changes[attr] = value
+
+    if changes:
+        # RETURNING refreshes the instance from the stored row (including
+        # the onupdate timestamp) in the UPDATE's own round-trip.
+        obj = db.scalars(
+            update(Portfolio)
+            .where(Portfolio.id == obj.id)
+            .values(**changes)
+            .returning(Portfolio)
+            .execution_options(populate_existing=True, synchronize_session=False)
+        ).one()
+    read = _build_portfolio_read(db, obj)
     db.commit()
-    db.refresh(obj)
-    return _build_portfolio_read(db, obj)
+    _clear_read_cache()
+    return read
 
 
 @router.delete("/{portfolio_id}", status_code=204)
-async def delete_portfolio(
-    portfolio_id: int,
+def delete_portfolio(
+    obj: Portfolio = Depends(_get_portfolio_or_404),
     db: Session = Depends(get_db),
 ) -> None:
     """Delete a portfolio definition.
 
     Any portfolio-level backtests associated with this portfolio are removed
-    first so that the delete does not violate foreign-key constraints.
+    first so that the delete does not violate foreign-key constraints. The
+    FK also declares ON DELETE CASCADE, but SQLite only honours it with
+    foreign keys enabled and on tables created with that DDL.
     """
 
-    obj = _get_portfolio_or_404(db, portfolio_id)
-
-    db.query(PortfolioBacktest).filter(
-        PortfolioBacktest.portfolio_id == portfolio_id
-    ).delete(synchronize_session=False)
+    db.query(PortfolioBacktest).filter(PortfolioBacktest.portfolio_id == obj.id).delete(
+        synchronize_session=False
+    )
 
     db.delete(obj)
     db.commit()
+    _clear_read_cache()
     return None
 
 
@@ -191,26 +429,37 @@ async def delete_portfolio(
     "/{portfolio_id}/backtests",
     response_model=List[PortfolioBacktestRead],
 )
-async def list_portfolio_backtests(
+def list_portfolio_backtests(
     portfolio_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=500),
-) -> List[PortfolioBacktestRead]:
+) -> Response:
     """List portfolio backtests for a given portfolio.
 
     This is a read-only API for now; portfolio backtests will be created by
     the PortfolioService in later sprints.
     """
 
-    _ = _get_portfolio_or_404(db, portfolio_id)
+    cache_key = ("backtests", portfolio_id, limit)
+    cached = _get_cached_read(cache_key)
+    if cached is not None:
+        return _read_response(request, cached)
+
+    portfolio = _get_portfolio_or_404(portfolio_id, db)
     rows = (
         db.query(PortfolioBacktest)
-        .filter(PortfolioBacktest.portfolio_id == portfolio_id)
+        .options(load_only(*_BACKTEST_LIST_COLUMNS))
+        .filter(PortfolioBacktest.portfolio_id == portfolio.id)
         .order_by(PortfolioBacktest.created_at.desc())
         .limit(limit)
         .all()
     )
-    return [PortfolioBacktestRead.model_validate(row) for row in rows]
+    reads = [
+        {name: getattr(row, attr) for name, attr in _BACKTEST_READ_COLUMNS}
+        for row in rows
+    ]
+    return _read_response(request, _put_cached_read(cache_key, dump_json(reads)))
 
 
 @router.post(
@@ -218,8 +467,8 @@ async def list_portfolio_backtests(
     response_model=PortfolioBacktestRead,
     status_code=201,
 )
-async def create_portfolio_backtest(
-    portfolio_id: int,
+def create_portfolio_backtest(
+    portfolio: Portfolio = Depends(_get_portfolio_or_404),
     timeframe: str = Query("1d"),
     start: _dt.datetime = Query(...),
     end: _dt.datetime = Query(...),
@@ -237,10 +486,11 @@ async def create_portfolio_backtest(
     bt = service.run_portfolio_backtest(
         meta_db=meta_db,
         prices_db=prices_db,
-        portfolio_id=portfolio_id,
+        portfolio_id=portfolio.id,
         timeframe=timeframe,
         start=start,
         end=end,
         initial_capital=initial_capital,
     )
+    _clear_read_cache()
     return PortfolioBacktestRead.model_validate(bt)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert, lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from ..database import get_db
@@ -15,11 +16,17 @@ from ..schemas import (
 )
 from ..services import ScreenerService
 
+# Handlers are plain ``def`` functions: their SQLAlchemy sessions block, so
+# FastAPI runs them on its worker threadpool rather than on the event loop.
 router = APIRouter(prefix="/api/v1", tags=["Screener"])
 
+# Symbols bound per ``IN (...)`` lookup, keeping large screener selections
+# well inside SQLite's bound-parameter limit.
+_SYMBOL_LOOKUP_BATCH_SIZE = 500
+
 
 @router.post("/screener/run", response_model=List[ScreenerResultItem])
-async def run_screener(
+def run_screener(
     payload: ScreenerRunRequest,
     meta_db: Session = Depends(get_db),
 ) -> List[ScreenerResultItem]:
@@ -41,7 +48,7 @@ async def run_screener(
     "/groups/create_from_screener",
     response_model=CreateGroupFromScreenerResponse,
 )
-async def create_group_from_screener(
+def create_group_from_screener(
     payload: CreateGroupFromScreenerRequest,
     meta_db: Session = Depends(get_db),
 ) -> CreateGroupFromScreenerResponse:
@@ -56,12 +63,21 @@ async def create_group_from_screener(
 
     # Generate a simple group code from name.
     base_code = "".join(ch for ch in payload.name.upper() if ch.isalnum()) or "SCREENER"
+    # Every candidate code starts with base_code[:9], so load the taken codes
+    # sharing that prefix once and probe suffixes in memory. base_code is
+    # alphanumeric, so it needs no LIKE escaping. The lambda statement is
+    # built and compiled once and only rebinds the pattern per request.
+    pattern = f"{base_code[:9]}%"
+    taken = set(
+        meta_db.scalars(
+            lambda_stmt(
+                lambda: select(StockGroup.code).where(StockGroup.code.like(pattern))
+            )
+        )
+    )
     code = base_code[:12]
     suffix = 1
-    while (
-        meta_db.query(StockGroup).filter(StockGroup.code == code).one_or_none()
-        is not None
-    ):
+    while code in taken:
         suffix += 1
         code = f"{base_code[:9]}{suffix:03d}"
 
@@ -74,30 +90,33 @@ async def create_group_from_screener(
         total_investable_amount=None,
     )
     meta_db.add(group)
-    meta_db.commit()
-    meta_db.refresh(group)
-
-    stocks = (
-        meta_db.query(Stock)
-        .filter(Stock.symbol.in_(symbols))  # type: ignore[arg-type]
-        .all()
-    )
-    symbol_to_stock = {s.symbol.upper(): s for s in stocks}
-
+    # Flush for the group id; the group and its members commit together.
+    meta_db.flush()
+
+    # Only ids are needed, so fetch (id, symbol) tuples rather than full
+    # Stock rows, a batch of distinct symbols at a time.
+    unique_symbols = list(dict.fromkeys(symbols))
+    symbol_to_stock_id: dict[str, int] = {}
+    for start in range(0, len(unique_symbols), _SYMBOL_LOOKUP_BATCH_SIZE):
+        batch = unique_symbols[start : start + _SYMBOL_LOOKUP_BATCH_SIZE]
+        for stock_id, stock_symbol in meta_db.query(Stock.id, Stock.symbol).filter(
+            Stock.symbol.in_(batch)  # type: ignore[arg-type]
+        ):
+            symbol_to_stock_id[stock_symbol.upper()] = stock_id
+
+    # The group is new, so the only possible duplicate links come from
+    # repeated symbols in the request; drop those here and write every
+    # membership with a single executemany INSERT.
+    stock_ids: dict[int, None] = {}
     for symbol in symbols:
-        stock = symbol_to_stock.get(symbol)
-        if stock is None:
-            continue
-        link_exists = (
-            meta_db.query(StockGroupMember)
-            .filter(
-                StockGroupMember.group_id == group.id,
-                StockGroupMember.stock_id == stock.id,
-            )
-            .one_or_none()
+        stock_id = symbol_to_stock_id.get(symbol)
+        if stock_id is not None:
+            stock_ids[stock_id] = None
+    if stock_ids:
+        meta_db.execute(
+            insert(StockGroupMember),
+            [{"group_id": group.id, "stock_id": stock_id} for stock_id in stock_ids],
         )
-        if link_exists is None:
-            meta_db.add(StockGroupMember(group_id=group.id, stock_id=stock.id))
 
     meta_db.commit()
 
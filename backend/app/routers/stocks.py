@@ -1,7 +1,14 @@
+import codecs
+import csv
+import hashlib
 import re
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List
+from functools import lru_cache
+from typing import BinaryIO, Callable, Iterable, Iterator, List
 
+import numpy as np
+import pandas as pd
 from fastapi import (
     APIRouter,
     Depends,
@@ -9,9 +16,14 @@ from fastapi import (
     Form,
     HTTPException,
     Query,
+    Request,
+    Response,
     UploadFile,
 )
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import delete, exists, func, lambda_stmt, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 
 from ..database import get_db
 from ..models import Stock, StockGroup, StockGroupMember
@@ -30,7 +42,37 @@ from ..schemas import (
     StockUpdate,
     StockGroupUpdate,
 )
-from ..symbol_resolution import ResolvedSymbol, resolve_symbol
+from ..serialization import if_none_match
+from ..symbol_resolution import ResolvedSymbol, resolve_symbols
+
+_CSV_LINE_RE = re.compile(r"[^\r\n]+")
+
+# Bytes of an upload inspected to detect its delimiter.
+_DELIMITER_SNIFF_BYTES = 64 * 1024
+
+# Fields each importer reads; the portfolio import leaves descriptive stock
+# fields untouched.
+_TRADINGVIEW_FIELDS = frozenset(
+    {"symbol", "market_cap", "sector", "description", "analyst_rating", "target_price"}
+)
+_PORTFOLIO_FIELDS = frozenset(
+    {"symbol", "market_cap", "sector", "weight", "qty", "amount"}
+)
+
+# Recognised CSV header names (lower-cased, stripped) and the import field
+# each one feeds.
+_CSV_COLUMN_ALIASES: dict[str, str] = {
+    **dict.fromkeys(["ticker", "symbol", "nse code", "nse_code"], "symbol"),
+    "market capitalization": "market_cap",
+    "sector": "sector",
+    **dict.fromkeys(["description", "name"], "description"),
+    "analyst rating": "analyst_rating",
+    **dict.fromkeys(["weight", "weight%", "allocation %", "alloc %", "wt"], "weight"),
+    **dict.fromkeys(["qty", "quantity", "shares"], "qty"),
+    **dict.fromkeys(
+        ["amount", "value", "allocation", "invested", "invested amount"], "amount"
+    ),
+}
 
 
 def _detect_delimiter(text: str) -> str:
@@ -41,7 +83,10 @@ def _detect_delimiter(text: str) -> str:
     delimiter based on the characters we see.
     """
 
-    for line in text.splitlines():
+    # Lines are scanned lazily so only the leading lines of a large upload
+    # are ever looked at, rather than splitting the whole file.
+    for match in _CSV_LINE_RE.finditer(text):
+        line = match.group()
         if not line.strip():
             continue
         if "\t" in line and "," not in line:
@@ -54,6 +99,62 @@ def _detect_delimiter(text: str) -> str:
     return ","
 
 
+def _find_columns(header: list[str], fields: frozenset[str]) -> dict[str, int]:
+    """Map the import ``fields`` an importer reads to their column index.
+
+    Names are matched through ``_CSV_COLUMN_ALIASES``, with any non-currency
+    "target price" column taken as the one-year target; columns for fields
+    outside ``fields`` are ignored. When several columns match a field the
+    last one wins. A header without a symbol column is rejected with a 400.
+    """
+
+    columns: dict[str, int] = {}
+    for idx, raw_name in enumerate(header):
+        name = raw_name.strip().lower()
+        column = _CSV_COLUMN_ALIASES.get(name)
+        if column is None:
+            normalized = re.sub(r"[^a-z0-9]", "", name)
+            if "currency" not in normalized and "targetprice" in normalized:
+                column = "target_price"
+        if column is not None and column in fields:
+            columns[column] = idx
+    if "symbol" not in columns:
+        raise HTTPException(
+            status_code=400,
+            detail="Unable to locate a symbol/ticker column in the CSV header.",
+        )
+    return columns
+
+
+def _decoded_lines(stream: BinaryIO) -> Iterator[str]:
+    """Decode an uploaded file line by line, reporting bad UTF-8 as a 400."""
+
+    try:
+        yield from codecs.iterdecode(stream, "utf-8")
+    except UnicodeDecodeError as exc:
+        msg = f"Unable to decode CSV as UTF-8: {exc}"
+        raise HTTPException(status_code=400, detail=msg) from exc
+
+
+def _open_csv_upload(file: UploadFile) -> tuple[list[str], Iterator[list[str]]]:
+    """Return the header row and a streaming row reader for an uploaded CSV.
+
+    Only the head of the upload is read to detect the delimiter; rows are
+    then decoded and parsed lazily from the spooled file instead of holding
+    the raw bytes and the decoded text in memory together.
+    """
+
+    head = file.file.read(_DELIMITER_SNIFF_BYTES)
+    file.file.seek(0)
+    delimiter = _detect_delimiter(head.decode("utf-8", errors="ignore"))
+    reader = csv.reader(_decoded_lines(file.file), delimiter=delimiter)
+    try:
+        header = next(reader)
+    except StopIteration as exc:
+        raise HTTPException(status_code=400, detail="CSV file is empty") from exc
+    return header, reader
+
+
 def _build_group_detail(group: StockGroup, db: Session) -> StockGroupDetail:
     """Construct a StockGroupDetail with allocation metadata."""
 
@@ -65,18 +166,18 @@ def _build_group_detail(group: StockGroup, db: Session) -> StockGroupDetail:
         .all()
     )
 
-    members: list[StockGroupMemberRead] = []
-    for membership, stock in rows:
-        base = StockRead.model_validate(stock)
-        members.append(
-            StockGroupMemberRead(
-                **base.model_dump(),
-                stock_id=stock.id,
-                target_weight_pct=membership.target_weight_pct,
-                target_qty=membership.target_qty,
-                target_amount=membership.target_amount,
-            )
-        )
+    members = _GROUP_MEMBER_LIST_ADAPTER.validate_python(
+        [
+            {
+                **{field: getattr(stock, field) for field in _STOCK_READ_FIELDS},
+                "stock_id": stock.id,
+                "target_weight_pct": membership.target_weight_pct,
+                "target_qty": membership.target_qty,
+                "target_amount": membership.target_amount,
+            }
+            for membership, stock in rows
+        ]
+    )
 
     return StockGroupDetail(
         id=group.id,
@@ -167,8 +268,8 @@ def _classify_segment_from_market_cap(value_raw: float | None) -> str | None:
 
     - Large-cap:     >= 20,000 cr
     - Mid-cap:     5,000–19,999 cr
-    - Small-cap:   1,000–4,999 cr
-    - Micro-cap:     100–999 cr
+    - Small-cap:   above 1,000 and below 5,000 cr
+    - Micro-cap:     100–1,000 cr (inclusive)
     - Ultra-micro:   < 100 cr
     """
 
@@ -187,8 +288,43 @@ def _classify_segment_from_market_cap(value_raw: float | None) -> str | None:
     return "ultra-micro-cap"
 
 
+# Indexed by the number of thresholds a market cap clears; 0 is "no segment".
+_SEGMENT_LABELS = np.array(
+    [None, "ultra-micro-cap", "micro-cap", "small-cap", "mid-cap", "large-cap"],
+    dtype=object,
+)
+
+
+def _classify_segments(values_crore: list[float | None]) -> list[str | None]:
+    """Vectorised ``_classify_segment_from_market_cap`` for a whole column."""
+
+    values = np.array(
+        [np.nan if value is None else value for value in values_crore], dtype=float
+    )
+    buckets = (
+        1
+        + (values >= 100).astype(int)
+        + (values > 1_000)
+        + (values >= 5_000)
+        + (values >= 20_000)
+    )
+    # NaN (missing) and non-positive caps fail this test and stay unclassified.
+    buckets[~(values > 0)] = 0
+    return _SEGMENT_LABELS[buckets].tolist()
+
+
 router = APIRouter(prefix="/api", tags=["Stocks"])
 
+# List adapters validate a whole result set through one compiled validator
+# instead of re-entering model_validate for every row.
+_STOCK_LIST_ADAPTER = TypeAdapter(List[StockRead])
+_GROUP_LIST_ADAPTER = TypeAdapter(List[StockGroupRead])
+_GROUP_MEMBER_LIST_ADAPTER = TypeAdapter(List[StockGroupMemberRead])
+_STOCK_READ_FIELDS = tuple(StockRead.model_fields)
+
+# Symbols bound per ``IN (...)`` lookup when loading stocks for imports.
+_SYMBOL_LOOKUP_BATCH_SIZE = 500
+
 
 def _get_stock_or_404(db: Session, stock_id: int) -> Stock:
     stock = db.get(Stock, stock_id)
@@ -204,11 +340,146 @@ def _get_group_or_404(db: Session, group_id: int) -> StockGroup:
     return group
 
 
+def _insert_group_links(db: Session, group_id: int, stock_ids: List[int]) -> int:
+    """Link ``stock_ids`` to a group, skipping existing links; return the count.
+
+    ``INSERT ... ON CONFLICT DO NOTHING`` against the (group, stock) unique
+    index, so no existence query is needed and concurrent adds cannot create
+    duplicate links.
+    """
+
+    if not stock_ids:
+        return 0
+    result = db.execute(
+        # Core insert on the table: ORM bulk inserts do not report rowcount.
+        sqlite_insert(StockGroupMember.__table__).on_conflict_do_nothing(
+            index_elements=["group_id", "stock_id"]
+        ),
+        [{"group_id": group_id, "stock_id": stock_id} for stock_id in stock_ids],
+    )
+    return int(result.rowcount)
+
+
+def _stock_listing_taken(
+    db: Session, symbol: str, exchange: str, exclude_id: int | None = None
+) -> bool:
+    """Return whether another stock already lists ``symbol`` on ``exchange``.
+
+    An EXISTS probe, so no row is fetched or added to the identity map.
+    """
+
+    conditions = [Stock.symbol == symbol, Stock.exchange == exchange]
+    if exclude_id is not None:
+        conditions.append(Stock.id != exclude_id)
+    return bool(db.scalar(select(exists().where(*conditions))))
+
+
+def _group_code_taken(db: Session, code: str, exclude_id: int | None = None) -> bool:
+    """Return whether a group (other than ``exclude_id``) uses ``code``."""
+
+    conditions = [StockGroup.code == code]
+    if exclude_id is not None:
+        conditions.append(StockGroup.id != exclude_id)
+    return bool(db.scalar(select(exists().where(*conditions))))
+
+
+def _group_by_code(db: Session, code: str) -> StockGroup | None:
+    """Return the group with ``code``, if any (cached lambda statement)."""
+
+    return db.scalars(
+        lambda_stmt(lambda: select(StockGroup).where(StockGroup.code == code))
+    ).one_or_none()
+
+
+def _link_group_stocks(db: Session, group: StockGroup, stock_ids: List[int]) -> None:
+    """Add memberships for ``stock_ids`` not yet in ``group`` (not committed).
+
+    Stocks are checked with one ``IN`` query; an unknown id raises 404
+    before anything is linked.
+    """
+
+    ids = list(dict.fromkeys(stock_ids))
+    if not ids:
+        return
+
+    known = {
+        stock_id
+        for (stock_id,) in db.query(Stock.id).filter(
+            Stock.id.in_(ids)  # type: ignore[arg-type]
+        )
+    }
+    missing = [stock_id for stock_id in ids if stock_id not in known]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Stock {missing[0]} not found for group membership",
+        )
+
+    _insert_group_links(db, group.id, ids)
+
+
+def _load_stocks_by_key(db: Session, symbols: set[str]) -> dict[tuple[str, str], Stock]:
+    """Load the stocks for ``symbols`` keyed by (symbol, exchange)."""
+
+    ordered = sorted(symbols)
+    stocks: dict[tuple[str, str], Stock] = {}
+    for start in range(0, len(ordered), _SYMBOL_LOOKUP_BATCH_SIZE):
+        batch = ordered[start : start + _SYMBOL_LOOKUP_BATCH_SIZE]
+        for stock in db.query(Stock).filter(Stock.symbol.in_(batch)):
+            stocks.setdefault((stock.symbol, stock.exchange), stock)
+    return stocks
+
+
+def _read_symbol_rows(
+    reader: Iterable[list[str]], symbol_idx: int
+) -> list[tuple[int, list[str], str]]:
+    """Return ``(line number, row, raw symbol)`` for rows with a symbol."""
+
+    rows: list[tuple[int, list[str], str]] = []
+    for idx, row in enumerate(reader, start=2):
+        if symbol_idx >= len(row):
+            continue
+        raw_symbol = row[symbol_idx].strip()
+        if raw_symbol:
+            rows.append((idx, row, raw_symbol))
+    return rows
+
+
+def _numeric_column(
+    rows: List[tuple[int, list[str], str]],
+    col_idx: int,
+    strip_pattern: str | None = None,
+) -> list[float | None]:
+    """Parse one CSV column of ``rows`` to floats in a single vectorised pass.
+
+    Characters matching ``strip_pattern`` are removed before parsing; blank,
+    missing or unparseable cells come back as ``None``.
+    """
+
+    if col_idx < 0:
+        return [None] * len(rows)
+    raw = pd.Series(
+        [row[col_idx] if col_idx < len(row) else "" for _, row, _ in rows],
+        dtype=object,
+    )
+    if strip_pattern is not None:
+        raw = raw.str.replace(strip_pattern, "", regex=True)
+    values = pd.to_numeric(raw.str.strip(), errors="coerce")
+    return [None if pd.isna(value) else float(value) for value in values]
+
+
 def _normalise_sector(raw: str | None) -> str | None:
     """Basic normalisation for sector labels from CSV imports."""
 
     if raw is None:
         return None
+    return _normalise_sector_text(raw)
+
+
+# Imports repeat a handful of sector labels across thousands of rows; caching
+# returns one shared string per distinct label instead of re-title-casing it.
+@lru_cache(maxsize=512)
+def _normalise_sector_text(raw: str) -> str | None:
     text = raw.strip()
     if not text:
         return None
@@ -217,35 +488,71 @@ def _normalise_sector(raw: str | None) -> str | None:
     return text.title()
 
 
+def _list_etag(*parts: object) -> str:
+    """Return a quoted ETag for a listing identified by ``parts``."""
+
+    version = "|".join(str(part) for part in parts)
+    return f'"{hashlib.sha1(version.encode()).hexdigest()}"'
+
+
+def _conditional_list_response(
+    request: Request, etag: str, build: Callable[[], bytes]
+) -> Response:
+    """Answer a list GET with 304 if the client has ``etag``, else ``build()``."""
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=build(), media_type="application/json", headers=headers)
+
+
 @router.get("/stocks", response_model=List[StockRead])
-async def list_stocks(
+def list_stocks(
+    request: Request,
     active_only: bool = Query(
         True,
         description="If true, return only active stocks in the universe.",
     ),
     db: Session = Depends(get_db),
-) -> List[StockRead]:
-    query = db.query(Stock)
+) -> Response:
+    """List stocks in the universe by symbol.
+
+    Every insert or update moves ``max(updated_at)`` and every delete or
+    deactivation lowers the count, so the pair identifies the listing. A
+    matching ``If-None-Match`` gets a 304 without loading the stocks.
+    """
+
+    # Lambda statements are cached with their compiled SQL, so repeat calls
+    # skip building and compiling the query.
+    probe = lambda_stmt(
+        lambda: select(func.count(Stock.id), func.max(Stock.updated_at))
+    )
+    stmt = lambda_stmt(lambda: select(Stock))
     if active_only:
-        query = query.filter(Stock.is_active.is_(True))
-    stocks = query.order_by(Stock.symbol.asc()).all()
-    return [StockRead.model_validate(s) for s in stocks]
+        probe += lambda s: s.where(Stock.is_active.is_(True))
+        stmt += lambda s: s.where(Stock.is_active.is_(True))
+    stmt += lambda s: s.order_by(Stock.symbol.asc())
+    count, max_updated_at = db.execute(probe).one()
+
+    def build() -> bytes:
+        stocks = _STOCK_LIST_ADAPTER.validate_python(
+            db.scalars(stmt).all(), from_attributes=True
+        )
+        return _STOCK_LIST_ADAPTER.dump_json(stocks)
+
+    etag = _list_etag("stocks", active_only, count, max_updated_at)
+    return _conditional_list_response(request, etag, build)
 
 
 @router.post("/stocks", response_model=StockRead, status_code=201)
-async def create_stock(
+def create_stock(
     payload: StockCreate,
     db: Session = Depends(get_db),
 ) -> StockRead:
     symbol = payload.symbol.strip().upper()
     exchange = payload.exchange.strip().upper()
 
-    existing = (
-        db.query(Stock)
-        .filter(Stock.symbol == symbol, Stock.exchange == exchange)
-        .first()
-    )
-    if existing is not None:
+    if _stock_listing_taken(db, symbol, exchange):
         raise HTTPException(
             status_code=409,
             detail=f"Stock {symbol} on {exchange} already exists in the universe",
@@ -269,7 +576,7 @@ async def create_stock(
 
 
 @router.get("/stocks/{stock_id}", response_model=StockRead)
-async def get_stock(
+def get_stock(
     stock_id: int,
     db: Session = Depends(get_db),
 ) -> StockRead:
@@ -278,7 +585,7 @@ async def get_stock(
 
 
 @router.put("/stocks/{stock_id}", response_model=StockRead)
-async def update_stock(
+def update_stock(
     stock_id: int,
     payload: StockUpdate,
     db: Session = Depends(get_db),
@@ -289,16 +596,7 @@ async def update_stock(
     if "symbol" in update_data or "exchange" in update_data:
         new_symbol = (update_data.get("symbol") or stock.symbol).strip().upper()
         new_exchange = (update_data.get("exchange") or stock.exchange).strip().upper()
-        existing = (
-            db.query(Stock)
-            .filter(
-                Stock.symbol == new_symbol,
-                Stock.exchange == new_exchange,
-                Stock.id != stock.id,
-            )
-            .first()
-        )
-        if existing is not None:
+        if _stock_listing_taken(db, new_symbol, new_exchange, exclude_id=stock.id):
             raise HTTPException(
                 status_code=409,
                 detail=f"Stock {new_symbol} on {new_exchange} already exists",
@@ -323,14 +621,13 @@ async def update_stock(
     if "is_active" in update_data and update_data["is_active"] is not None:
         stock.is_active = bool(update_data["is_active"])
 
-    db.add(stock)
     db.commit()
     db.refresh(stock)
     return StockRead.model_validate(stock)
 
 
 @router.delete("/stocks/{stock_id}", status_code=204)
-async def deactivate_stock(
+def deactivate_stock(
     stock_id: int,
     db: Session = Depends(get_db),
 ) -> None:
@@ -340,54 +637,80 @@ async def deactivate_stock(
     active-universe queries.
     """
 
-    stock = _get_stock_or_404(db, stock_id)
-    if not stock.is_active:
+    # One conditional UPDATE; the stock is only looked up again when no row
+    # changed, to tell an already-inactive stock from a missing one.
+    result = db.execute(
+        update(Stock)
+        .where(Stock.id == stock_id, Stock.is_active.is_(True))
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        _get_stock_or_404(db, stock_id)
         return
-    stock.is_active = False
-    db.add(stock)
     db.commit()
 
 
 @router.get("/stock-groups", response_model=List[StockGroupRead])
-async def list_stock_groups(
+def list_stock_groups(
+    request: Request,
     db: Session = Depends(get_db),
-) -> List[StockGroupRead]:
-    groups = db.query(StockGroup).order_by(StockGroup.name.asc()).all()
-    results: List[StockGroupRead] = []
-    for g in groups:
-        stock_count = (
-            db.query(StockGroupMember).filter(StockGroupMember.group_id == g.id).count()
+) -> Response:
+    """List stock groups by name with their member counts.
+
+    Groups and their member counts come back from one outer-join aggregate.
+    Membership changes do not touch the group rows, so the ETag covers each
+    group's ``updated_at`` and member count; a matching ``If-None-Match``
+    gets a 304 without validating or encoding the groups.
+    """
+
+    rows = db.execute(
+        lambda_stmt(
+            lambda: select(StockGroup, func.count(StockGroupMember.id))
+            .outerjoin(StockGroupMember, StockGroupMember.group_id == StockGroup.id)
+            .group_by(StockGroup.id)
+            .order_by(StockGroup.name.asc(), StockGroup.id.asc())
         )
-        results.append(
-            StockGroupRead(
-                id=g.id,
-                code=g.code,
-                name=g.name,
-                description=g.description,
-                tags=g.tags or [],
-                composition_mode=(
-                    GroupCompositionMode(g.composition_mode)
-                    if g.composition_mode
-                    else GroupCompositionMode.WEIGHTS
+    ).all()
+    etag = _list_etag(
+        "stock-groups", [(g.id, g.updated_at, count) for g, count in rows]
+    )
+    return _conditional_list_response(request, etag, lambda: _dump_group_list(rows))
+
+
+def _dump_group_list(rows: Iterable[tuple[StockGroup, int]]) -> bytes:
+    """Encode (group, member count) rows as a StockGroupRead list."""
+
+    reads = _GROUP_LIST_ADAPTER.validate_python(
+        [
+            {
+                "id": g.id,
+                "code": g.code,
+                "name": g.name,
+                "description": g.description,
+                "tags": g.tags or [],
+                "composition_mode": (
+                    g.composition_mode or GroupCompositionMode.WEIGHTS.value
                 ),
-                total_investable_amount=g.total_investable_amount,
-                created_at=g.created_at,
-                updated_at=g.updated_at,
-                stock_count=stock_count,
-            )
-        )
-    return results
+                "total_investable_amount": g.total_investable_amount,
+                "created_at": g.created_at,
+                "updated_at": g.updated_at,
+                "stock_count": count,
+            }
+            for g, count in rows
+        ]
+    )
+    return _GROUP_LIST_ADAPTER.dump_json(reads)
 
 
 @router.post("/stock-groups", response_model=StockGroupDetail, status_code=201)
-async def create_stock_group(
+def create_stock_group(
     payload: StockGroupCreate,
     db: Session = Depends(get_db),
 ) -> StockGroupDetail:
     code = payload.code.strip().upper()
 
-    existing = db.query(StockGroup).filter(StockGroup.code == code).first()
-    if existing is not None:
+    if _group_code_taken(db, code):
         raise HTTPException(
             status_code=409,
             detail=f"Stock group with code '{code}' already exists",
@@ -408,34 +731,18 @@ async def create_stock_group(
         total_investable_amount=payload.total_investable_amount,
     )
     db.add(group)
-    db.commit()
-    db.refresh(group)
-
+    # The group and its initial members are committed together, so an
+    # unknown stock id leaves no empty group behind.
+    db.flush()
     if payload.stock_ids:
-        for stock_id in payload.stock_ids:
-            stock = db.get(Stock, stock_id)
-            if stock is None:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Stock {stock_id} not found for group membership",
-                )
-            link_exists = (
-                db.query(StockGroupMember)
-                .filter(
-                    StockGroupMember.group_id == group.id,
-                    StockGroupMember.stock_id == stock.id,
-                )
-                .first()
-            )
-            if link_exists is None:
-                db.add(StockGroupMember(group_id=group.id, stock_id=stock.id))
-        db.commit()
+        _link_group_stocks(db, group, payload.stock_ids)
+    db.commit()
 
     return _build_group_detail(group, db)
 
 
 @router.get("/stock-groups/{group_id}", response_model=StockGroupDetail)
-async def get_stock_group(
+def get_stock_group(
     group_id: int,
     db: Session = Depends(get_db),
 ) -> StockGroupDetail:
@@ -444,7 +751,7 @@ async def get_stock_group(
 
 
 @router.put("/stock-groups/{group_id}", response_model=StockGroupRead)
-async def update_stock_group(
+def update_stock_group(
     group_id: int,
     payload: StockGroupUpdate,
     db: Session = Depends(get_db),
@@ -454,12 +761,7 @@ async def update_stock_group(
 
     if "code" in update_data and update_data["code"]:
         new_code = update_data["code"].strip().upper()
-        existing = (
-            db.query(StockGroup)
-            .filter(StockGroup.code == new_code, StockGroup.id != group.id)
-            .first()
-        )
-        if existing is not None:
+        if _group_code_taken(db, new_code, exclude_id=group.id):
             raise HTTPException(
                 status_code=409,
                 detail=f"Stock group with code '{new_code}' already exists",
@@ -481,7 +783,6 @@ async def update_stock_group(
     if "total_investable_amount" in update_data:
         group.total_investable_amount = update_data["total_investable_amount"]
 
-    db.add(group)
     db.commit()
     db.refresh(group)
 
@@ -504,7 +805,7 @@ async def update_stock_group(
 
 
 @router.delete("/stock-groups/{group_id}", status_code=204)
-async def delete_stock_group(
+def delete_stock_group(
     group_id: int,
     db: Session = Depends(get_db),
 ) -> None:
@@ -520,24 +821,22 @@ async def delete_stock_group(
     "/stock-groups/{group_id}/members",
     response_model=List[StockRead],
 )
-async def list_group_members(
+def list_group_members(
     group_id: int,
     db: Session = Depends(get_db),
 ) -> List[StockRead]:
-    _ = _get_group_or_404(db, group_id)
-    memberships = (
-        db.query(StockGroupMember).filter(StockGroupMember.group_id == group_id).all()
+    group = (
+        db.query(StockGroup)
+        .options(selectinload(StockGroup.stocks))
+        .filter(StockGroup.id == group_id)
+        .one_or_none()
     )
-    member_ids = [m.stock_id for m in memberships]
-    if not member_ids:
-        return []
-    stocks = (
-        db.query(Stock)
-        .filter(Stock.id.in_(member_ids))  # type: ignore[arg-type]
-        .order_by(Stock.symbol.asc())
-        .all()
+    if group is None:
+        raise HTTPException(status_code=404, detail="Stock group not found")
+    # A stock linked more than once is listed once, as before.
+    return _STOCK_LIST_ADAPTER.validate_python(
+        list(dict.fromkeys(group.stocks)), from_attributes=True
     )
-    return [StockRead.model_validate(s) for s in stocks]
 
 
 @router.post(
@@ -545,44 +844,24 @@ async def list_group_members(
     response_model=StockGroupDetail,
     status_code=200,
 )
-async def add_group_members(
+def add_group_members(
     group_id: int,
     payload: StockGroupMembersUpdate,
     db: Session = Depends(get_db),
 ) -> StockGroupDetail:
     group = _get_group_or_404(db, group_id)
-    members: List[Stock] = []
-
-    for stock_id in payload.stock_ids:
-        stock = db.get(Stock, stock_id)
-        if stock is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Stock {stock_id} not found for group membership",
-            )
-        link_exists = (
-            db.query(StockGroupMember)
-            .filter(
-                StockGroupMember.group_id == group.id,
-                StockGroupMember.stock_id == stock.id,
-            )
-            .first()
-        )
-        if link_exists is None:
-            db.add(StockGroupMember(group_id=group.id, stock_id=stock.id))
-        members.append(stock)
-
+    _link_group_stocks(db, group, payload.stock_ids)
     db.commit()
 
     # Reload full detail
-    return await get_stock_group(group_id=group.id, db=db)
+    return get_stock_group(group_id=group.id, db=db)
 
 
 @router.delete(
     "/stock-groups/{group_id}/members/{stock_id}",
     status_code=204,
 )
-async def remove_group_member(
+def remove_group_member(
     group_id: int,
     stock_id: int,
     db: Session = Depends(get_db),
@@ -600,7 +879,7 @@ async def remove_group_member(
     "/stocks/bulk-deactivate",
     status_code=200,
 )
-async def bulk_deactivate_stocks(
+def bulk_deactivate_stocks(
     payload: StockBulkUpdate,
     db: Session = Depends(get_db),
 ) -> dict[str, int]:
@@ -626,7 +905,7 @@ async def bulk_deactivate_stocks(
     "/stocks/bulk-remove-from-universe",
     status_code=200,
 )
-async def bulk_remove_from_universe(
+def bulk_remove_from_universe(
     payload: StockBulkUpdate,
     db: Session = Depends(get_db),
 ) -> dict[str, int]:
@@ -639,24 +918,27 @@ async def bulk_remove_from_universe(
     if not payload.ids:
         return {"updated": 0}
 
-    # Remove group memberships first to satisfy FK constraints.
-    db.query(StockGroupMember).filter(
-        StockGroupMember.stock_id.in_(payload.ids),  # type: ignore[arg-type]
-    ).delete(synchronize_session=False)
-    deleted = (
-        db.query(Stock)
-        .filter(Stock.id.in_(payload.ids))  # type: ignore[arg-type]
-        .delete(synchronize_session=False)
+    # SQLite does not enforce the membership FK's ON DELETE CASCADE here, so
+    # memberships are removed explicitly, in the same transaction.
+    db.execute(
+        delete(StockGroupMember)
+        .where(StockGroupMember.stock_id.in_(payload.ids))  # type: ignore[arg-type]
+        .execution_options(synchronize_session=False)
+    )
+    result = db.execute(
+        delete(Stock)
+        .where(Stock.id.in_(payload.ids))  # type: ignore[arg-type]
+        .execution_options(synchronize_session=False)
     )
     db.commit()
-    return {"updated": int(deleted or 0)}
+    return {"updated": int(result.rowcount or 0)}
 
 
 @router.post(
     "/stock-groups/{group_code}/members/bulk-add",
     status_code=200,
 )
-async def bulk_add_group_members_by_symbols(
+def bulk_add_group_members_by_symbols(
     group_code: str,
     payload: StockGroupBulkAddBySymbols,
     db: Session = Depends(get_db),
@@ -668,38 +950,32 @@ async def bulk_add_group_members_by_symbols(
     """
 
     code_norm = group_code.strip().upper()
-    group = db.query(StockGroup).filter(StockGroup.code == code_norm).one_or_none()
+    group = _group_by_code(db, code_norm)
     if group is None:
         raise HTTPException(status_code=404, detail="Stock group not found")
 
-    added = 0
-    seen_stock_ids: set[int] = set()
-    for raw_symbol in payload.symbols:
-        symbol = raw_symbol.strip().upper()
-        if not symbol:
-            continue
-        stock = (
-            db.query(Stock)
-            .filter(Stock.symbol == symbol)
+    symbols = list(
+        dict.fromkeys(raw.strip().upper() for raw in payload.symbols if raw.strip())
+    )
+
+    # Resolve every symbol in batched queries, taking the first stock by id
+    # when a symbol is listed on several exchanges.
+    stock_ids_by_symbol: dict[str, int] = {}
+    for start in range(0, len(symbols), _SYMBOL_LOOKUP_BATCH_SIZE):
+        batch = symbols[start : start + _SYMBOL_LOOKUP_BATCH_SIZE]
+        for stock_id, symbol in (
+            db.query(Stock.id, Stock.symbol)
+            .filter(Stock.symbol.in_(batch))
             .order_by(Stock.id.asc())
-            .first()
-        )
-        if stock is None:
-            continue
-        if stock.id in seen_stock_ids:
-            continue
-        link_exists = (
-            db.query(StockGroupMember)
-            .filter(
-                StockGroupMember.group_id == group.id,
-                StockGroupMember.stock_id == stock.id,
-            )
-            .first()
-        )
-        if link_exists is None:
-            db.add(StockGroupMember(group_id=group.id, stock_id=stock.id))
-            added += 1
-            seen_stock_ids.add(stock.id)
+        ):
+            stock_ids_by_symbol.setdefault(symbol, stock_id)
+
+    stock_ids = [
+        stock_ids_by_symbol[symbol]
+        for symbol in symbols
+        if symbol in stock_ids_by_symbol
+    ]
+    added = _insert_group_links(db, group.id, list(dict.fromkeys(stock_ids)))
 
     db.commit()
 
@@ -727,12 +1003,125 @@ async def bulk_add_group_members_by_symbols(
     return {"added": added}
 
 
+@dataclass
+class _StockImport:
+    """Stocks upserted from an import CSV, before any group linking."""
+
+    symbol_rows: list[tuple[int, list[str], str]]
+    # (position in ``symbol_rows``, stock) for every row whose symbol resolved.
+    stocks: list[tuple[int, Stock]] = field(default_factory=list)
+    created: int = 0
+    updated: int = 0
+    errors: list[dict[str, str | int]] = field(default_factory=list)
+
+
+def _upsert_csv_stocks(
+    db: Session,
+    reader: Iterator[list[str]],
+    columns: dict[str, int],
+    mark_active: bool,
+) -> _StockImport:
+    """Resolve and upsert the stocks listed in an import CSV (not committed).
+
+    Shared by both importers; ``columns`` carries only the fields the caller
+    reads. New stocks are flushed so they have ids for group linking.
+    """
+
+    symbol_idx = columns["symbol"]
+    sector_idx = columns.get("sector", -1)
+    description_idx = columns.get("description", -1)
+    analyst_rating_idx = columns.get("analyst_rating", -1)
+
+    # Read the whole file first so symbols and existing stocks are resolved
+    # in batched queries rather than per row.
+    symbol_rows = _read_symbol_rows(reader, symbol_idx)
+    resolutions = resolve_symbols(db, [raw for _, _, raw in symbol_rows])
+    stocks_by_key = _load_stocks_by_key(
+        db, {res.symbol for res in resolutions.values() if res.exchange}
+    )
+    result = _StockImport(symbol_rows=symbol_rows)
+
+    # Numeric columns are coerced once per column rather than cell by cell.
+    # Market cap is an absolute INR value; convert to crores and classify
+    # every row in one pass.
+    market_caps_crore = [
+        None if value is None else value / 10_000_000.0
+        for value in _numeric_column(symbol_rows, columns.get("market_cap", -1), ",")
+    ]
+    segments = _classify_segments(market_caps_crore)
+    target_prices = _numeric_column(
+        symbol_rows, columns.get("target_price", -1), r"[^0-9.\-]"
+    )
+
+    for pos, (idx, row, raw_symbol) in enumerate(symbol_rows):
+        market_cap_crore = market_caps_crore[pos]
+        segment_value = segments[pos]
+
+        sector_value: str | None = None
+        if 0 <= sector_idx < len(row):
+            sector_value = _normalise_sector(row[sector_idx])
+
+        resolved: ResolvedSymbol = resolutions[raw_symbol]
+        if not resolved.resolved or not resolved.exchange:
+            result.errors.append(
+                {
+                    "row": idx,
+                    "symbol": raw_symbol,
+                    "reason": resolved.reason or "Unresolved symbol",
+                }
+            )
+            continue
+
+        key = (resolved.symbol, resolved.exchange)
+        stock = stocks_by_key.get(key)
+        if stock is None:
+            analyst_rating_value: str | None = None
+            if 0 <= analyst_rating_idx < len(row):
+                analyst_rating_value = row[analyst_rating_idx].strip() or None
+
+            description_value: str | None = None
+            if 0 <= description_idx < len(row):
+                description_value = row[description_idx].strip() or None
+
+            stock = Stock(
+                symbol=resolved.symbol,
+                exchange=resolved.exchange,
+                segment=segment_value,
+                market_cap_crore=market_cap_crore,
+                name=description_value,
+                sector=sector_value,
+                analyst_rating=analyst_rating_value,
+                target_price_one_year=target_prices[pos],
+                tags=None,
+                is_active=bool(mark_active),
+            )
+            db.add(stock)
+            stocks_by_key[key] = stock
+            result.created += 1
+        else:
+            # Update basic classification fields when we have fresh data.
+            if segment_value is not None:
+                stock.segment = segment_value
+            if market_cap_crore is not None:
+                stock.market_cap_crore = market_cap_crore
+            if sector_value is not None:
+                stock.sector = sector_value
+            if mark_active and not stock.is_active:
+                stock.is_active = True
+            result.updated += 1
+
+        result.stocks.append((pos, stock))
+
+    db.flush()
+    return result
+
+
 @router.post(
     "/stocks/import/tradingview",
     response_model=StockImportSummary,
     status_code=201,
 )
-async def import_tradingview_screener(
+def import_tradingview_screener(
     file: UploadFile = File(...),
     group_code: str | None = Form(
         default=None,
@@ -772,55 +1161,8 @@ async def import_tradingview_screener(
     such as 'Ticker' or 'Symbol'.
     """
 
-    import csv
-    from io import StringIO
-
-    content = await file.read()
-    try:
-        text = content.decode("utf-8")
-    except Exception as exc:  # pragma: no cover - defensive
-        msg = f"Unable to decode CSV as UTF-8: {exc}"
-        raise HTTPException(status_code=400, detail=msg) from exc
-
-    delimiter = _detect_delimiter(text)
-    reader = csv.reader(StringIO(text), delimiter=delimiter)
-    try:
-        header = next(reader)
-    except StopIteration as exc:
-        raise HTTPException(status_code=400, detail="CSV file is empty") from exc
-    header_lower = [h.strip().lower() for h in header]
-    symbol_idx = -1
-    mcap_idx = -1
-    sector_idx = -1
-    description_idx = -1
-    analyst_rating_idx = -1
-    target_price_idx = -1
-    for idx, name in enumerate(header_lower):
-        normalized = re.sub(r"[^a-z0-9]", "", name)
-        if name in {"ticker", "symbol", "nse code", "nse_code"}:
-            symbol_idx = idx
-        elif name == "market capitalization":
-            mcap_idx = idx
-        elif name == "sector":
-            sector_idx = idx
-        elif name in {"description", "name"}:
-            description_idx = idx
-        elif name == "analyst rating":
-            analyst_rating_idx = idx
-        elif "currency" not in normalized and (
-            normalized.startswith("targetprice1year") or "targetprice" in normalized
-        ):
-            target_price_idx = idx
-    if symbol_idx == -1:
-        raise HTTPException(
-            status_code=400,
-            detail="Unable to locate a symbol/ticker column in the CSV header.",
-        )
-
-    created = 0
-    updated = 0
-    added_to_group = 0
-    errors: list[dict[str, str | int]] = []
+    header, reader = _open_csv_upload(file)
+    columns = _find_columns(header, _TRADINGVIEW_FIELDS)
 
     group: StockGroup | None = None
     group_code_norm: str | None = None
@@ -835,11 +1177,7 @@ async def import_tradingview_screener(
 
     if create_or_update_group and group_code:
         group_code_norm = group_code.strip().upper()
-        group = (
-            db.query(StockGroup)
-            .filter(StockGroup.code == group_code_norm)
-            .one_or_none()
-        )
+        group = _group_by_code(db, group_code_norm)
         if group is None:
             if not group_name:
                 detail = "group_name is required when creating a new group."
@@ -852,134 +1190,31 @@ async def import_tradingview_screener(
                 composition_mode=mode_value or "weights",
             )
             db.add(group)
-            db.commit()
-            db.refresh(group)
+            # Flush for the group id; the whole import commits once below.
+            db.flush()
         elif mode_value:
             # For existing groups, allow caller to override composition_mode
             # explicitly if requested; otherwise retain current behaviour.
             group.composition_mode = mode_value
-            db.add(group)
-            db.commit()
-            db.refresh(group)
-
-    for idx, row in enumerate(reader, start=2):
-        if symbol_idx >= len(row):
-            continue
-        raw_symbol = row[symbol_idx].strip()
-        if not raw_symbol:
-            continue
 
-        market_cap_crore: float | None = None
-        if 0 <= mcap_idx < len(row):
-            raw_mcap = row[mcap_idx].replace(",", "").strip()
-            if raw_mcap:
-                try:
-                    absolute_value = float(raw_mcap)
-                except ValueError:
-                    absolute_value = None
-                if absolute_value is not None:
-                    # Interpret TradingView's market cap as an absolute INR
-                    # value and convert to crores for classification.
-                    market_cap_crore = absolute_value / 10_000_000.0
+    imported = _upsert_csv_stocks(db, reader, columns, mark_active)
 
-        sector_value: str | None = None
-        if 0 <= sector_idx < len(row):
-            sector_value = _normalise_sector(row[sector_idx])
-
-        resolved: ResolvedSymbol = resolve_symbol(db, raw_symbol)
-        if not resolved.resolved or not resolved.exchange:
-            errors.append(
-                {
-                    "row": idx,
-                    "symbol": raw_symbol,
-                    "reason": resolved.reason or "Unresolved symbol",
-                }
-            )
-            continue
-
-        analyst_rating_value: str | None = None
-        if 0 <= analyst_rating_idx < len(row):
-            rating_raw = row[analyst_rating_idx].strip()
-            if rating_raw:
-                analyst_rating_value = rating_raw
-
-        description_value: str | None = None
-        if 0 <= description_idx < len(row):
-            desc_raw = row[description_idx].strip()
-            if desc_raw:
-                description_value = desc_raw
-
-        target_price_value: float | None = None
-        if 0 <= target_price_idx < len(row):
-            raw_target = row[target_price_idx].strip()
-            if raw_target:
-                cleaned = re.sub(r"[^0-9.\-]", "", raw_target.replace(",", ""))
-                try:
-                    target_price_value = float(cleaned)
-                except ValueError:
-                    target_price_value = None
-
-        stock = (
-            db.query(Stock)
-            .filter(
-                Stock.symbol == resolved.symbol,
-                Stock.exchange == resolved.exchange,
-            )
-            .one_or_none()
+    added_to_group = 0
+    if group is not None:
+        added_to_group = _insert_group_links(
+            db, group.id, list(dict.fromkeys(stock.id for _, stock in imported.stocks))
         )
-        if stock is None:
-            segment_value = _classify_segment_from_market_cap(market_cap_crore)
-            stock = Stock(
-                symbol=resolved.symbol,
-                exchange=resolved.exchange,
-                segment=segment_value,
-                market_cap_crore=market_cap_crore,
-                name=description_value,
-                sector=sector_value,
-                analyst_rating=analyst_rating_value,
-                target_price_one_year=target_price_value,
-                tags=None,
-                is_active=bool(mark_active),
-            )
-            db.add(stock)
-            db.commit()
-            db.refresh(stock)
-            created += 1
-        else:
-            # Update basic classification fields when we have fresh data.
-            segment_value = _classify_segment_from_market_cap(market_cap_crore)
-            if segment_value is not None:
-                stock.segment = segment_value
-            if market_cap_crore is not None:
-                stock.market_cap_crore = market_cap_crore
-            if sector_value is not None:
-                stock.sector = sector_value
-            if mark_active and not stock.is_active:
-                stock.is_active = True
-            db.add(stock)
-            db.commit()
-            updated += 1
-
-        if group is not None:
-            link_exists = (
-                db.query(StockGroupMember)
-                .filter(
-                    StockGroupMember.group_id == group.id,
-                    StockGroupMember.stock_id == stock.id,
-                )
-                .first()
-            )
-            if link_exists is None:
-                db.add(StockGroupMember(group_id=group.id, stock_id=stock.id))
-                db.commit()
-                added_to_group += 1
+
+    # One transaction for the whole file; an error part-way through leaves
+    # nothing behind, as the request session is closed without committing.
+    db.commit()
 
     return StockImportSummary(
-        created_stocks=created,
-        updated_stocks=updated,
+        created_stocks=imported.created,
+        updated_stocks=imported.updated,
         added_to_group=added_to_group,
         group_code=group.code if group is not None else group_code_norm,
-        errors=errors,
+        errors=imported.errors,
     )
 
 
@@ -988,7 +1223,7 @@ async def import_tradingview_screener(
     response_model=StockImportSummary,
     status_code=201,
 )
-async def import_portfolio_csv(
+def import_portfolio_csv(
     file: UploadFile = File(...),
     group_code: str = Form(...),
     group_name: str = Form(...),
@@ -1005,54 +1240,11 @@ async def import_portfolio_csv(
     new members are merged into it.
     """
 
-    import csv
-    from io import StringIO
-
-    content = await file.read()
-    try:
-        text = content.decode("utf-8")
-    except Exception as exc:  # pragma: no cover - defensive
-        msg = f"Unable to decode CSV as UTF-8: {exc}"
-        raise HTTPException(status_code=400, detail=msg) from exc
-
-    delimiter = _detect_delimiter(text)
-    reader = csv.reader(StringIO(text), delimiter=delimiter)
-    try:
-        header = next(reader)
-    except StopIteration as exc:
-        raise HTTPException(status_code=400, detail="CSV file is empty") from exc
-
-    header_lower = [h.strip().lower() for h in header]
-    symbol_idx = -1
-    mcap_idx = -1
-    sector_idx = -1
-    weight_idx = -1
-    qty_idx = -1
-    amount_idx = -1
-    for idx, name in enumerate(header_lower):
-        if name in {"symbol", "ticker", "nse code", "nse_code"}:
-            symbol_idx = idx
-        elif name == "market capitalization":
-            mcap_idx = idx
-        elif name == "sector":
-            sector_idx = idx
-        elif name in {
-            "weight",
-            "weight%",
-            "allocation %",
-            "alloc %",
-            "wt",
-        }:
-            weight_idx = idx
-        elif name in {"qty", "quantity", "shares"}:
-            qty_idx = idx
-        elif name in {"amount", "value", "allocation", "invested", "invested amount"}:
-            amount_idx = idx
-    if symbol_idx == -1:
-        raise HTTPException(
-            status_code=400,
-            detail="Unable to locate a symbol/ticker column in the CSV header.",
-        )
+    header, reader = _open_csv_upload(file)
+    columns = _find_columns(header, _PORTFOLIO_FIELDS)
+    weight_idx = columns.get("weight", -1)
+    qty_idx = columns.get("qty", -1)
+    amount_idx = columns.get("amount", -1)
 
     group_code_norm = group_code.strip().upper()
     if not group_code_norm or not group_name.strip():
@@ -1061,9 +1253,7 @@ async def import_portfolio_csv(
             detail="group_code and group_name are required.",
         )
 
-    group = (
-        db.query(StockGroup).filter(StockGroup.code == group_code_norm).one_or_none()
-    )
+    group = _group_by_code(db, group_code_norm)
 
     inferred_mode: GroupCompositionMode | None = None
     if weight_idx != -1:
@@ -1083,141 +1273,50 @@ async def import_portfolio_csv(
             composition_mode=mode_value,
         )
         db.add(group)
-        db.commit()
-        db.refresh(group)
+        # Flush for the group id; the whole import commits once below.
+        db.flush()
     elif inferred_mode is not None and getattr(group, "composition_mode", None):
         # Keep existing behaviour by default but allow a CSV with explicit
         # composition cues to update the mode for existing groups.
         group.composition_mode = inferred_mode.value
-        db.add(group)
-        db.commit()
-        db.refresh(group)
 
-    created = 0
-    updated = 0
-    added_to_group = 0
-    errors: list[dict[str, str | int]] = []
-    total_amount: float = 0.0
+    imported = _upsert_csv_stocks(db, reader, columns, mark_active)
 
-    for idx, row in enumerate(reader, start=2):
-        if symbol_idx >= len(row):
-            continue
-        raw_symbol = row[symbol_idx].strip()
-        if not raw_symbol:
-            continue
-
-        market_cap_crore: float | None = None
-        if 0 <= mcap_idx < len(row):
-            raw_mcap = row[mcap_idx].replace(",", "").strip()
-            if raw_mcap:
-                try:
-                    absolute_value = float(raw_mcap)
-                except ValueError:
-                    absolute_value = None
-                if absolute_value is not None:
-                    market_cap_crore = absolute_value / 10_000_000.0
-
-        sector_value: str | None = None
-        if 0 <= sector_idx < len(row):
-            sector_value = _normalise_sector(row[sector_idx])
+    weights = _numeric_column(imported.symbol_rows, weight_idx, "%")
+    quantities = _numeric_column(imported.symbol_rows, qty_idx)
+    amounts = _numeric_column(imported.symbol_rows, amount_idx, ",")
+    # Every row with a symbol counts toward the total, resolved or not.
+    total_amount = sum(amount for amount in amounts if amount is not None)
 
-        weight_value: float | None = None
-        qty_value: float | None = None
-        amount_value: float | None = None
-        if 0 <= weight_idx < len(row):
-            raw_weight = row[weight_idx].replace("%", "").strip()
-            if raw_weight:
-                try:
-                    weight_value = float(raw_weight)
-                except ValueError:
-                    weight_value = None
-        if 0 <= qty_idx < len(row):
-            raw_qty = row[qty_idx].strip()
-            if raw_qty:
-                try:
-                    qty_value = float(raw_qty)
-                except ValueError:
-                    qty_value = None
-        if 0 <= amount_idx < len(row):
-            raw_amt = row[amount_idx].replace(",", "").strip()
-            if raw_amt:
-                try:
-                    amount_value = float(raw_amt)
-                except ValueError:
-                    amount_value = None
-        if amount_value is not None:
-            total_amount += amount_value
-
-        resolved: ResolvedSymbol = resolve_symbol(db, raw_symbol)
-        if not resolved.resolved or not resolved.exchange:
-            errors.append(
-                {
-                    "row": idx,
-                    "symbol": raw_symbol,
-                    "reason": resolved.reason or "Unresolved symbol",
-                }
-            )
-            continue
+    # Match every imported stock against the group's current members,
+    # loaded once.
+    added_to_group = 0
+    members: dict[int, StockGroupMember] = {}
+    for existing in (
+        db.query(StockGroupMember)
+        .filter(StockGroupMember.group_id == group.id)
+        .order_by(StockGroupMember.id)
+    ):
+        members.setdefault(existing.stock_id, existing)
 
-        stock = (
-            db.query(Stock)
-            .filter(
-                Stock.symbol == resolved.symbol,
-                Stock.exchange == resolved.exchange,
-            )
-            .one_or_none()
-        )
-        if stock is None:
-            segment_value = _classify_segment_from_market_cap(market_cap_crore)
-            stock = Stock(
-                symbol=resolved.symbol,
-                exchange=resolved.exchange,
-                segment=segment_value,
-                market_cap_crore=market_cap_crore,
-                name=None,
-                sector=sector_value,
-                tags=None,
-                is_active=bool(mark_active),
-            )
-            db.add(stock)
-            db.commit()
-            db.refresh(stock)
-            created += 1
-        else:
-            # Update basic classification fields when we have fresh data.
-            segment_value = _classify_segment_from_market_cap(market_cap_crore)
-            if segment_value is not None:
-                stock.segment = segment_value
-            if sector_value is not None:
-                stock.sector = sector_value
-            if market_cap_crore is not None:
-                stock.market_cap_crore = market_cap_crore
-            if mark_active and not stock.is_active:
-                stock.is_active = True
-            db.add(stock)
-            db.commit()
-            updated += 1
-
-        link_exists = (
-            db.query(StockGroupMember)
-            .filter(
-                StockGroupMember.group_id == group.id,
-                StockGroupMember.stock_id == stock.id,
-            )
-            .first()
-        )
-        if link_exists is None:
+    for pos, stock in imported.stocks:
+        member = members.get(stock.id)
+        if member is None:
             member = StockGroupMember(
                 group_id=group.id,
                 stock_id=stock.id,
             )
-        else:
-            member = link_exists
+            members[stock.id] = member
+            db.add(member)
+            added_to_group += 1
 
         # Populate per-member targets based on the inferred composition mode
         # and any recognised columns present in the CSV. When no such column
         # is available the targets are left as NULL so existing behaviour is
         # preserved.
+        weight_value = weights[pos]
+        qty_value = quantities[pos]
+        amount_value = amounts[pos]
         if inferred_mode == GroupCompositionMode.WEIGHTS and weight_value is not None:
             member.target_weight_pct = weight_value
             member.target_qty = None
@@ -1231,21 +1330,17 @@ async def import_portfolio_csv(
             member.target_qty = None
             member.target_amount = amount_value
 
-        db.add(member)
-        db.commit()
-
-        if link_exists is None:
-            added_to_group += 1
-
     if inferred_mode == GroupCompositionMode.AMOUNT and total_amount > 0.0:
         group.total_investable_amount = total_amount
-        db.add(group)
-        db.commit()
+
+    # One transaction for the whole file; an error part-way through leaves
+    # nothing behind, as the request session is closed without committing.
+    db.commit()
 
     return StockImportSummary(
-        created_stocks=created,
-        updated_stocks=updated,
+        created_stocks=imported.created,
+        updated_stocks=imported.updated,
         added_to_group=added_to_group,
         group_code=group.code,
-        errors=errors,
+        errors=imported.errors,
     )
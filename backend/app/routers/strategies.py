@@ -8,6 +8,7 @@ from ..database import get_db
 from ..models import (
     Backtest,
     BacktestEquityPoint,
+    BacktestIndicatorSeries,
     BacktestTrade,
     Strategy,
     StrategyParameter,
@@ -39,13 +40,13 @@ def _get_param_or_404(db: Session, param_id: int) -> StrategyParameter:
 
 
 @router.get("/strategies", response_model=List[StrategyRead])
-async def list_strategies(db: Session = Depends(get_db)) -> List[StrategyRead]:
+def list_strategies(db: Session = Depends(get_db)) -> List[StrategyRead]:
     strategies = db.query(Strategy).order_by(Strategy.name.asc()).all()
     return [StrategyRead.model_validate(s) for s in strategies]
 
 
 @router.post("/strategies", response_model=StrategyRead, status_code=201)
-async def create_strategy(
+def create_strategy(
     payload: StrategyCreate,
     db: Session = Depends(get_db),
 ) -> StrategyRead:
@@ -74,7 +75,7 @@ async def create_strategy(
 
 
 @router.get("/strategies/{strategy_id}", response_model=StrategyRead)
-async def get_strategy(
+def get_strategy(
     strategy_id: int,
     db: Session = Depends(get_db),
 ) -> StrategyRead:
@@ -83,7 +84,7 @@ async def get_strategy(
 
 
 @router.put("/strategies/{strategy_id}", response_model=StrategyRead)
-async def update_strategy(
+def update_strategy(
     strategy_id: int,
     payload: StrategyUpdate,
     db: Session = Depends(get_db),
@@ -98,7 +99,6 @@ async def update_strategy(
             setattr(strategy, field, value)
 
     try:
-        db.add(strategy)
         db.commit()
         db.refresh(strategy)
     except IntegrityError as exc:
@@ -112,7 +112,7 @@ async def update_strategy(
 
 
 @router.delete("/strategies/{strategy_id}", status_code=204)
-async def delete_strategy(
+def delete_strategy(
     strategy_id: int,
     db: Session = Depends(get_db),
 ) -> None:
@@ -120,15 +120,20 @@ async def delete_strategy(
 
     # Delete associated backtests (and their child rows) for this strategy so
     # users can clean up the strategy library even after running backtests.
-    backtests = db.query(Backtest).filter(Backtest.strategy_id == strategy.id).all()
-    for bt in backtests:
-        db.query(BacktestEquityPoint).filter(
-            BacktestEquityPoint.backtest_id == bt.id
-        ).delete(synchronize_session=False)
-        db.query(BacktestTrade).filter(BacktestTrade.backtest_id == bt.id).delete(
+    # Child rows are removed with one DELETE per table via an id subquery,
+    # rather than three statements per backtest.
+    backtest_ids = (
+        db.query(Backtest.id)
+        .filter(Backtest.strategy_id == strategy.id)
+        .scalar_subquery()
+    )
+    for child in (BacktestEquityPoint, BacktestTrade, BacktestIndicatorSeries):
+        db.query(child).filter(child.backtest_id.in_(backtest_ids)).delete(
             synchronize_session=False
         )
-        db.delete(bt)
+    db.query(Backtest).filter(Backtest.strategy_id == strategy.id).delete(
+        synchronize_session=False
+    )
 
     # Delete associated parameters after backtests so there are no dangling
     # references from backtests.params_id when foreign keys are enforced.
@@ -143,7 +148,7 @@ async def delete_strategy(
     "/strategies/{strategy_id}/params",
     response_model=List[StrategyParameterRead],
 )
-async def list_strategy_params(
+def list_strategy_params(
     strategy_id: int,
     db: Session = Depends(get_db),
 ) -> List[StrategyParameterRead]:
@@ -162,7 +167,7 @@ async def list_strategy_params(
     response_model=StrategyParameterRead,
     status_code=201,
 )
-async def create_strategy_param(
+def create_strategy_param(
     strategy_id: int,
     payload: StrategyParameterCreate,
     db: Session = Depends(get_db),
@@ -199,7 +204,7 @@ async def create_strategy_param(
 
 
 @router.get("/params/{param_id}", response_model=StrategyParameterRead)
-async def get_param(
+def get_param(
     param_id: int,
     db: Session = Depends(get_db),
 ) -> StrategyParameterRead:
@@ -208,7 +213,7 @@ async def get_param(
 
 
 @router.get("/params", response_model=List[StrategyParameterRead])
-async def list_all_params(
+def list_all_params(
     db: Session = Depends(get_db),
 ) -> List[StrategyParameterRead]:
     """Return all strategy parameters (parameter registry)."""
@@ -218,7 +223,7 @@ async def list_all_params(
 
 
 @router.put("/params/{param_id}", response_model=StrategyParameterRead)
-async def update_param(
+def update_param(
     param_id: int,
     payload: StrategyParameterUpdate,
     db: Session = Depends(get_db),
@@ -252,14 +257,13 @@ async def update_param(
         else:
             setattr(param, field, value)
 
-    db.add(param)
     db.commit()
     db.refresh(param)
     return StrategyParameterRead.model_validate(param)
 
 
 @router.delete("/params/{param_id}", status_code=204)
-async def delete_param(
+def delete_param(
     param_id: int,
     db: Session = Depends(get_db),
 ) -> None:
@@ -6,7 +6,6 @@ from typing import Any, Literal
 from pydantic import BaseModel, Field
 from pydantic_settings import SettingsConfigDict
 
-
 # -------------------------
 # Data service schemas
 # -------------------------
@@ -65,6 +64,21 @@ class DataFetchResponse(BaseModel):
     bars_written: int
 
 
+class DataFetchJob(BaseModel):
+    """Status of a data fetch running as a background job."""
+
+    job_id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    symbol: str
+    timeframe: str
+    start_date: date
+    end_date: date
+    source: str
+    symbols_requested: int
+    bars_written: int | None = None
+    error: str | None = None
+
+
 class DataSummaryItem(BaseModel):
     """Aggregated coverage summary for a symbol/timeframe."""
 
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import Request
+from pydantic_core import to_json
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode plain response data (dicts, lists, datetimes, models) as JSON.
+
+    Used on read paths that skip per-item response-model validation. NaN and
+    infinite floats are written as ``null``, matching how pydantic models
+    serialise them, so the output is the same as the validated path.
+    """
+
+    return to_json(content, inf_nan_mode="null")
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Return True when the request's ``If-None-Match`` already has ``etag``."""
+
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in tags
@@ -3,15 +3,18 @@ from __future__ import annotations
 import hashlib
 import math
 import statistics
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Dict, List
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence
 
 import numpy as np
-from sqlalchemy import delete
+from sqlalchemy import and_, delete, func, insert, select
 from sqlalchemy.orm import Session
 
-from .prices_models import PriceBar, PriceFetch
+from .prices_models import PriceBar, PriceBarCoverage, PriceFetch
 from .models import (
     CovarianceMatrix,
     FactorExposure,
@@ -26,6 +29,10 @@ from .models import (
     StockGroupMember,
 )
 
+# Upper bound on concurrent provider calls for multi-symbol fetches. Kept
+# small so group/universe fetches stay within provider rate limits.
+_MAX_FETCH_WORKERS = 4
+
 
 class ProviderUnavailableError(RuntimeError):
     """Raised when a requested data provider cannot be used."""
@@ -219,6 +226,24 @@ def fetch_ohlcv_from_yfinance(
     return bars
 
 
+@lru_cache(maxsize=4)
+def _kite_client(api_key: str, access_token: str) -> Any:
+    """Return a KiteConnect client for the given credentials.
+
+    Clients are cached per credential pair so repeated fetches reuse one
+    HTTP session and its connection pool instead of rebuilding them.
+    """
+
+    try:
+        from kiteconnect import KiteConnect
+    except ImportError as exc:  # pragma: no cover - environment dependent
+        raise ProviderUnavailableError("kiteconnect is not installed") from exc
+
+    kite = KiteConnect(api_key=api_key)
+    kite.set_access_token(access_token)
+    return kite
+
+
 def fetch_ohlcv_from_kite(
     symbol: str,
     timeframe: str,
@@ -238,13 +263,7 @@ def fetch_ohlcv_from_kite(
     if not api_key or not access_token:
         raise ProviderUnavailableError("Kite credentials are not configured")
 
-    try:
-        from kiteconnect import KiteConnect
-    except ImportError as exc:  # pragma: no cover - environment dependent
-        raise ProviderUnavailableError("kiteconnect is not installed") from exc
-
-    kite = KiteConnect(api_key=api_key)
-    kite.set_access_token(access_token)
+    kite = _kite_client(api_key, access_token)
 
     # Determine instrument token. If the symbol is numeric we interpret it as a
     # token directly; otherwise we treat it as a trading symbol like HDFCBANK
@@ -348,22 +367,110 @@ class DataService:
         Returns the number of bars written.
         """
 
+        bars = self._fetch_bars(
+            symbol=symbol,
+            timeframe=timeframe,
+            start=start,
+            end=end,
+            source=source,
+            csv_path=csv_path,
+            exchange=exchange,
+        )
+        return self._store_bars(
+            db,
+            symbol=symbol,
+            timeframe=timeframe,
+            start=start,
+            end=end,
+            exchange=exchange,
+            bars=bars,
+        )
+
+    def fetch_and_store_symbols(
+        self,
+        db: Session,
+        *,
+        symbols: Sequence[tuple[str, str | None]],
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        source: str,
+        csv_path: str | None = None,
+    ) -> int:
+        """Fetch and persist bars for several ``(symbol, exchange)`` pairs.
+
+        Provider calls run concurrently on a bounded thread pool; results are
+        written through ``db`` one symbol at a time, in input order, so the
+        session stays on this thread and fetch records keep a stable order.
+        Returns the total number of bars written.
+        """
+
+        if not symbols:
+            return 0
+
+        max_workers = min(_MAX_FETCH_WORKERS, len(symbols))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = [
+                pool.submit(
+                    self._fetch_bars,
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    start=start,
+                    end=end,
+                    source=source,
+                    csv_path=csv_path,
+                    exchange=exchange,
+                )
+                for symbol, exchange in symbols
+            ]
+            total = 0
+            try:
+                for (symbol, exchange), future in zip(symbols, pending, strict=True):
+                    total += self._store_bars(
+                        db,
+                        symbol=symbol,
+                        timeframe=timeframe,
+                        start=start,
+                        end=end,
+                        exchange=exchange,
+                        bars=future.result(),
+                    )
+            except Exception:
+                # Stop queued provider calls once one symbol has failed.
+                for future in pending:
+                    future.cancel()
+                raise
+        return total
+
+    def _fetch_bars(
+        self,
+        *,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        source: str,
+        csv_path: str | None,
+        exchange: str | None,
+    ) -> List[OHLCVBar]:
+        """Fetch OHLCV bars for one symbol from the chosen provider."""
+
         source = source.lower()
         ex = (exchange or "NSE").upper()
         if source == "csv":
             if not csv_path:
                 raise ValueError("csv_path is required when source=csv")
-            bars = fetch_ohlcv_from_csv(csv_path, symbol=symbol, timeframe=timeframe)
-        elif source == "yfinance":
-            bars = fetch_ohlcv_from_yfinance(
+            return fetch_ohlcv_from_csv(csv_path, symbol=symbol, timeframe=timeframe)
+        if source == "yfinance":
+            return fetch_ohlcv_from_yfinance(
                 symbol=symbol,
                 timeframe=timeframe,
                 start=start,
                 end=end,
                 exchange=ex,
             )
-        elif source == "kite":
-            bars = fetch_ohlcv_from_kite(
+        if source == "kite":
+            return fetch_ohlcv_from_kite(
                 symbol=symbol,
                 timeframe=timeframe,
                 start=start,
@@ -372,12 +479,26 @@ class DataService:
                 access_token=self._kite_access_token,
                 exchange=ex,
             )
-        else:
-            raise ValueError(f"Unsupported data source: {source}")
+        raise ValueError(f"Unsupported data source: {source}")
+
+    def _store_bars(
+        self,
+        db: Session,
+        *,
+        symbol: str,
+        timeframe: str,
+        start: datetime,
+        end: datetime,
+        exchange: str | None,
+        bars: List[OHLCVBar],
+    ) -> int:
+        """Replace bars in the requested window and record the fetch."""
 
         if not bars:
             return 0
 
+        ex = (exchange or "NSE").upper()
+
         # Derive basic coverage metadata from the fetched bars. We assume all
         # bars share the same source label.
         start_ts = min(bar.timestamp for bar in bars)
@@ -394,21 +515,25 @@ class DataService:
             )
         )
 
-        # Persist new bars.
-        db.add_all(
-            PriceBar(
-                symbol=symbol,
-                exchange=ex,
-                timeframe=timeframe,
-                timestamp=bar.timestamp,
-                open=bar.open,
-                high=bar.high,
-                low=bar.low,
-                close=bar.close,
-                volume=bar.volume,
-                source=bar.source,
-            )
-            for bar in bars
+        # Persist new bars with one Core executemany rather than staging an
+        # ORM object per bar in the session.
+        db.execute(
+            insert(PriceBar),
+            [
+                {
+                    "symbol": symbol,
+                    "exchange": ex,
+                    "timeframe": timeframe,
+                    "timestamp": bar.timestamp,
+                    "open": bar.open,
+                    "high": bar.high,
+                    "low": bar.low,
+                    "close": bar.close,
+                    "volume": bar.volume,
+                    "source": bar.source,
+                }
+                for bar in bars
+            ],
         )
 
         # Record this fetch operation so that coverage summary rows can use a
@@ -424,10 +549,120 @@ class DataService:
             )
         )
 
+        db.flush()
+        refresh_price_coverage(db, symbols=[symbol], timeframe=timeframe)
         db.commit()
         return len(bars)
 
 
+def refresh_price_coverage(
+    db: Session,
+    *,
+    symbols: Sequence[str] | None = None,
+    timeframe: str | None = None,
+) -> None:
+    """Recompute ``price_bar_coverage`` rows from ``price_bars``.
+
+    Only coverage keys for the given symbols/timeframe are rebuilt (all keys
+    when both are None), so writers refresh just what they touched. The
+    caller owns the transaction.
+    """
+
+    bar_filters = []
+    fetch_filters = []
+    coverage_filters = []
+    if symbols is not None:
+        bar_filters.append(PriceBar.symbol.in_(symbols))
+        fetch_filters.append(PriceFetch.symbol.in_(symbols))
+        coverage_filters.append(PriceBarCoverage.symbol.in_(symbols))
+    if timeframe is not None:
+        bar_filters.append(PriceBar.timeframe == timeframe)
+        fetch_filters.append(PriceFetch.timeframe == timeframe)
+        coverage_filters.append(PriceBarCoverage.timeframe == timeframe)
+
+    bars = (
+        select(
+            PriceBar.symbol,
+            PriceBar.exchange,
+            PriceBar.timeframe,
+            PriceBar.source,
+            func.min(PriceBar.timestamp).label("start_timestamp"),
+            func.max(PriceBar.timestamp).label("end_timestamp"),
+            func.count(PriceBar.id).label("bar_count"),
+        )
+        .where(*bar_filters)
+        .group_by(
+            PriceBar.symbol,
+            PriceBar.exchange,
+            PriceBar.timeframe,
+            PriceBar.source,
+        )
+        .subquery()
+    )
+    fetches = (
+        select(
+            PriceFetch.symbol,
+            PriceFetch.exchange,
+            PriceFetch.timeframe,
+            PriceFetch.source,
+            func.max(PriceFetch.id).label("latest_fetch_id"),
+        )
+        .where(*fetch_filters)
+        .group_by(
+            PriceFetch.symbol,
+            PriceFetch.exchange,
+            PriceFetch.timeframe,
+            PriceFetch.source,
+        )
+        .subquery()
+    )
+    rows = select(
+        bars.c.symbol,
+        bars.c.exchange,
+        bars.c.timeframe,
+        bars.c.source,
+        bars.c.start_timestamp,
+        bars.c.end_timestamp,
+        bars.c.bar_count,
+        fetches.c.latest_fetch_id,
+    ).outerjoin(
+        fetches,
+        and_(
+            fetches.c.symbol == bars.c.symbol,
+            fetches.c.exchange.is_not_distinct_from(bars.c.exchange),
+            fetches.c.timeframe == bars.c.timeframe,
+            fetches.c.source == bars.c.source,
+        ),
+    )
+
+    db.execute(delete(PriceBarCoverage).where(*coverage_filters))
+    db.execute(
+        insert(PriceBarCoverage).from_select(
+            [
+                "symbol",
+                "exchange",
+                "timeframe",
+                "source",
+                "start_timestamp",
+                "end_timestamp",
+                "bar_count",
+                "latest_fetch_id",
+            ],
+            rows,
+        )
+    )
+
+
+def ensure_price_coverage(db: Session) -> None:
+    """Build ``price_bar_coverage`` for databases that predate the table."""
+
+    has_bars = db.scalar(select(PriceBar.id).limit(1)) is not None
+    has_coverage = db.scalar(select(PriceBarCoverage.id).limit(1)) is not None
+    if has_bars and not has_coverage:
+        refresh_price_coverage(db)
+        db.commit()
+
+
 def _compute_percentile(values: List[float], percentile: float) -> float:
     """Return the given percentile of a list of values.
 
@@ -548,7 +783,7 @@ class FactorService:
     ) -> List[float]:
         """Return a list of close prices for the lookback window."""
 
-        end_ts = datetime.combine(as_of, datetime.max.time())
+        end_ts = datetime.combine(as_of, time.max)
         start_ts = end_ts - timedelta(days=self._lookback_days)
 
         rows = (
@@ -777,7 +1012,7 @@ class RiskModelService:
     ) -> Dict[str, List[float]]:
         """Load daily returns for each symbol in the lookback window."""
 
-        end_ts = datetime.combine(as_of, datetime.max.time())
+        end_ts = datetime.combine(as_of, time.max)
         start_ts = end_ts - timedelta(days=self._lookback_days)
 
         returns_by_symbol: Dict[str, List[float]] = {}
@@ -1652,23 +1887,34 @@ class OptimizerService:
             msg = "Portfolio universe resolved to an empty symbol list"
             raise ValueError(msg)
 
-        # Compute factor exposures for the full universe; some names may be
-        # dropped later if insufficient price history is available.
-        exposures_by_symbol = self._factor_service.compute_and_store_exposures(
-            meta_db=meta_db,
-            prices_db=prices_db,
-            symbols=symbols,
-            as_of_date=as_of_date,
-            timeframe="1d",
-        )
-
         # Load returns up-front so we can identify symbols with usable history.
-        returns_by_symbol = self._risk_service._load_returns_matrix(  # type: ignore[attr-defined]
-            prices_db,
-            symbols=symbols,
-            timeframe="1d",
-            as_of=as_of_date,
-        )
+        # The load only reads prices, so it runs on a worker thread with its
+        # own session while factor exposures are computed on this one.
+        prices_bind = prices_db.get_bind()
+
+        def _load_returns() -> Dict[str, List[float]]:
+            with Session(bind=prices_bind, autoflush=False) as session:
+                return self._risk_service._load_returns_matrix(  # type: ignore[attr-defined]
+                    session,
+                    symbols=symbols,
+                    timeframe="1d",
+                    as_of=as_of_date,
+                )
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # Run in a copy of the caller's context so request-scoped state
+            # (e.g. the SQL statement counter) follows the worker.
+            returns_future = pool.submit(copy_context().run, _load_returns)
+            # Compute factor exposures for the full universe; some names may
+            # be dropped later if insufficient price history is available.
+            exposures_by_symbol = self._factor_service.compute_and_store_exposures(
+                meta_db=meta_db,
+                prices_db=prices_db,
+                symbols=symbols,
+                as_of_date=as_of_date,
+                timeframe="1d",
+            )
+            returns_by_symbol = returns_future.result()
         symbols_with_prices = [s for s in symbols if s in returns_by_symbol]
         if not symbols_with_prices:
             # Fall back to equal-weight with zero risk metrics when no
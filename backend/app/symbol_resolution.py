@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, List
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .models import Stock
 
+# Symbols bound per ``IN (...)`` lookup in batch resolution.
+_LOOKUP_BATCH_SIZE = 500
+
+# Lookup batches run concurrently, each on its own pooled connection; keep
+# well inside the meta engine pool so request sessions are not starved.
+_MAX_LOOKUP_WORKERS = 4
+
 
 @dataclass
 class ResolvedSymbol:
@@ -87,6 +97,78 @@ def resolve_symbol(db: Session, raw_symbol: str) -> ResolvedSymbol:
         return ResolvedSymbol(symbol=symbol, exchange=overrides[symbol], resolved=True)
 
     rows = db.query(Stock).filter(Stock.symbol == symbol).all()
+    return _resolve_from_rows(symbol, rows)
+
+
+def resolve_symbols(
+    db: Session, raw_symbols: Iterable[str]
+) -> Dict[str, ResolvedSymbol]:
+    """Resolve many raw symbols, keyed by raw symbol, with batched lookups.
+
+    Same rules as ``resolve_symbol``, but the Stock rows for every distinct
+    normalised symbol are loaded up front rather than queried per symbol.
+    Large inputs span several ``IN (...)`` batches, which are loaded in
+    parallel on private sessions.
+    """
+
+    raws = list(dict.fromkeys(raw_symbols))
+    overrides = _load_override_map()
+    symbols = sorted(
+        {_normalise_symbol(raw) for raw in raws if raw and raw.strip()}
+        - overrides.keys()
+    )
+    batches = [
+        symbols[start : start + _LOOKUP_BATCH_SIZE]
+        for start in range(0, len(symbols), _LOOKUP_BATCH_SIZE)
+    ]
+    if len(batches) > 1:
+        bind = db.get_bind()
+
+        def _load_batch(batch: List[str]) -> List[Stock]:
+            with Session(bind=bind) as session:
+                return _load_stock_rows(session, batch)
+
+        max_workers = min(_MAX_LOOKUP_WORKERS, len(batches))
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Each task runs in a copy of the caller's context so request-
+            # scoped state (e.g. the SQL statement counter) follows it.
+            pending = [
+                pool.submit(copy_context().run, _load_batch, batch) for batch in batches
+            ]
+            batch_rows = [future.result() for future in pending]
+    else:
+        batch_rows = [_load_stock_rows(db, batch) for batch in batches]
+
+    rows_by_symbol: Dict[str, List[Stock]] = {}
+    for rows in batch_rows:
+        for row in rows:
+            rows_by_symbol.setdefault(row.symbol, []).append(row)
+
+    resolved: Dict[str, ResolvedSymbol] = {}
+    for raw in raws:
+        if not raw or not raw.strip():
+            resolved[raw] = resolve_symbol(db, raw)
+            continue
+        symbol = _normalise_symbol(raw)
+        if symbol in overrides:
+            resolved[raw] = ResolvedSymbol(
+                symbol=symbol, exchange=overrides[symbol], resolved=True
+            )
+        else:
+            resolved[raw] = _resolve_from_rows(symbol, rows_by_symbol.get(symbol, []))
+    return resolved
+
+
+def _load_stock_rows(db: Session, symbols: List[str]) -> List[Stock]:
+    """Load the Stock rows for one batch of normalised symbols, oldest first."""
+
+    stmt = select(Stock).where(Stock.symbol.in_(symbols)).order_by(Stock.id)
+    return list(db.scalars(stmt))
+
+
+def _resolve_from_rows(symbol: str, rows: List[Stock]) -> ResolvedSymbol:
+    """Pick the exchange for a normalised symbol from its Stock rows."""
+
     if rows:
         # Prefer NSE when multiple exchanges exist; otherwise use the first row.
         nse_row = next((row for row in rows if row.exchange.upper() == "NSE"), None)
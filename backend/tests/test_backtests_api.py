@@ -5,7 +5,7 @@ from fastapi.testclient import TestClient
 
 from app.database import Base, SessionLocal, engine
 from app.main import app
-from app.models import Strategy, StrategyParameter
+from app.models import BacktestIndicatorSeries, Strategy, StrategyParameter
 from app.prices_database import PricesBase, PricesSessionLocal, prices_engine
 from app.prices_models import PriceBar
 
@@ -117,6 +117,51 @@ def test_create_backtest_via_api() -> None:
     assert len(chart["projection_curve"]) == len(chart["price_bars"])
     # Trades array should be present (may be empty for some paths).
     assert "trades" in chart
+    # Default SMA overlays are precomputed when the backtest is created,
+    # fingerprinted by the bars they were computed over.
+    assert len(chart["indicators"]["sma_5"]) == len(chart["price_bars"]) - 4
+    stored = meta_session.get(BacktestIndicatorSeries, backtest["id"])
+    assert stored is not None
+    assert stored.bar_count == len(chart["price_bars"])
+    assert stored.last_bar_at == datetime.fromisoformat(
+        chart["price_bars"][-1]["timestamp"]
+    )
+
+    # Equity and trades list endpoints should mirror the chart-data series.
+    equity_resp = client.get(f"/api/backtests/{backtest['id']}/equity")
+    assert equity_resp.status_code == 200
+    assert equity_resp.json() == chart["equity_curve"]
+    trades_resp = client.get(f"/api/backtests/{backtest['id']}/trades")
+    assert trades_resp.status_code == 200
+    assert trades_resp.json() == chart["trades"]
+
+    # Equity can be windowed, thinned, and paged; trades keyset-paginate by id.
+    equity = chart["equity_curve"]
+    page_resp = client.get(
+        f"/api/backtests/{backtest['id']}/equity",
+        params={"offset": 2, "limit": 5},
+    )
+    assert page_resp.json() == equity[2:7]
+    thinned_resp = client.get(
+        f"/api/backtests/{backtest['id']}/equity",
+        params={"downsample": 3},
+    )
+    assert thinned_resp.json() == equity[::3]
+    window_start, window_end = equity[5]["timestamp"], equity[9]["timestamp"]
+    window_resp = client.get(
+        f"/api/backtests/{backtest['id']}/equity",
+        params={"start": window_start, "end": window_end},
+    )
+    assert window_resp.json() == [
+        p for p in equity if window_start <= p["timestamp"] <= window_end
+    ]
+    if chart["trades"]:
+        first_id = chart["trades"][0]["id"]
+        after_resp = client.get(
+            f"/api/backtests/{backtest['id']}/trades",
+            params={"after_id": first_id},
+        )
+        assert after_resp.json() == chart["trades"][1:]
 
     # Trades export endpoint should return CSV.
     export_resp = client.get(
@@ -125,6 +170,13 @@ def test_create_backtest_via_api() -> None:
     assert export_resp.status_code == 200
     assert "text/csv" in export_resp.headers.get("content-type", "")
 
+    # A stored payload whose fingerprint no longer matches the bars is
+    # ignored and the overlays are recomputed (visible once the settings
+    # update below moves the chart-data cache to a new version).
+    stored.payload_json = {}
+    stored.bar_count = -1
+    meta_session.commit()
+
     # Settings endpoint should allow updating label, notes and configs without
     # affecting core behaviour.
     settings_payload = {
@@ -164,6 +216,14 @@ def test_create_backtest_via_api() -> None:
     assert detail["label"] == "API test run"
     assert detail["visual_config"]["showProjection"] is True
 
+    # Chart-data is cached per backtest version, so the settings update must
+    # be visible on the next chart request.
+    chart_after_update = client.get(f"/api/backtests/{backtest['id']}/chart-data")
+    assert chart_after_update.status_code == 200
+    chart_after = chart_after_update.json()
+    assert chart_after["backtest"]["label"] == "API test run"
+    assert chart_after["indicators"] == chart["indicators"]
+
     # Delete the backtest and ensure it no longer appears.
     delete_resp = client.delete(f"/api/backtests/{backtest['id']}")
     assert delete_resp.status_code == 204
@@ -1,9 +1,12 @@
-from datetime import date
+from datetime import date, datetime
 from pathlib import Path
 
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.prices_database import PricesBase, PricesSessionLocal, prices_engine
+from app.prices_models import PriceFetch
+from app.services import DataService
 
 
 def test_data_fetch_from_csv(tmp_path: Path) -> None:
@@ -36,3 +39,76 @@ def test_data_fetch_from_csv(tmp_path: Path) -> None:
     assert data["timeframe"] == "5m"
     assert data["bars_written"] == 2
     assert data["source"] == "csv"
+
+
+def test_data_fetch_job_runs_in_background(tmp_path: Path) -> None:
+    csv_path = tmp_path / "job.csv"
+    csv_path.write_text(
+        "timestamp,open,high,low,close,volume\n"
+        "2024-01-01T09:15:00,100,110,95,105,1000\n"
+        "2024-01-01T09:20:00,105,115,100,110,1500\n",
+        encoding="utf-8",
+    )
+
+    client = TestClient(app)
+    payload = {
+        "symbol": "TESTJOB",
+        "timeframe": "5m",
+        "start_date": date(2024, 1, 1).isoformat(),
+        "end_date": date(2024, 1, 1).isoformat(),
+        "source": "csv",
+        "csv_path": str(csv_path),
+    }
+
+    response = client.post("/api/data/fetch/jobs", json=payload)
+    assert response.status_code == 202, response.text
+    job = response.json()
+    assert job["symbol"] == "TESTJOB"
+    assert job["symbols_requested"] == 1
+
+    # TestClient runs background tasks before returning, so the job is done.
+    status = client.get(f"/api/data/fetch/jobs/{job['job_id']}")
+    assert status.status_code == 200
+    assert status.json()["status"] == "completed"
+    assert status.json()["bars_written"] == 2
+
+    assert client.get("/api/data/fetch/jobs/unknown").status_code == 404
+
+
+def test_fetch_and_store_symbols_writes_each_symbol_in_order(tmp_path: Path) -> None:
+    csv_path = tmp_path / "multi.csv"
+    csv_path.write_text(
+        "timestamp,open,high,low,close,volume\n"
+        "2024-01-01T09:15:00,100,110,95,105,1000\n"
+        "2024-01-01T09:20:00,105,115,100,110,1500\n",
+        encoding="utf-8",
+    )
+    symbols = [("TESTMULTI1", "NSE"), ("TESTMULTI2", None), ("TESTMULTI3", "bse")]
+
+    PricesBase.metadata.create_all(bind=prices_engine)
+    service = DataService(kite_api_key=None, kite_access_token=None)
+    with PricesSessionLocal() as session:
+        written = service.fetch_and_store_symbols(
+            session,
+            symbols=symbols,
+            timeframe="5m",
+            start=datetime(2024, 1, 1, 9, 15),
+            end=datetime(2024, 1, 1, 15, 30),
+            source="csv",
+            csv_path=str(csv_path),
+        )
+        fetches = (
+            session.query(PriceFetch)
+            .filter(PriceFetch.symbol.in_([s for s, _ in symbols]))
+            .order_by(PriceFetch.id.desc())
+            .limit(3)
+            .all()
+        )
+
+    assert written == 6
+    # Fetch records follow the input order and carry normalised exchanges.
+    assert [(f.symbol, f.exchange) for f in reversed(fetches)] == [
+        ("TESTMULTI1", "NSE"),
+        ("TESTMULTI2", "NSE"),
+        ("TESTMULTI3", "BSE"),
+    ]
@@ -56,6 +56,13 @@ def test_data_summary_and_preview_from_csv(tmp_path: Path) -> None:
     assert "coverage_id" in item
     assert item["coverage_id"].startswith("TEST2_")
 
+    # Summary responses carry an ETag; revalidating with it returns 304
+    # until the price tables change.
+    etag = res_sum.headers["etag"]
+    res_cached = client.get("/api/data/summary", headers={"If-None-Match": etag})
+    assert res_cached.status_code == 304
+    assert res_cached.headers["etag"] == etag
+
     # Preview endpoint should return the actual bars.
     res_prev = client.get("/api/data/TEST2/preview", params={"timeframe": "5m"})
     assert res_prev.status_code == 200
@@ -63,3 +70,21 @@ def test_data_summary_and_preview_from_csv(tmp_path: Path) -> None:
     assert len(preview) == 2
     assert preview[0]["close"] == 105
     assert preview[1]["close"] == 110
+
+    # Re-fetching the same window rewrites the bars and invalidates the ETag.
+    assert client.post("/api/data/fetch", json=payload).status_code == 200
+    res_after = client.get("/api/data/summary", headers={"If-None-Match": etag})
+    assert res_after.status_code == 200
+    assert res_after.headers["etag"] != etag
+
+    # Deleting the coverage removes it from the summary.
+    res_del = client.delete(
+        "/api/data/bars", params={"symbols": ["TEST2"], "timeframe": "5m"}
+    )
+    assert res_del.status_code == 204
+    remaining = client.get("/api/data/summary").json()
+    assert not [
+        item
+        for item in remaining
+        if item["symbol"] == "TEST2" and item["timeframe"] == "5m"
+    ]
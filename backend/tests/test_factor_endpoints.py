@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.database import get_db
 from app.main import app
-from app.models import FundamentalsSnapshot, Stock
+from app.models import FactorExposure, FundamentalsSnapshot, Stock
 from app.prices_database import get_prices_db
 from app.prices_models import PriceBar
-
+from app.routers import factors
+from app.routers.factors import _stored_rows_and_missing
+from app.services import RiskModelService
 
 client = TestClient(app)
 
@@ -176,6 +179,31 @@ def test_exposures_endpoint_returns_values() -> None:
     assert body["EP_A"]["value"] > body["EP_B"]["value"]
 
 
+def test_stored_rows_and_missing_keeps_request_order() -> None:
+    as_of = date(2024, 3, 1)
+    _seed_factor_universe(as_of)
+    client.post(
+        "/api/v1/factors/exposures",
+        json={"symbols": ["EP_A", "EP_B"], "as_of_date": as_of.isoformat()},
+    )
+
+    meta_db = next(get_db())
+    try:
+        rows, missing = _stored_rows_and_missing(
+            meta_db, FactorExposure, ["EP_ZZ2", "EP_B", "EP_ZZ1", "EP_A"], as_of
+        )
+        assert _stored_rows_and_missing(meta_db, FactorExposure, [], as_of) == (
+            {},
+            [],
+        )
+    finally:
+        meta_db.close()
+
+    assert set(rows) == {"EP_A", "EP_B"}
+    assert rows["EP_A"].as_of_date == as_of
+    assert missing == ["EP_ZZ2", "EP_ZZ1"]
+
+
 def test_fundamentals_endpoint_returns_snapshot() -> None:
     as_of = date(2024, 3, 2)
     _seed_factor_universe(as_of)
@@ -213,3 +241,29 @@ def test_risk_and_covariance_endpoints() -> None:
     corr = cov_body["corr_matrix"]
     assert len(cov) == 2 and len(cov[0]) == 2
     assert len(corr) == 2 and len(corr[0]) == 2
+
+
+def test_covariance_endpoint_reuses_fresh_matrix(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    as_of = date(2024, 3, 4)
+    _seed_risk_universe(as_of)
+    payload = {"symbols": ["ERP_A", "ERP_B"], "as_of_date": as_of.isoformat()}
+
+    first = client.post("/api/v1/factors/covariance", json=payload)
+    assert first.status_code == 200
+
+    # A matrix stored moments ago is served without rebuilding the risk model.
+    def _fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("covariance was recomputed")
+
+    monkeypatch.setattr(RiskModelService, "compute_and_store_risk", _fail)
+    factors._covariance_cache.clear()
+    second = client.post("/api/v1/factors/covariance", json=payload)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+
+    # Repeat polls are answered from the encoded-response cache.
+    monkeypatch.setattr(factors, "_load_covariance_matrix", _fail)
+    third = client.post("/api/v1/factors/covariance", json=payload)
+    assert third.content == second.content
@@ -0,0 +1,50 @@
+import numpy as np
+
+from app.indicators import sma, true_range, zero_lag_bands
+
+
+def test_sma_marks_warmup_bars_as_nan() -> None:
+    values = np.arange(1.0, 8.0)
+    out = sma(values, 3)
+
+    assert np.isnan(out[:2]).all()
+    assert np.allclose(out[2:], [2.0, 3.0, 4.0, 5.0, 6.0])
+    assert np.isnan(sma(values, 10)).all()
+
+
+def test_true_range_uses_previous_close_after_first_bar() -> None:
+    high = np.array([10.0, 12.0, 11.0])
+    low = np.array([9.0, 11.5, 8.0])
+    close = np.array([9.5, 11.8, 8.5])
+
+    assert np.allclose(true_range(high, low, close), [1.0, 2.5, 3.8])
+
+
+def test_zero_lag_bands_are_flat_for_constant_prices() -> None:
+    close = np.full(30, 100.0)
+    high = close + 1.0
+    low = close - 1.0
+
+    basis, volatility = zero_lag_bands(high, low, close, length=3, mult=1.5)
+
+    assert np.allclose(basis, 100.0)
+    # Band width stays zero until the 3 * length window is full.
+    assert np.allclose(volatility[:8], 0.0)
+    assert np.allclose(volatility[8:], 3.0)
+
+
+def test_zero_lag_band_width_tracks_window_max_of_atr() -> None:
+    rng = np.random.default_rng(7)
+    close = 100.0 + np.cumsum(rng.normal(size=120))
+    high = close + rng.uniform(0.1, 2.0, size=120)
+    low = close - rng.uniform(0.1, 2.0, size=120)
+    length = 5
+
+    _, volatility = zero_lag_bands(high, low, close, length=length, mult=2.0)
+
+    atr = sma(true_range(high, low, close), length)
+    window = length * 3
+    expected = np.zeros_like(atr)
+    for i in range(window - 1, atr.shape[0]):
+        expected[i] = np.nanmax(atr[i - window + 1 : i + 1])
+    assert np.allclose(volatility, expected * 2.0)
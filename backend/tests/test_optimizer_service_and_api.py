@@ -19,7 +19,6 @@ from app.prices_database import get_prices_db
 from app.prices_models import PriceBar
 from app.services import OptimizerService
 
-
 client = TestClient(app)
 
 
@@ -260,5 +259,27 @@ def test_portfolio_optimize_and_save_weights_api() -> None:
         )
         assert rows
         assert {r.symbol for r in rows} == set(symbols)
+        kept_id = next(r.id for r in rows if r.symbol == weights[0]["symbol"])
+    finally:
+        meta_db.close()
+
+    # Re-saving the snapshot updates kept symbols in place and drops the rest.
+    resave_payload = {**save_payload, "weights": [{**weights[0], "weight": 1.0}]}
+    resp_save = client.post("/api/v1/portfolio/save_weights", json=resave_payload)
+    assert resp_save.status_code == 200
+
+    meta_db = next(get_db())
+    try:
+        rows = (
+            meta_db.query(PortfolioWeight)
+            .filter(
+                PortfolioWeight.portfolio_id == portfolio_id,
+                PortfolioWeight.date == as_of,
+            )
+            .all()
+        )
+        assert [(r.id, r.symbol, r.weight) for r in rows] == [
+            (kept_id, weights[0]["symbol"], 1.0)
+        ]
     finally:
         meta_db.close()
@@ -15,7 +15,7 @@ from app.models import (
 )
 from app.prices_database import PricesBase, PricesSessionLocal, prices_engine
 from app.prices_models import PriceBar
-
+from app.routers import portfolios
 
 client = TestClient(app)
 
@@ -91,6 +91,25 @@ def test_unique_code_conflict() -> None:
     assert resp.status_code == 409
 
 
+def test_list_portfolios_keyset_pages() -> None:
+    """Paging with after_id/limit should walk the full list in order."""
+
+    _create_sample_portfolio(code="PAGE_A")
+    _create_sample_portfolio(code="PAGE_B")
+    full = client.get("/api/portfolios").json()
+    assert len(full) >= 2
+
+    paged: list[dict] = []
+    params: dict[str, int] = {"limit": 2}
+    while True:
+        page = client.get("/api/portfolios", params=params).json()
+        if not page:
+            break
+        paged.extend(page)
+        params = {"limit": 2, "after_id": page[-1]["id"]}
+    assert [p["id"] for p in paged] == [p["id"] for p in full]
+
+
 def test_update_and_delete_portfolio() -> None:
     """Portfolio update and delete should behave as expected."""
 
@@ -110,12 +129,56 @@ def test_update_and_delete_portfolio() -> None:
     assert updated["name"] == "Updated Name"
     assert updated["risk_profile"]["maxPositionSizePct"] == 10.0
 
+    assert client.get(f"/api/portfolios/{portfolio_id}/backtests").status_code == 200
+
     # Delete and ensure it is gone.
     resp = client.delete(f"/api/portfolios/{portfolio_id}")
     assert resp.status_code == 204
 
     resp = client.get(f"/api/portfolios/{portfolio_id}")
     assert resp.status_code == 404
+    resp = client.get(f"/api/portfolios/{portfolio_id}/backtests", params={"limit": 5})
+    assert resp.status_code == 404
+
+
+def test_portfolio_reads_are_cached_until_written(monkeypatch) -> None:
+    created = _create_sample_portfolio(code="CACHE_RD")
+    portfolio_id = created["id"]
+    first = client.get(f"/api/portfolios/{portfolio_id}")
+    assert first.status_code == 200
+
+    # Repeat reads are served from the response cache without a lookup.
+    def _fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("portfolio was loaded")
+
+    with monkeypatch.context() as m:
+        m.setattr(portfolios, "_get_portfolio_or_404", _fail)
+        assert client.get(f"/api/portfolios/{portfolio_id}").content == first.content
+        revalidated = client.get(
+            f"/api/portfolios/{portfolio_id}",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+        assert revalidated.status_code == 304
+
+    # Writes through the API invalidate the cached reads.
+    notes = f"changed {datetime.now(timezone.utc).isoformat()}"
+    resp = client.put(f"/api/portfolios/{portfolio_id}", json={"notes": notes})
+    assert resp.status_code == 200
+    refreshed = client.get(f"/api/portfolios/{portfolio_id}")
+    assert refreshed.json()["notes"] == notes
+    assert refreshed.headers["ETag"] != first.headers["ETag"]
+
+
+def test_list_portfolios_issues_constant_queries() -> None:
+    _create_sample_portfolio(code="NPLUS_1")
+    _create_sample_portfolio(code="NPLUS_2")
+    portfolios._clear_read_cache()
+
+    resp = client.get("/api/portfolios")
+    assert resp.status_code == 200
+    # Portfolios come back with their universe groups and member counts in
+    # one query, however many portfolios are listed.
+    assert int(resp.headers["X-Query-Count"]) == 1
 
 
 def test_list_portfolio_backtests_initially_empty() -> None:
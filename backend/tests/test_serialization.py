@@ -0,0 +1,14 @@
+import math
+from datetime import datetime
+
+from app.schemas import BacktestEquityPointRead
+from app.serialization import dump_json
+
+
+def test_dump_json_matches_model_serialisation() -> None:
+    point = {"timestamp": datetime(2024, 1, 2, 9, 15), "equity": math.nan}
+
+    assert dump_json([point]) == (
+        b"[" + BacktestEquityPointRead(**point).model_dump_json().encode() + b"]"
+    )
+    assert dump_json({"x": math.inf}) == b'{"x":null}'
@@ -6,7 +6,6 @@ from app.database import get_db
 from app.main import app
 from app.models import Stock, StockGroup, StockGroupMember
 
-
 client = TestClient(app)
 
 
@@ -224,3 +223,80 @@ def test_bulk_add_group_members_by_symbols() -> None:
     assert resp.status_code == 200
     body = resp.json()
     assert body["added"] == 0
+
+
+def test_list_endpoints_revalidate_with_etag() -> None:
+    """Stock and group listings return 304 until the listed data changes."""
+
+    db = next(get_db())
+    try:
+        stock = (
+            db.query(Stock)
+            .filter(Stock.symbol == "ETAG_A", Stock.exchange == "NSE")
+            .first()
+        )
+        if stock is None:
+            stock = Stock(
+                symbol="ETAG_A",
+                exchange="NSE",
+                segment=None,
+                name=None,
+                sector=None,
+                tags=None,
+                is_active=True,
+            )
+            db.add(stock)
+        stock.is_active = True
+
+        group = db.query(StockGroup).filter(StockGroup.code == "ETAGGRP").one_or_none()
+        if group is None:
+            group = StockGroup(
+                code="ETAGGRP",
+                name="ETag Group",
+                description=None,
+                tags=None,
+            )
+            db.add(group)
+        db.commit()
+
+        db.query(StockGroupMember).filter(
+            StockGroupMember.group_id == group.id
+        ).delete()
+        db.commit()
+
+        stock_id = stock.id
+    finally:
+        db.close()
+
+    resp = client.get("/api/stocks")
+    assert resp.status_code == 200
+    stocks_etag = resp.headers["etag"]
+    cached = client.get("/api/stocks", headers={"If-None-Match": stocks_etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == stocks_etag
+
+    resp = client.get("/api/stock-groups")
+    assert resp.status_code == 200
+    groups_etag = resp.headers["etag"]
+    cached = client.get("/api/stock-groups", headers={"If-None-Match": groups_etag})
+    assert cached.status_code == 304
+
+    # Adding a member changes the group's stock_count, so the ETag moves.
+    resp = client.post(
+        "/api/stock-groups/ETAGGRP/members/bulk-add",
+        json={"symbols": ["ETAG_A"]},
+    )
+    assert resp.status_code == 200
+    resp = client.get("/api/stock-groups", headers={"If-None-Match": groups_etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != groups_etag
+    listed = {g["code"]: g for g in resp.json()}
+    assert listed["ETAGGRP"]["stock_count"] == 1
+
+    # Deactivating a stock drops it from the active listing.
+    resp = client.post("/api/stocks/bulk-deactivate", json={"ids": [stock_id]})
+    assert resp.status_code == 200
+    resp = client.get("/api/stocks", headers={"If-None-Match": stocks_etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != stocks_etag
+    assert "ETAG_A" not in {s["symbol"] for s in resp.json()}
@@ -4,11 +4,10 @@ import pytest
 
 from app.database import get_db
 from app.models import Stock, StockGroup, StockGroupMember
-from app.routers.stocks import _classify_segment_from_market_cap
+from app.routers.stocks import _classify_segment_from_market_cap, _classify_segments
 from app.main import app
 from fastapi.testclient import TestClient
 
-
 client = TestClient(app)
 
 
@@ -206,3 +205,11 @@ def test_classify_segment_boundaries_in_crores() -> None:
     # Large-cap: >= 20,000 cr
     assert _classify_segment_from_market_cap(20_000) == "large-cap"
     assert _classify_segment_from_market_cap(50_000) == "large-cap"
+
+
+def test_classify_segments_matches_scalar_classification() -> None:
+    values = [None, 0, -10, 50, 100, 1_000, 1_000.01, 4_999.99, 5_000, 20_000]
+    assert _classify_segments(values) == [
+        _classify_segment_from_market_cap(value) for value in values
+    ]
+    assert _classify_segments([]) == []